@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+TakeTheSubs - Benchmark harness
+Times the hot paths against synthetic tool output and a local HTTP/HTTPS farm,
+and compares the numbers across commits.
+
+Examples:
+    python3 benchmark.py                              # run every stage on the working tree
+    python3 benchmark.py --save bench.json            # keep the results
+    python3 benchmark.py --baseline bench.json        # compare with saved results
+    python3 benchmark.py --against HEAD~1             # benchmark HEAD~1, then the working tree, and compare
+    python3 benchmark.py --stages startup --startup-budget 150   # fail if --version takes over 150 ms
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import socket
+import ssl
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+STAGES = ['startup', 'parse', 'validate', 'store', 'tools', 'verify', 'vhosts', 'save']
+# Modules that only the stages needing them should load; importing takethesubs must not pull them in
+DEFERRED_MODULES = ['asyncio', 'ssl', 'sqlite3', 'yaml', 'logging', 'subprocess', 'socket']
+STARTUP_RUNS = 10
+TARGET = 'bench.example.com'
+
+FAKE_TOOL = r'''#!{python}
+import os, random, sys
+argv = sys.argv[1:]
+if any(arg in ('-version', '--version', '-h', '--help') for arg in argv):
+    print('{name} v1.0.0')
+    sys.exit(0)
+
+def option(*flags):
+    for flag in flags:
+        if flag in argv:
+            index = argv.index(flag) + 1
+            if index < len(argv) and not argv[index].startswith('-'):
+                return argv[index]
+    return None
+
+target = option('-d', '-t') or argv[-1]
+output = option('-o')
+lines = int(os.environ.get('BENCH_LINES', '100000'))
+rng = random.Random(os.environ.get('BENCH_SEED', '1') + '{name}')
+junk = float(os.environ.get('BENCH_JUNK', '0.05'))
+duplicates = float(os.environ.get('BENCH_DUPLICATES', '0.2'))
+out_of_scope = float(os.environ.get('BENCH_OUT_OF_SCOPE', '0.05'))
+words = ['api', 'dev', 'mail', 'vpn', 'cdn', 'shop', 'blog', 'admin', 'internal', 'static']
+
+batch = []
+emitted = []
+for index in range(lines):
+    roll = rng.random()
+    if roll < junk:
+        line = '[INF] Enumerating subdomains for %s (%d sources)' % (target, index)
+    elif roll < junk + out_of_scope:
+        line = 'x%d.%s.evil-%d.net' % (index, target, index % 7)
+    elif emitted and roll < junk + out_of_scope + duplicates:
+        line = rng.choice(emitted)
+    else:
+        # Tools overlap: each covers a shifted window of the same name space
+        number = rng.randrange(lines * 2)
+        line = '%s%d.%s.%s' % (rng.choice(words), number, words[number % len(words)], target)
+        if len(emitted) < 10000:
+            emitted.append(line)
+    batch.append(line)
+    if len(batch) >= 4096:
+        sys.stdout.write('\n'.join(batch) + '\n')
+        if output:
+            with open(output, 'a') as f:
+                f.write('\n'.join(batch) + '\n')
+        batch = []
+if batch:
+    sys.stdout.write('\n'.join(batch) + '\n')
+    if output:
+        with open(output, 'a') as f:
+            f.write('\n'.join(batch) + '\n')
+'''
+
+class FakeTools:
+    """Directory of stand-in tool binaries that emit a configurable mix of subdomains"""
+
+    NAMES = ['subfinder', 'amass', 'assetfinder', 'findomain']
+
+    def __init__(self, root: str):
+        self.path = os.path.join(root, 'bin')
+        os.makedirs(self.path, exist_ok=True)
+        for name in self.NAMES:
+            script = os.path.join(self.path, name)
+            with open(script, 'w') as f:
+                f.write(FAKE_TOOL.replace('{python}', sys.executable).replace('{name}', name))
+            os.chmod(script, 0o755)
+
+    def env(self, lines: int, seed: int, junk: float, duplicates: float, out_of_scope: float) -> Dict[str, str]:
+        """Environment under which only the fake tools are found"""
+        env = dict(os.environ)
+        env.update({
+            'PATH': self.path + os.pathsep + '/usr/bin:/bin',
+            'BENCH_LINES': str(lines),
+            'BENCH_SEED': str(seed),
+            'BENCH_JUNK': str(junk),
+            'BENCH_DUPLICATES': str(duplicates),
+            'BENCH_OUT_OF_SCOPE': str(out_of_scope)
+        })
+        return env
+
+class HTTPFarm:
+    """Local HTTP/HTTPS servers with configurable latency, stalls and connection resets"""
+
+    def __init__(self, hosts: int, https_ratio: float, latency: float, timeout_ratio: float,
+                 reset_ratio: float, seed: int, cert_dir: str):
+        self.hosts = hosts
+        self.https_ratio = https_ratio
+        self.latency = latency
+        self.timeout_ratio = timeout_ratio
+        self.reset_ratio = reset_ratio
+        self.seed = seed
+        self.cert = self.make_certificate(cert_dir) if https_ratio > 0 else None
+        self.process = None
+        self.backend = None
+
+    @staticmethod
+    def make_certificate(directory: str) -> Optional[tuple]:
+        """Create a throwaway self-signed certificate with the openssl CLI, if available"""
+        if not shutil.which('openssl'):
+            print('[!] openssl not found, the farm serves plain HTTP only', file=sys.stderr)
+            return None
+        cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+             '-days', '1', '-subj', '/CN=localhost'],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return cert, key
+
+    def start(self) -> List[str]:
+        """Start the farm in its own process, so it does not compete for the GIL, and return its hosts"""
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=self.serve, args=(child,), daemon=True)
+        self.process.start()
+        hosts, self.backend = parent.recv()
+        return hosts
+
+    def stop(self):
+        """Shut the farm down"""
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+
+    def serve(self, pipe):
+        """Process entry point: bind every server, report the host list and serve until terminated"""
+        asyncio.run(self._serve(pipe))
+
+    async def _serve(self, pipe):
+        rng = random.Random(self.seed)
+        context = None
+        if self.cert:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(*self.cert)
+
+        async def handle(reader, writer):
+            try:
+                while True:
+                    request = await reader.readuntil(b'\r\n\r\n')
+                    roll = rng.random()
+                    if roll < self.timeout_ratio:
+                        await asyncio.sleep(3600)
+                    if roll < self.timeout_ratio + self.reset_ratio:
+                        sock = writer.get_extra_info('socket')
+                        if sock is not None:
+                            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                        writer.transport.abort()
+                        return
+                    if self.latency:
+                        await asyncio.sleep(self.latency * rng.uniform(0.5, 1.5))
+                    path = request.split(b' ', 2)[1].decode('latin-1')
+                    body = f'<html><head><title>Bench {path}</title></head><body>ok</body></html>'.encode()
+                    writer.write(
+                        b'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n'
+                        b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+                    )
+                    await writer.drain()
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ssl.SSLError):
+                pass
+            finally:
+                writer.transport.abort()
+
+        hosts = []
+        servers = []
+        for index in range(self.hosts):
+            secure = context is not None and index < self.hosts * self.https_ratio
+            server = await asyncio.start_server(handle, '127.0.0.1', 0, ssl=context if secure else None,
+                                                backlog=1024)
+            servers.append(server)
+            hosts.append(f"127.0.0.1:{server.sockets[0].getsockname()[1]}")
+
+        # One shared HTTP and HTTPS backend that answers for any virtual host
+        backend = {}
+        for scheme, secure in (('http', None), ('https', context)):
+            if scheme == 'https' and context is None:
+                continue
+            server = await asyncio.start_server(handle, '127.0.0.1', 0, ssl=secure, backlog=1024)
+            servers.append(server)
+            backend[scheme] = server.sockets[0].getsockname()[1]
+        pipe.send((hosts, backend))
+        await asyncio.Event().wait()
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def load_module(path: str):
+    """Import a takethesubs.py from an arbitrary path, e.g. one checked out from another commit"""
+    spec = importlib.util.spec_from_file_location('takethesubs_bench', path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so functions it sends to process pools can be pickled by reference
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_names(count: int, seed: int) -> List[str]:
+    """Plausible in-scope names with some depth variety"""
+    rng = random.Random(seed)
+    words = ['api', 'dev', 'mail', 'vpn', 'cdn', 'shop', 'blog', 'admin', 'internal', 'static']
+    return [f"{rng.choice(words)}{index}.{words[index % len(words)]}.{TARGET}" for index in range(count)]
+
+def new_instance(module, workdir: str, ingest_workers: int = 1):
+    """A TakeTheSubs instance with caching and checkpoints off, so every run does the full work"""
+    instance = module.TakeTheSubs()
+    instance.config.update({'cache': False, 'checkpoint': False, 'output_dir': workdir, 'verbose': False,
+                            'ingest_workers': ingest_workers})
+    instance.logger.info = instance.logger.success = instance.logger.warning = lambda *args, **kwargs: None
+    return instance
+
+class StageRunner:
+    """Runs one stage in the current process and measures it"""
+
+    def __init__(self, module, args, workdir: str):
+        self.module = module
+        self.args = args
+        self.workdir = workdir
+        self.extra = {}
+
+    def run(self, stage: str) -> Dict:
+        timings = []
+        latencies = []
+        items = 0
+        self.extra = {}
+        for _ in range(self.args.repeat):
+            started = time.perf_counter()
+            items = getattr(self, f"stage_{stage}")(latencies)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        samples = latencies or timings
+        return {
+            'items': items,
+            'seconds': best,
+            'throughput': items / best if best else None,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+            'latency_of': 'item' if latencies else 'run',
+            'peak_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            **self.extra
+        }
+
+    def tool_output(self) -> str:
+        """Capture one fake tool's output to a file, once"""
+        path = os.path.join(self.workdir, 'tool_output.txt')
+        if not os.path.exists(path):
+            tools = FakeTools(self.workdir)
+            env = tools.env(self.args.lines, self.args.seed, self.args.junk, self.args.duplicates,
+                            self.args.out_of_scope)
+            with open(path, 'w') as f:
+                subprocess.run([os.path.join(tools.path, 'subfinder'), '-d', TARGET], stdout=f, env=env, check=True)
+        return path
+
+    def stage_startup(self, latencies: List[float]) -> int:
+        """Cold start: `takethesubs.py --version` wall time, import time and what the import loads"""
+        module_path = os.path.abspath(self.args.module)
+        for _ in range(STARTUP_RUNS):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, module_path, '--version'], capture_output=True, check=True)
+            latencies.append(time.perf_counter() - started)
+
+        probe = (f"import json, sys; sys.path.insert(0, {os.path.dirname(module_path)!r}); import takethesubs; "
+                 f"print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))")
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe],
+                                 capture_output=True, text=True, check=True)
+        import_us = [int(line.split('|')[1]) for line in process.stderr.splitlines()
+                     if line.rstrip().endswith('| takethesubs')]
+        self.extra = {
+            'import_ms': import_us[-1] / 1000 if import_us else None,
+            'eager_modules': json.loads(process.stdout.strip().splitlines()[-1]),
+            # The interpreters started above are children; this stage's own process is not what's measured
+            'peak_rss_mib': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        }
+        return STARTUP_RUNS
+
+    def stage_parse(self, latencies: List[float]) -> int:
+        """Tool output file to validated names"""
+        path = self.tool_output()
+        tool = self.module.SubdomainTool('Bench', 'true')
+        tool.default_parser(path, '')
+        return self.args.lines
+
+    def stage_validate(self, latencies: List[float]) -> int:
+        """Per-name domain validation"""
+        names = synthetic_names(self.args.lines, self.args.seed)
+        tool = self.module.SubdomainTool('Bench', 'true')
+        for name in names:
+            tool.is_valid_domain(name)
+        return len(names)
+
+    def stage_store(self, latencies: List[float]) -> int:
+        """Deduplicate, count and iterate the discovered names in sorted order"""
+        names = synthetic_names(self.args.lines, self.args.seed)
+        names += names[:len(names) // 5]
+        if hasattr(self.module, 'SubdomainStore'):
+            store = self.module.SubdomainStore(names)
+            len(store)
+            for _ in store:
+                pass
+        else:
+            for _ in sorted(set(names)):
+                pass
+        return len(names)
+
+    def stage_tools(self, latencies: List[float]) -> int:
+        """Full passive enumeration with the fake tools, including merging and saving"""
+        tools = FakeTools(self.workdir)
+        os.environ.update(tools.env(self.args.lines, self.args.seed, self.args.junk, self.args.duplicates,
+                                    self.args.out_of_scope))
+        instance = new_instance(self.module, self.workdir, self.args.ingest_workers)
+        output_dir = tempfile.mkdtemp(dir=self.workdir)
+        started = time.perf_counter()
+        instance.enumerate_target(TARGET, output_dir)
+        latencies.append(time.perf_counter() - started)
+        if hasattr(instance, 'close'):
+            instance.close()
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return self.args.lines * len(FakeTools.NAMES)
+
+    def stage_verify(self, latencies: List[float]) -> int:
+        """HTTP(S) probing of every farm host"""
+        hosts = json.loads(os.environ['BENCH_FARM_HOSTS'])
+        instance = new_instance(self.module, self.workdir)
+        instance.config.update({'connect_timeout': 2, 'read_timeout': 2})
+
+        # Time each host's probe from the inside when the prober exposes one
+        if hasattr(instance, 'create_prober'):
+            create_prober = instance.create_prober
+
+            def timed_prober(*args, **kwargs):
+                prober = create_prober(*args, **kwargs)
+                probe_host = prober.probe_host
+
+                async def timed(host, *probe_args, **probe_kwargs):
+                    started = time.perf_counter()
+                    try:
+                        return await probe_host(host, *probe_args, **probe_kwargs)
+                    finally:
+                        latencies.append(time.perf_counter() - started)
+
+                prober.probe_host = timed
+                return prober
+
+            instance.create_prober = timed_prober
+
+        instance.verify_subdomains(set(hosts))
+        if hasattr(instance, 'close'):
+            instance.close()
+        return len(hosts)
+
+    def stage_vhosts(self, latencies: List[float]) -> int:
+        """Probing virtual hosts that all resolve to one backend, by address"""
+        backend = json.loads(os.environ['BENCH_FARM_BACKEND'])
+        names = [f"vhost{index}.{TARGET}" for index in range(self.args.hosts)]
+        dns = {name: {'host': name, 'a': ['127.0.0.1'], 'aaaa': [], 'cname': []} for name in names}
+        instance = new_instance(self.module, self.workdir)
+        instance.config.update({'connect_timeout': 2, 'read_timeout': 2, 'probe_by_ip': True})
+        create_prober = instance.create_prober
+
+        def backend_prober(*args, **kwargs):
+            # The backend listens on ephemeral ports, so point every candidate URL at them
+            prober = create_prober(*args, **kwargs)
+            prober.candidates = lambda host, schemes=(): [f"{scheme}://{host}:{port}/"
+                                                          for scheme, port in backend.items()]
+            return prober
+
+        instance.create_prober = backend_prober
+        started = time.perf_counter()
+        live = asyncio.run(instance.probe_subdomains(set(names), dns=dns))
+        latencies.append(time.perf_counter() - started)
+        counters = instance.metrics.report()['counters']
+        self.extra = {'live': len(live), **{name[len('probe_'):]: value for name, value in counters.items()}}
+        instance.close()
+        return len(names)
+
+    def stage_save(self, latencies: List[float]) -> int:
+        """Writing every configured output format"""
+        names = synthetic_names(self.args.lines, self.args.seed)
+        instance = new_instance(self.module, self.workdir)
+        instance.config['output_formats'] = self.args.formats.split(',')
+        results = instance.new_results(TARGET) if hasattr(instance, 'new_results') else instance.results
+        results.update({'target': TARGET, 'start_time': '', 'end_time': '', 'tools_used': ['bench']})
+        if hasattr(results['subdomains'], 'update'):
+            results['subdomains'].update(names)
+        live = set(names[::10])
+        results['live_hosts'] = live
+        results['http'] = {
+            host: {'host': host, 'url': f"https://{host}/", 'final_url': f"https://{host}/", 'scheme': 'https',
+                   'port': 443, 'status': 200, 'title': 'Bench', 'content_length': 100, 'alive': True,
+                   'error': None}
+            for host in live
+        }
+        output_dir = tempfile.mkdtemp(dir=self.workdir)
+        try:
+            instance.save_results(TARGET, output_dir, results)
+        except TypeError:
+            # Older revisions only saved self.results
+            instance.results = results
+            instance.save_results(TARGET, output_dir)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return len(names)
+
+class Benchmark:
+    """Runs every stage in a fresh subprocess, so peak RSS belongs to that stage alone"""
+
+    def __init__(self, args):
+        self.args = args
+
+    def run(self, module_path: str, label: str) -> Dict:
+        workdir = tempfile.mkdtemp(prefix='takethesubs-bench-')
+        farm = None
+        env = dict(os.environ)
+        try:
+            if {'verify', 'vhosts'} & set(self.args.stages):
+                farm = HTTPFarm(self.args.hosts, self.args.https, self.args.latency / 1000,
+                                self.args.timeouts, self.args.resets, self.args.seed, workdir)
+                env['BENCH_FARM_HOSTS'] = json.dumps(farm.start())
+                env['BENCH_FARM_BACKEND'] = json.dumps(farm.backend)
+
+            results = {}
+            for stage in self.args.stages:
+                print(f"[+] {label}: {stage}...", file=sys.stderr)
+                command = [sys.executable, os.path.abspath(__file__), '--run-stage', stage,
+                           '--module', module_path, '--workdir', workdir] + self.passthrough()
+                process = subprocess.run(command, capture_output=True, text=True, env=env)
+                if process.returncode == 0:
+                    results[stage] = json.loads(process.stdout.strip().splitlines()[-1])
+                else:
+                    error = (process.stderr.strip().splitlines() or ['failed'])[-1]
+                    results[stage] = {'error': error}
+                    print(f"[-] {label}: {stage} failed: {error}", file=sys.stderr)
+            return {'label': label, 'params': self.params(), 'stages': results}
+        finally:
+            if farm is not None:
+                farm.stop()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def params(self) -> Dict:
+        return {key: getattr(self.args, key) for key in
+                ('lines', 'hosts', 'latency', 'timeouts', 'resets', 'https', 'junk', 'duplicates',
+                 'out_of_scope', 'repeat', 'seed', 'formats', 'ingest_workers')}
+
+    def passthrough(self) -> List[str]:
+        argv = []
+        for key, value in self.params().items():
+            argv += [f"--{key.replace('_', '-')}", str(value)]
+        return argv
+
+def module_at(revision: str, directory: str) -> str:
+    """Write takethesubs.py as of a git revision into a directory"""
+    root = Path(__file__).resolve().parent
+    source = subprocess.run(['git', 'show', f"{revision}:takethesubs.py"], cwd=root,
+                            capture_output=True, check=True).stdout
+    path = os.path.join(directory, 'takethesubs.py')
+    with open(path, 'wb') as f:
+        f.write(source)
+    return path
+
+def print_report(report: Dict, baseline: Dict = None, threshold: float = 0.1,
+                 startup_budget: float = None) -> List[str]:
+    """Print a table of the results, with changes against a baseline and budgets; return the regressions"""
+    regressions = []
+    print(f"\n{report['label']}")
+    print(f"{'stage':<10}{'items':>10}{'items/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'RSS MiB':>10}  change")
+    for stage, result in report['stages'].items():
+        if 'error' in result:
+            print(f"{stage:<10}  error: {result['error']}")
+            continue
+        change = ''
+        previous = (baseline or {}).get('stages', {}).get(stage)
+        if previous and 'error' not in previous:
+            deltas = {
+                'items/s': (result['throughput'] / previous['throughput'] - 1, -1),
+                'p99': (result['p99_ms'] / previous['p99_ms'] - 1 if previous['p99_ms'] else 0, 1),
+                'RSS': (result['peak_rss_mib'] / previous['peak_rss_mib'] - 1, 1)
+            }
+            change = '  '.join(f"{name} {delta:+.0%}" for name, (delta, _) in deltas.items())
+            worse = [name for name, (delta, sign) in deltas.items() if delta * sign > threshold]
+            if worse:
+                change += '  REGRESSION'
+                regressions.extend(f"{stage} {name}" for name in worse)
+        if stage == 'startup':
+            if startup_budget is not None and result['p50_ms'] > startup_budget:
+                change += f"  over {startup_budget:.0f} ms budget  REGRESSION"
+                regressions.append('startup budget')
+            if result.get('eager_modules'):
+                change += f"  import loads {', '.join(result['eager_modules'])}  REGRESSION"
+                regressions.append('startup eager imports')
+        print(f"{stage:<10}{result['items']:>10}{result['throughput']:>14,.0f}{result['p50_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['peak_rss_mib']:>10.1f}  {change}")
+        if result.get('import_ms') is not None:
+            print(f"{'':<10}import takethesubs: {result['import_ms']:.1f} ms")
+        if stage == 'vhosts' and 'connections' in result:
+            print(f"{'':<10}{result['live']} live over {result['connections']} connections "
+                  f"({result.get('reused', 0)} reuses), {result.get('handshakes', 0)} TLS handshakes "
+                  f"({result.get('resumed', 0)} resumed), {result.get('bytes_sent', 0)} B sent, "
+                  f"{result.get('bytes_received', 0)} B received")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='TakeTheSubs benchmark harness')
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Comma-separated stages ({', '.join(STAGES)})")
+    parser.add_argument('--lines', type=int, default=200000, help='Lines emitted per fake tool')
+    parser.add_argument('--hosts', type=int, default=500, help='Hosts in the HTTP farm')
+    parser.add_argument('--latency', type=float, default=5, help='Mean farm response latency in ms')
+    parser.add_argument('--timeouts', type=float, default=0.01, help='Share of requests the farm never answers')
+    parser.add_argument('--resets', type=float, default=0.01, help='Share of connections the farm resets')
+    parser.add_argument('--https', type=float, default=0.5, help='Share of farm hosts served over TLS')
+    parser.add_argument('--junk', type=float, default=0.05, help='Share of junk lines in tool output')
+    parser.add_argument('--duplicates', type=float, default=0.2, help='Share of repeated names in tool output')
+    parser.add_argument('--out-of-scope', type=float, default=0.05, help='Share of out-of-scope names in tool output')
+    parser.add_argument('--ingest-workers', type=int, default=1,
+                        help='Processes validating tool output in the tools stage (0 = one per core)')
+    parser.add_argument('--formats', default='txt,json', help='Output formats for the save stage')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; the fastest one is reported')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for every generator')
+    parser.add_argument('--module', help='takethesubs.py to benchmark (default: the one next to this script)')
+    parser.add_argument('--rev', help='Benchmark takethesubs.py as of a git revision')
+    parser.add_argument('--against', help='Benchmark a git revision first and compare the working tree with it')
+    parser.add_argument('--baseline', help='Compare with results saved by --save')
+    parser.add_argument('--save', help='Save the results as JSON')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported as a regression')
+    parser.add_argument('--startup-budget', type=float, help='Median --version wall time in ms above which startup regresses')
+    parser.add_argument('--run-stage', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if isinstance(args.stages, str):
+        args.stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    default_module = str(Path(__file__).resolve().parent / 'takethesubs.py')
+
+    # Child mode: run a single stage and print its measurements as JSON
+    if args.run_stage:
+        runner = StageRunner(load_module(args.module or default_module), args, args.workdir)
+        print(json.dumps(runner.run(args.run_stage)))
+        return
+
+    benchmark = Benchmark(args)
+    scratch = tempfile.mkdtemp(prefix='takethesubs-rev-')
+    try:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        if args.against:
+            baseline = benchmark.run(module_at(args.against, tempfile.mkdtemp(dir=scratch)), args.against)
+            print_report(baseline)
+
+        if args.rev:
+            report = benchmark.run(module_at(args.rev, tempfile.mkdtemp(dir=scratch)), args.rev)
+        else:
+            report = benchmark.run(args.module or default_module, 'working tree')
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    regressions = print_report(report, baseline, args.threshold, args.startup_budget)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    if regressions:
+        print(f"\n[-] Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -6,34 +6,62 @@ Version: 2.0.0
 Description: Modern, fast, and comprehensive subdomain enumeration tool
 """
 
-import argparse
-import asyncio
-import json
-import logging
-import os
-#!/usr/bin/env python3
-"""
-TakeTheSubs - Advanced Subdomain Discovery Tool
-Created by: super3lr3y
-Version: 2.0.0
-Description: Modern, fast, and comprehensive subdomain enumeration tool
-"""
+from __future__ import annotations
 
+import abc
 import argparse
-import asyncio
+import collections
+import contextlib
+import contextvars
+import copy
+import csv
+import errno
+import gzip
+import heapq
+import html
+import importlib
+import importlib.util
+import io
+import itertools
 import json
-import logging
+import mmap
 import os
+import re
+import resource
+import shutil
+import signal
+import string
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set, Optional
-import subprocess
-import requests
-from urllib.parse import urlparse
-import yaml
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Set, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+class LazyModule:
+    """Placeholder for a module that is only imported when first used"""
+    
+    def __init__(self, name: str):
+        self._name = name
+    
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._name)
+        # Rebind the global so later lookups go straight to the real module
+        globals()[self._name] = module
+        return getattr(module, attr)
+
+# Heavy or stage-specific modules load on first use, so --version, --help and runs that never
+# probe, resolve or cache don't pay for them
+asyncio = LazyModule('asyncio')
+hmac = LazyModule('hmac')
+ipaddress = LazyModule('ipaddress')
+logging = LazyModule('logging')
+random = LazyModule('random')
+socket = LazyModule('socket')
+sqlite3 = LazyModule('sqlite3')
+ssl = LazyModule('ssl')
+tempfile = LazyModule('tempfile')
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -95,335 +123,4390 @@ class Logger:
         if self.verbose:
             self.logger.info(f"SUCCESS: {message}")
 
+class DomainNormalizer:
+    """Batch normalization, validation and scope filtering of candidate hostnames"""
+    
+    LABEL = r'[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?'
+    LOOSE_LABEL = r'[a-z0-9_-]{1,63}'
+    MAX_ALTERNATION = 32
+    
+    def __init__(self, apexes: Iterable[str] = None):
+        self.apexes = set()
+        for apex in apexes or ():
+            apex = self.normalize(apex)
+            if apex:
+                self.apexes.add(apex)
+        
+        # Small scopes are matched inside the regex; large ones by a suffix lookup afterwards
+        if self.apexes and len(self.apexes) <= self.MAX_ALTERNATION:
+            suffix = '(?:' + '|'.join(re.escape(apex) for apex in sorted(self.apexes, key=len, reverse=True)) + ')'
+            body = rf'(?:{self.LABEL}\.)*{suffix}'
+            loose = rf'(?:{self.LOOSE_LABEL}\.)*{suffix}'
+            self.needs_scope_check = False
+        else:
+            body = rf'(?:{self.LABEL}\.)+{self.LABEL}'
+            loose = rf'(?:{self.LOOSE_LABEL}\.)+{self.LOOSE_LABEL}'
+            self.needs_scope_check = bool(self.apexes)
+        
+        # The line pattern skips the hyphen placement rule, which is much cheaper to check afterwards
+        self.line_pattern = re.compile(rf'^[ \t]*(?:\*\.)?({loose})\.?[ \t]*\r?$\n?', re.MULTILINE)
+        self.name_pattern = re.compile(body)
+    
+    @staticmethod
+    def normalize(name: str) -> Optional[str]:
+        """Lowercase a single name, strip wildcard prefix and trailing dot, convert IDN to punycode"""
+        name = name.strip().lower()
+        if name.startswith('*.'):
+            name = name[2:]
+        name = name.rstrip('.')
+        if not name.isascii():
+            try:
+                name = name.encode('idna').decode('ascii')
+            except UnicodeError:
+                return None
+        return name or None
+    
+    def accepts(self, name: str) -> bool:
+        """Check an already normalized name for syntax and scope"""
+        return (len(name) <= 253 and self.name_pattern.fullmatch(name) is not None
+                and (not self.needs_scope_check or self.in_scope(name)))
+    
+    def is_valid(self, name: str) -> bool:
+        """Normalize and check a single raw name"""
+        name = self.normalize(name) if name else None
+        return bool(name) and self.accepts(name)
+    
+    def in_scope(self, name: str) -> bool:
+        """True if the name is one of the apexes or sits below one of them"""
+        if not self.apexes:
+            return True
+        labels = name.split('.')
+        return any('.'.join(labels[index:]) in self.apexes for index in range(len(labels)))
+    
+    def filter_chunk(self, text: str) -> List[str]:
+        """Extract every valid, in-scope name from a block of newline-separated text"""
+        if not text.isascii():
+            # Rare: route the non-ASCII lines through IDNA one at a time
+            ascii_lines = []
+            found = []
+            for line in text.split('\n'):
+                if line.isascii():
+                    ascii_lines.append(line)
+                else:
+                    name = self.normalize(line)
+                    if name and self.accepts(name):
+                        found.append(name)
+            return found + self.filter_chunk('\n'.join(ascii_lines))
+        
+        found = self.line_pattern.findall(text.lower())
+        if not found:
+            return found
+        if self.needs_scope_check:
+            return [name for name in found if self.accepts(name)]
+        
+        # Only fall back to per-name checks when the block has a misplaced hyphen or an overlong name
+        joined = '\n'.join(found)
+        if (joined[0] == '-' or joined[-1] == '-' or '.-' in joined or '-.' in joined
+                or '\n-' in joined or '-\n' in joined or max(map(len, found)) > 253):
+            return [name for name in found if self.accepts(name)]
+        return found
+    
+    def filter_file(self, path: str, chunk_size: int = 1 << 22) -> Iterator[str]:
+        """Stream valid names from a file in large line-aligned chunks"""
+        with open(path, 'r', errors='replace', newline='') as f:
+            remainder = ''
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                chunk = remainder + chunk
+                cut = chunk.rfind('\n')
+                if cut < 0:
+                    remainder = chunk
+                    continue
+                remainder = chunk[cut + 1:]
+                yield from self.filter_chunk(chunk[:cut])
+            if remainder:
+                yield from self.filter_chunk(remainder)
+
+class NameRun:
+    """Immutable sorted block of newline-terminated keys, held in memory or memory-mapped from disk"""
+    
+    CHUNK = 1 << 20
+    
+    def __init__(self, keys: Iterable[bytes], spill_dir: str = None):
+        self.spilled = bool(spill_dir)
+        if not spill_dir and isinstance(keys, (list, dict)):
+            self.count = len(keys)
+            self.blob = b'\n'.join(keys) + b'\n' if self.count else b''
+            return
+        
+        # Streamed input is written out key by key, to an unlinked temporary file when spilling
+        self.count = 0
+        if spill_dir:
+            fd, path = tempfile.mkstemp(dir=spill_dir, suffix='.run')
+            f = open(fd, 'w+b', buffering=self.CHUNK)
+            os.unlink(path)
+        else:
+            f = io.BytesIO()
+        with f:
+            for key in keys:
+                f.write(key + b'\n')
+                self.count += 1
+            f.flush()
+            if not self.count:
+                self.blob = b''
+            elif spill_dir:
+                # The mapping keeps the file's data reachable after it is closed
+                self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.blob = f.getvalue()
+    
+    @classmethod
+    def from_blob(cls, blob: bytes, count: int) -> 'NameRun':
+        """Wrap keys that were already sorted, deduplicated and joined elsewhere"""
+        run = cls.__new__(cls)
+        run.spilled = False
+        run.blob = blob
+        run.count = count
+        return run
+    
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> 'NameRun':
+        """Sorted, deduplicated run of the store keys of some hostnames"""
+        return cls(sorted(map(SubdomainStore.key, set(names))))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self.blob)
+    
+    def bisect(self, key: bytes) -> int:
+        """Byte offset of the first line not below the given key"""
+        blob = self.blob
+        low, high = 0, len(blob)
+        while low < high:
+            start = blob.rfind(b'\n', low, (low + high) // 2) + 1 or low
+            end = blob.find(b'\n', start)
+            if blob[start:end] < key:
+                low = end + 1
+            else:
+                high = start
+        return low
+    
+    def __contains__(self, key: bytes) -> bool:
+        start = self.bisect(key)
+        return self.blob[start:start + len(key) + 1] == key + b'\n'
+    
+    def keys(self, start: int = 0, stop: int = None) -> Iterator[bytes]:
+        """Iterate keys in sorted order between two line-aligned byte offsets, a chunk at a time"""
+        blob = self.blob
+        stop = len(blob) if stop is None else stop
+        while start < stop:
+            end = stop if start + self.CHUNK >= stop else blob.find(b'\n', start + self.CHUNK) + 1
+            yield from blob[start:end - 1].split(b'\n')
+            start = end
+    
+    def close(self):
+        """Release the mapping of a spilled run"""
+        if self.spilled and self.blob:
+            self.blob.close()
+
+class SubdomainStore:
+    """Deduplicated hostname set kept as sorted runs of reversed-label keys instead of Python strings"""
+    
+    SEPARATOR = '\x01'
+    MERGE_BYTES = 1 << 22
+    MAX_RUNS = 64
+    
+    def __init__(self, names: Iterable[str] = None, buffer_size: int = 65536,
+                 spill_dir: str = None, spill_bytes: int = 1 << 26):
+        self.buffer_size = buffer_size
+        self.spill_dir = spill_dir
+        self.spill_bytes = spill_bytes
+        self.pending = set()
+        self.runs = []
+        if names is not None:
+            self.update(names)
+    
+    @classmethod
+    def key(cls, name: str) -> bytes:
+        """Sort key that groups every name right after its parent: www.example.com -> com\\x01example\\x01www"""
+        labels = name.split('.')
+        labels.reverse()
+        return cls.SEPARATOR.join(labels).encode()
+    
+    @classmethod
+    def name(cls, key: bytes) -> str:
+        """Hostname for a sort key"""
+        labels = key.decode().split(cls.SEPARATOR)
+        labels.reverse()
+        return '.'.join(labels)
+    
+    def add(self, name: str):
+        """Add one name; duplicates are dropped when runs are merged"""
+        self.pending.add(name)
+        if len(self.pending) >= self.buffer_size:
+            self.flush()
+    
+    def update(self, names: Iterable[str]):
+        """Add many names, a buffer-sized slice at a time"""
+        names = iter(names)
+        while True:
+            batch = list(itertools.islice(names, max(1, self.buffer_size - len(self.pending))))
+            if not batch:
+                break
+            self.pending.update(batch)
+            if len(self.pending) >= self.buffer_size:
+                self.flush()
+    
+    def flush(self):
+        """Turn the pending names into a sorted run and merge runs of similar size"""
+        if not self.pending:
+            return
+        keys = sorted(map(self.key, self.pending))
+        self.pending = set()
+        self.runs.append(NameRun(keys))
+        self._settle()
+    
+    def add_run(self, run: NameRun):
+        """Add a sorted, deduplicated run of keys built elsewhere, e.g. by the parallel ingester"""
+        if len(run):
+            self.runs.append(run)
+            self._settle()
+    
+    def _settle(self):
+        # Small runs are folded together as they come; large ones wait for a single k-way merge
+        while len(self.runs) > 1 and self.runs[-2].nbytes + self.runs[-1].nbytes <= self.MERGE_BYTES:
+            newer = self.runs.pop()
+            older = self.runs.pop()
+            self.runs.append(self._merge([older, newer]))
+        if len(self.runs) > self.MAX_RUNS:
+            self.runs = [self._merge(self.runs)]
+    
+    def compact(self):
+        """Merge everything into a single deduplicated run"""
+        self.flush()
+        if len(self.runs) > 1:
+            self.runs = [self._merge(self.runs)]
+    
+    def _merge(self, runs: List[NameRun]) -> NameRun:
+        """Merge sorted runs into one, streamed to disk if the result is large and spilling is enabled"""
+        # Replaced runs are left to the garbage collector so iterators still walking them stay valid
+        nbytes = sum(run.nbytes for run in runs)
+        if nbytes <= self.MERGE_BYTES:
+            # Sorting concatenated runs is a linear merge in C, and dict.fromkeys dedups in order
+            keys = []
+            for run in runs:
+                keys.extend(run.keys())
+            keys.sort()
+            return NameRun(dict.fromkeys(keys))
+        
+        spill = self.spill_dir if self.spill_dir and nbytes >= self.spill_bytes else None
+        if spill:
+            os.makedirs(spill, exist_ok=True)
+        return NameRun(self._unique(heapq.merge(*(run.keys() for run in runs))), spill)
+    
+    @staticmethod
+    def _unique(keys: Iterable[bytes]) -> Iterator[bytes]:
+        """Drop adjacent duplicates from a sorted key stream"""
+        previous = None
+        for key in keys:
+            if key != previous:
+                yield key
+                previous = key
+    
+    def _keys(self, apex: str = None) -> Iterator[bytes]:
+        """Sorted, deduplicated keys, optionally only those at or below an apex"""
+        sources = [sorted(map(self.key, self.pending))]
+        if apex is None:
+            sources.extend(run.keys() for run in self.runs)
+        else:
+            # An apex and its subdomains are contiguous: the apex key, then keys extending it by a separator
+            low = self.key(apex)
+            high = low + b'\x02'
+            sources = [[key for key in sources[0] if low <= key < high]]
+            sources.extend(run.keys(run.bisect(low), run.bisect(high)) for run in self.runs)
+        return self._unique(heapq.merge(*sources))
+    
+    def __iter__(self) -> Iterator[str]:
+        """Names in hierarchical order, each apex followed by everything below it"""
+        return map(self.name, self._keys())
+    
+    def under(self, apex: str) -> Iterator[str]:
+        """Names equal to or below an apex, without touching the rest of the store"""
+        return map(self.name, self._keys(apex))
+    
+    def restrict(self, apex: str) -> 'SubdomainStore':
+        """Drop every name outside an apex, in place"""
+        self.compact()
+        if self.runs:
+            run = self.runs[0]
+            low = self.key(apex)
+            start, stop = run.bisect(low), run.bisect(low + b'\x02')
+            if start or stop < run.nbytes:
+                if run.spilled:
+                    self.runs = [NameRun(run.keys(start, stop), self.spill_dir)]
+                else:
+                    self.runs = [NameRun(list(run.keys(start, stop)))]
+        return self
+    
+    def difference(self, other: Iterable[str]) -> Iterator[str]:
+        """Names in this store but not in the other, walking both sorted streams in step"""
+        if not isinstance(other, SubdomainStore):
+            return (name for name in self if name not in other)
+        return map(self.name, self._difference(other))
+    
+    def _difference(self, other: 'SubdomainStore') -> Iterator[bytes]:
+        theirs = other._keys()
+        current = next(theirs, None)
+        for key in self._keys():
+            while current is not None and current < key:
+                current = next(theirs, None)
+            if key != current:
+                yield key
+    
+    def __contains__(self, name: str) -> bool:
+        if name in self.pending:
+            return True
+        key = self.key(name)
+        return any(key in run for run in self.runs)
+    
+    def __len__(self) -> int:
+        self.compact()
+        return len(self.runs[0]) if self.runs else 0
+    
+    def __bool__(self) -> bool:
+        return bool(self.pending) or any(len(run) for run in self.runs)
+    
+    def close(self):
+        """Release every run"""
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self.pending = set()
+
+# Normalizers of a pool worker process, by scope
+_WORKER_NORMALIZERS = {}
+
+def _ingest_range(path: str, start: int, stop: int, apexes: Tuple[str, ...]) -> Tuple[bytes, int]:
+    """Pool task: sorted, deduplicated store keys of the valid names in one line-aligned byte range of a file"""
+    normalizer = _WORKER_NORMALIZERS.get(apexes)
+    if normalizer is None:
+        normalizer = _WORKER_NORMALIZERS[apexes] = DomainNormalizer(apexes)
+    found = set()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+        while start < stop:
+            end = stop
+            if stop - start > ParallelIngester.BLOCK:
+                end = blob.rfind(b'\n', start, start + ParallelIngester.BLOCK) + 1 or stop
+            found.update(normalizer.filter_chunk(blob[start:end].decode(errors='replace')))
+            start = end
+    keys = sorted(map(SubdomainStore.key, found))
+    return (b'\n'.join(keys) + b'\n' if keys else b''), len(keys)
+
+def _merge_keys(blobs: List[bytes]) -> Tuple[bytes, int]:
+    """Pool task: merge sorted key blocks into one without duplicates"""
+    keys = []
+    for blob in blobs:
+        keys.extend(blob.split(b'\n')[:-1])
+    # Sorting concatenated sorted runs is a linear merge in C, and dict.fromkeys dedups in order
+    keys.sort()
+    keys = dict.fromkeys(keys)
+    return (b'\n'.join(keys) + b'\n' if keys else b''), len(keys)
+
+class ParallelIngester:
+    """Validates, normalizes and deduplicates tool output files on a process pool, a byte range per task"""
+    
+    BLOCK = 1 << 22
+    
+    def __init__(self, workers: int = 0, chunk_size: int = 1 << 25):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(chunk_size, 1 << 16)
+        self.pool = None
+    
+    def executor(self):
+        """The process pool, started on first use"""
+        if self.pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # Forked workers inherit the loaded module instead of importing it again
+            method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method))
+        return self.pool
+    
+    def ranges(self, path: str, start: int = 0, final: bool = True) -> List[Tuple[int, int]]:
+        """Split a file from an offset into chunk-sized ranges that end on line boundaries"""
+        size = self._size(path)
+        ranges = []
+        if size <= start:
+            return ranges
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+            size = len(blob)
+            while start < size:
+                end = min(start + self.chunk_size, size)
+                # A file that is still being written may end in the middle of a line; leave that for later
+                if end < size or not final:
+                    cut = blob.rfind(b'\n', start, end)
+                    if cut < 0:
+                        cut = blob.find(b'\n', end, size)
+                    if cut < 0:
+                        break
+                    end = cut + 1
+                ranges.append((start, end))
+                start = end
+        return ranges
+    
+    def dispatch(self, path: str, apexes: Tuple[str, ...], start: int = 0,
+                 final: bool = True) -> Tuple[List[asyncio.Future], int]:
+        """Submit the ranges of a file from an offset; return their futures and the offset reached"""
+        futures = []
+        for range_start, range_end in self.ranges(path, start, final):
+            futures.append(asyncio.wrap_future(
+                self.executor().submit(_ingest_range, path, range_start, range_end, apexes)))
+            start = range_end
+        return futures, start
+    
+    async def collect(self, futures: List[asyncio.Future]) -> NameRun:
+        """Wait for dispatched ranges and merge their keys into one run"""
+        parts = [part for part in await asyncio.gather(*futures) if part[1]]
+        if len(parts) > 1:
+            parts = [await asyncio.wrap_future(
+                self.executor().submit(_merge_keys, [blob for blob, _ in parts]))]
+        return NameRun.from_blob(*parts[0]) if parts else NameRun([])
+    
+    async def ingest(self, path: str, apexes: Tuple[str, ...]) -> NameRun:
+        """Valid, in-scope names of a whole file as one run"""
+        futures, _ = self.dispatch(path, apexes)
+        return await self.collect(futures)
+    
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+    
+    def close(self):
+        """Stop the worker processes"""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
 class SubdomainTool:
     """Base class for subdomain enumeration tools"""
     
-    def __init__(self, name: str, command: str, output_parser=None):
+    READ_SIZE = 1 << 16
+    MAX_LINE = 1 << 20
+    validator = DomainNormalizer()
+    spawns_process = True
+    
+    def __init__(self, name: str, command: str, output_parser=None, version_args: List[str] = None):
         self.name = name
         self.command = command
         self.output_parser = output_parser or self.default_parser
+        self.version_args = version_args
+        self.binary = command.split()[0]
+        self.binary_path = None
     
     def is_installed(self) -> bool:
         """Check if tool is installed"""
-        try:
-            subprocess.run([self.command.split()[0], '--help'], 
-                         capture_output=True, check=False, timeout=5)
-            return True
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        if self.binary_path is None:
+            self.binary_path = shutil.which(self.binary)
+        return self.binary_path is not None
     
-    def run(self, target: str, output_file: str, **kwargs) -> Set[str]:
-        """Run the tool and return discovered subdomains"""
-        if not self.is_installed():
+    def build_command(self, target: str, output_file: str, **kwargs) -> List[str]:
+        """Format the command line, using the resolved binary path when known"""
+        argv = self.command.format(target=target, output=output_file, **kwargs).split()
+        if self.binary_path:
+            argv[0] = self.binary_path
+        return argv
+    
+    async def run_async(self, target: str, output_file: str, timeout: int = 300,
+                        outcome: Dict = None, **kwargs) -> Set[str]:
+        """Run the tool as an asyncio subprocess and return discovered subdomains"""
+        outcome = {} if outcome is None else outcome
+        outcome['status'] = 'missing'
+        cmd = self.build_command(target, output_file, **kwargs)
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except FileNotFoundError:
+            return set()
+        
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._terminate(process)
+            outcome['status'] = 'timeout'
             return set()
+        except asyncio.CancelledError:
+            await self._terminate(process)
+            raise
         
-        cmd = self.command.format(target=target, output=output_file, **kwargs)
+        if process.returncode == 0:
+            outcome['status'] = 'ok'
+            return self.output_parser(output_file, stdout.decode(errors='replace'))
+        outcome['status'] = 'failed'
+        return set()
+    
+    async def stream(self, target: str, output_file: str, timeout: int = 300,
+                     seen: Set[str] = None, outcome: Dict = None, idle_timeout: float = 0,
+                     **kwargs) -> AsyncIterator[str]:
+        """Yield new subdomains from the tool's stdout as they are printed, stopping it once it goes idle"""
+        seen = set() if seen is None else seen
+        outcome = {} if outcome is None else outcome
+        outcome['status'] = 'missing'
+        
+        # Custom parsers need the complete output, so they stay buffered
+        if self.output_parser != self.default_parser:
+            for subdomain in await self.run_async(target, output_file, timeout=timeout,
+                                                  outcome=outcome, **kwargs):
+                if subdomain not in seen:
+                    seen.add(subdomain)
+                    yield subdomain
+            return
+        
+        cmd = self.build_command(target, output_file, **kwargs)
         
         try:
-            result = subprocess.run(
-                cmd.split(),
-                capture_output=True,
-                text=True,
-                timeout=300,
-                check=False
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True
             )
-            
-            if result.returncode == 0:
-                return self.output_parser(output_file, result.stdout)
-            else:
-                return set()
+        except FileNotFoundError:
+            return
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        idle_deadline = loop.time() + idle_timeout if idle_timeout else None
+        file_size = 0
+        idle = False
+        normalizer = DomainNormalizer([target])
+        from_stdout = 0
+        buffer = b''
+        
+        try:
+            while True:
+                wait = deadline - loop.time()
+                if idle_deadline is not None:
+                    wait = min(wait, idle_deadline - loop.time())
+                try:
+                    chunk = await asyncio.wait_for(process.stdout.read(self.READ_SIZE), timeout=max(0, wait))
+                except asyncio.TimeoutError:
+                    if idle_deadline is None or loop.time() >= deadline:
+                        raise
+                    # Tools that only write their output file are active for as long as it grows
+                    size = self._file_size(output_file)
+                    if size > file_size:
+                        file_size = size
+                        idle_deadline = loop.time() + idle_timeout
+                        continue
+                    idle = True
+                    break
+                if chunk:
+                    buffer += chunk
+                    cut = buffer.rfind(b'\n')
+                    if cut < 0:
+                        if len(buffer) > self.MAX_LINE:
+                            # A line this long can't be a domain
+                            buffer = b''
+                        continue
+                    block, buffer = buffer[:cut], buffer[cut + 1:]
+                else:
+                    block, buffer = buffer, b''
                 
-        except subprocess.TimeoutExpired:
-            return set()
+                # Validate and scope a whole block of lines in one pass
+                found = from_stdout
+                for subdomain in normalizer.filter_chunk(block.decode(errors='replace')):
+                    if subdomain not in seen:
+                        seen.add(subdomain)
+                        from_stdout += 1
+                        yield subdomain
+                if idle_deadline is not None and from_stdout > found:
+                    idle_deadline = loop.time() + idle_timeout
+                if not chunk:
+                    break
+            if not idle:
+                await asyncio.wait_for(process.wait(), timeout=max(0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            outcome['status'] = 'timeout'
+            return
+        finally:
+            await self._terminate(process)
+        
+        # A tool stopped for going idle had nothing more to offer, so its output counts as complete
+        if idle:
+            outcome['status'] = 'idle'
+        else:
+            outcome['status'] = 'ok' if process.returncode == 0 else 'failed'
+        
+        # Tools that only write to their output file print nothing useful on stdout
+        if not from_stdout:
+            for subdomain in self.iter_file(output_file, normalizer):
+                if subdomain not in seen:
+                    seen.add(subdomain)
+                    yield subdomain
     
-    def default_parser(self, output_file: str, stdout: str = "") -> Set[str]:
-        """Default output parser - reads line by line"""
-        subdomains = set()
+    async def spool(self, target: str, output_file: str, ingester: ParallelIngester, timeout: int = 300,
+                    outcome: Dict = None, idle_timeout: float = 0, poll: float = 0.25, **kwargs) -> NameRun:
+        """Run the tool with stdout going straight to a file, ingesting it on the process pool as it grows"""
+        outcome = {} if outcome is None else outcome
+        outcome['status'] = 'missing'
+        cmd = self.build_command(target, output_file, **kwargs)
+        stdout_file = f"{output_file}.stdout"
+        apexes = (target,)
+        futures = []
         
-        # Try to read from output file first
         try:
-            with open(output_file, 'r') as f:
-                for line in f:
-                    subdomain = line.strip()
-                    if subdomain and self.is_valid_domain(subdomain):
-                        subdomains.add(subdomain)
+            try:
+                with open(stdout_file, 'wb') as stdout:
+                    process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        stdout=stdout,
+                        stderr=asyncio.subprocess.DEVNULL,
+                        start_new_session=True
+                    )
+            except FileNotFoundError:
+                return NameRun([])
+            
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            idle_deadline = loop.time() + idle_timeout if idle_timeout else None
+            sizes = (0, 0)
+            offset = 0
+            idle = False
+            
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=max(0, min(poll, deadline - loop.time())))
+                        break
+                    except asyncio.TimeoutError:
+                        if loop.time() >= deadline:
+                            raise
+                    # Either output growing counts as activity, since some tools only write their file
+                    current = (self._file_size(stdout_file), self._file_size(output_file))
+                    if current != sizes:
+                        sizes = current
+                        if idle_deadline is not None:
+                            idle_deadline = loop.time() + idle_timeout
+                    elif idle_deadline is not None and loop.time() >= idle_deadline:
+                        idle = True
+                        break
+                    # Start on complete chunks while the tool is still writing
+                    if current[0] - offset >= ingester.chunk_size:
+                        started, offset = ingester.dispatch(stdout_file, apexes, offset, final=False)
+                        futures.extend(started)
+            except asyncio.TimeoutError:
+                outcome['status'] = 'timeout'
+            finally:
+                await self._terminate(process)
+            
+            if outcome['status'] != 'timeout':
+                outcome['status'] = 'idle' if idle else ('ok' if process.returncode == 0 else 'failed')
+            started, _ = ingester.dispatch(stdout_file, apexes, offset)
+            run = await ingester.collect(futures + started)
+            
+            # Tools that only write to their output file print nothing useful on stdout
+            if not len(run):
+                run = await ingester.ingest(output_file, apexes)
+            return run
+        finally:
+            for future in futures:
+                future.cancel()
+            with contextlib.suppress(OSError):
+                os.unlink(stdout_file)
+    
+    def iter_file(self, output_file: str, normalizer: DomainNormalizer = None) -> Iterator[str]:
+        """Yield valid subdomains from an output file without loading it whole"""
+        try:
+            yield from (normalizer or self.validator).filter_file(output_file)
         except FileNotFoundError:
-            pass
+            return
+    
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+    
+    @staticmethod
+    async def _terminate(process):
+        """Kill a child process group and reap it"""
+        if process.returncode is None:
+            try:
+                # Tools run in their own session, so wrappers and their children die together
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        await process.wait()
+    
+    def default_parser(self, output_file: str, stdout: str = "") -> Set[str]:
+        """Default output parser - reads line by line"""
+        # Try to read from output file first
+        subdomains = set(self.iter_file(output_file))
         
         # If no file output, parse stdout
         if not subdomains and stdout:
-            for line in stdout.split('\n'):
-                subdomain = line.strip()
-                if subdomain and self.is_valid_domain(subdomain):
-                    subdomains.add(subdomain)
+            subdomains.update(self.validator.filter_chunk(stdout))
         
         return subdomains
     
-    @staticmethod
-    def is_valid_domain(domain: str) -> bool:
+    @classmethod
+    def is_valid_domain(cls, domain: str) -> bool:
         """Validate domain format"""
-        if not domain or len(domain) > 253:
-            return False
+        return cls.validator.is_valid(domain)
+
+class ToolRegistry:
+    """Resolve tool binaries once and share the result across targets"""
+    
+    VERSION_PATTERN = re.compile(r'v?\d+(?:\.\d+)+')
+    
+    def __init__(self, probe_timeout: int = 5):
+        self.probe_timeout = probe_timeout
+        self.entries = {}
+    
+    async def resolve(self, tools: Dict[str, SubdomainTool], refresh: bool = False) -> Dict[str, Dict]:
+        """Look up path and version of each tool, probing only unknown tools unless refreshing"""
+        pending = {name: tool for name, tool in tools.items() if refresh or name not in self.entries}
+        if pending:
+            self.entries.update(await self._probe_all(pending))
+        
+        for name, tool in tools.items():
+            tool.binary_path = self.entries[name]['path']
+        return {name: self.entries[name] for name in tools}
+    
+    async def installed(self, tools: Dict[str, SubdomainTool],
+                        refresh: bool = False) -> Dict[str, SubdomainTool]:
+        """Return only the tools whose binary was found"""
+        entries = await self.resolve(tools, refresh=refresh)
+        return {name: tool for name, tool in tools.items() if entries[name]['path']}
+    
+    async def _probe_all(self, tools: Dict[str, SubdomainTool]) -> Dict[str, Dict]:
+        """Probe every tool in parallel"""
+        names = list(tools)
+        entries = await asyncio.gather(*(self._probe(tools[name]) for name in names))
+        return dict(zip(names, entries))
+    
+    async def _probe(self, tool: SubdomainTool) -> Dict:
+        """Resolve a tool on PATH and ask it for its version"""
+        path = shutil.which(tool.binary)
+        entry = {'binary': tool.binary, 'path': path, 'version': None}
+        if not path or not tool.version_args:
+            return entry
         
-        # Basic domain validation
-        parts = domain.split('.')
-        if len(parts) < 2:
-            return False
+        try:
+            process = await asyncio.create_subprocess_exec(
+                path, *tool.version_args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True
+            )
+        except OSError:
+            return entry
         
-        for part in parts:
-            if not part or len(part) > 63:
-                return False
-            if not part.replace('-', '').replace('_', '').isalnum():
-                return False
+        try:
+            output, _ = await asyncio.wait_for(process.communicate(), timeout=self.probe_timeout)
+        except asyncio.TimeoutError:
+            await SubdomainTool._terminate(process)
+            return entry
         
-        return True
+        match = self.VERSION_PATTERN.search(output.decode(errors='replace'))
+        if match:
+            entry['version'] = match.group(0).lstrip('v')
+        return entry
 
-class TakeTheSubs:
-    """Main TakeTheSubs class"""
+class RunLimits:
+    """Concurrency limits shared by every target of a run"""
     
-    def __init__(self, config_file: str = None):
-        self.version = "2.0.0"
-        self.author = "super3lr3y"
-        self.config = self.load_config(config_file)
-        self.logger = Logger(verbose=self.config.get('verbose', False))
-        self.tools = self.initialize_tools()
-        self.results = {
-            'target': '',
-            'start_time': '',
-            'end_time': '',
-            'total_subdomains': 0,
-            'live_subdomains': 0,
-            'tools_used': [],
-            'subdomains': set(),
-            'live_hosts': set()
+    def __init__(self, max_processes: int = None, max_probes: int = None,
+                 tool_limits: Dict[str, int] = None):
+        self.processes = asyncio.Semaphore(max_processes) if max_processes else None
+        self.probes = asyncio.Semaphore(max_probes) if max_probes else None
+        self.tools = {name: asyncio.Semaphore(limit) for name, limit in (tool_limits or {}).items() if limit}
+    
+    def process_slot(self):
+        """Hold one of the global child process slots"""
+        return self.processes or contextlib.nullcontext()
+    
+    def tool_slot(self, tool_name: str):
+        """Hold one of the slots reserved for a specific tool"""
+        return self.tools.get(tool_name) or contextlib.nullcontext()
+
+class RunMetrics:
+    """Wall/CPU time, item and failure counts per stage, and latency histograms, for one run"""
+    
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    
+    def __init__(self, max_records: int = 0):
+        self.start_time = datetime.now().isoformat()
+        self.started = time.monotonic()
+        # A long-lived service keeps only the latest records; totals cover everything
+        self.stages = collections.deque(maxlen=max_records) if max_records else []
+        self.stage_totals = {}
+        self.histograms = {}
+        self.counters = collections.Counter()
+    
+    def start(self, stage: str, target: str = '', name: str = '') -> Dict:
+        """Open a stage record; pass it to finish() once the work is done"""
+        return {
+            'stage': stage,
+            'target': target,
+            'name': name,
+            'status': 'ok',
+            'offset': round(time.monotonic() - self.started, 6),
+            'wall': 0.0,
+            'cpu': 0.0,
+            'items': 0,
+            'errors': 0,
+            'timeouts': 0,
+            '_wall': time.monotonic(),
+            '_cpu': time.process_time()
         }
     
-    def load_config(self, config_file: str) -> Dict:
-        """Load configuration from file"""
-        default_config = {
-            'output_dir': './results',
-            'threads': 50,
-            'timeout': 300,
-            'verify_ssl': False,
-            'user_agent': 'TakeTheSubs/2.0',
-            'tools': {
-                'subfinder': True,
-                'amass': True,
-                'assetfinder': True,
-                'findomain': True,
-                'chaos': False,
-                'github_search': False
-            },
-            'apis': {
-                'shodan': '',
-                'virustotal': '',
-                'github_token': ''
+    def finish(self, record: Dict, status: str = None) -> Dict:
+        """Close a stage record and keep it"""
+        record['wall'] = round(time.monotonic() - record.pop('_wall'), 6)
+        record['cpu'] = round(time.process_time() - record.pop('_cpu'), 6)
+        if status:
+            record['status'] = status
+        self.stages.append(record)
+        
+        total = self.stage_totals.setdefault((record['stage'], record['name']), {
+            'runs': 0, 'wall': 0.0, 'cpu': 0.0, 'items': 0, 'errors': 0, 'timeouts': 0
+        })
+        total['runs'] += 1
+        for field in ('wall', 'cpu', 'items', 'errors', 'timeouts'):
+            total[field] += record[field]
+        return record
+    
+    def record(self, stage: str, target: str = '', name: str = '', status: str = 'ok', **counts) -> Dict:
+        """Keep a record for work that took no measurable time, such as a cache hit"""
+        record = self.start(stage, target, name)
+        record.update(counts)
+        return self.finish(record, status)
+    
+    @contextlib.contextmanager
+    def stage(self, stage: str, target: str = '', name: str = ''):
+        """Time a block of work; the yielded record takes its items, errors and timeouts"""
+        record = self.start(stage, target, name)
+        try:
+            yield record
+        except BaseException as e:
+            record['status'] = 'cancelled' if isinstance(e, asyncio.CancelledError) else 'error'
+            raise
+        finally:
+            self.finish(record)
+    
+    def add(self, counter: str, value: int = 1):
+        """Increase a run-wide counter"""
+        self.counters[counter] += value
+    
+    def observe(self, histogram: str, value: float):
+        """Add one observation to a fixed-bucket histogram"""
+        entry = self.histograms.get(histogram)
+        if entry is None:
+            entry = self.histograms[histogram] = {'buckets': [0] * len(self.LATENCY_BUCKETS), 'sum': 0.0, 'count': 0}
+        for index, bound in enumerate(self.LATENCY_BUCKETS):
+            if value <= bound:
+                entry['buckets'][index] += 1
+                break
+        entry['sum'] += value
+        entry['count'] += 1
+    
+    def report(self) -> Dict:
+        """The structured run report"""
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        histograms = {}
+        for name, entry in self.histograms.items():
+            cumulative = list(itertools.accumulate(entry['buckets']))
+            histograms[name] = {
+                'buckets': {str(float(bound)): count for bound, count in zip(self.LATENCY_BUCKETS, cumulative)},
+                'sum': round(entry['sum'], 6),
+                'count': entry['count']
             }
+        return {
+            'start_time': self.start_time,
+            'end_time': datetime.now().isoformat(),
+            'elapsed': round(time.monotonic() - self.started, 6),
+            'cpu': round(usage.ru_utime + usage.ru_stime, 6),
+            'children_cpu': round(children.ru_utime + children.ru_stime, 6),
+            'peak_rss_kib': usage.ru_maxrss,
+            'totals': [dict(stage=stage, name=name, **total) for (stage, name), total in self.stage_totals.items()],
+            'stages': list(self.stages),
+            'counters': dict(self.counters),
+            'histograms': histograms
         }
-        
-        if config_file and os.path.exists(config_file):
-            try:
-                with open(config_file, 'r') as f:
-                    user_config = yaml.safe_load(f)
-                    default_config.update(user_config)
-            except Exception as e:
-                print(f"Error loading config: {e}")
-        
-        return default_config
     
-    def initialize_tools(self) -> Dict[str, SubdomainTool]:
-        """Initialize subdomain enumeration tools"""
-        tools = {}
+    def write_report(self, path: str):
+        """Write the run report as JSON"""
+        with AtomicOutput(path) as f:
+            json.dump(self.report(), f, indent=2)
+    
+    @staticmethod
+    def _labels(**labels) -> str:
+        """Format a label set, escaping values as the exposition format requires"""
+        pairs = []
+        for key, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{value}"')
+        return '{' + ','.join(pairs) + '}'
+    
+    def exposition(self, openmetrics: bool = False) -> str:
+        """Render the run in the Prometheus text format, or OpenMetrics"""
+        report = self.report()
+        lines = []
         
-        # Subfinder
-        if self.config['tools']['subfinder']:
-            tools['subfinder'] = SubdomainTool(
-                'Subfinder',
-                'subfinder -d {target} -o {output} -silent'
-            )
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP takethesubs_{name} {help_text}")
+            lines.append(f"# TYPE takethesubs_{name} {kind}")
         
-        # Amass
-        if self.config['tools']['amass']:
-            tools['amass'] = SubdomainTool(
-                'Amass',
-                'amass enum -passive -d {target} -o {output}'
-            )
+        family('run_duration_seconds', 'gauge', 'Wall time of the last run')
+        lines.append(f"takethesubs_run_duration_seconds {report['elapsed']}")
+        family('run_cpu_seconds', 'gauge', 'CPU time of the last run, by process')
+        lines.append(f"takethesubs_run_cpu_seconds{self._labels(process='main')} {report['cpu']}")
+        lines.append(f"takethesubs_run_cpu_seconds{self._labels(process='children')} {report['children_cpu']}")
+        family('run_peak_rss_bytes', 'gauge', 'Peak resident set size of the last run')
+        lines.append(f"takethesubs_run_peak_rss_bytes {report['peak_rss_kib'] * 1024}")
         
-        # Assetfinder
-        if self.config['tools']['assetfinder']:
-            tools['assetfinder'] = SubdomainTool(
-                'Assetfinder',
-                'assetfinder --subs-only {target}'
-            )
+        for field, help_text in (('runs', 'Stage executions'),
+                                 ('wall', 'Wall time spent in a stage, in seconds'),
+                                 ('cpu', 'CPU time of this process during a stage, in seconds'),
+                                 ('items', 'Items produced or processed by a stage'),
+                                 ('errors', 'Failures in a stage'),
+                                 ('timeouts', 'Timeouts in a stage')):
+            name = f"stage_{field}_seconds" if field in ('wall', 'cpu') else f"stage_{field}"
+            # Stage totals only grow over a run, so they are counters: the family is declared
+            # without the suffix and each sample carries _total
+            family(name, 'counter', help_text)
+            for total in report['totals']:
+                labels = self._labels(stage=total['stage'], name=total['name'])
+                lines.append(f"takethesubs_{name}_total{labels} {round(total[field], 6)}")
         
-        # Findomain
-        if self.config['tools']['findomain']:
-            tools['findomain'] = SubdomainTool(
-                'Findomain',
-                'findomain -t {target} -o'
-            )
+        for name, value in sorted(report['counters'].items()):
+            family(name, 'counter', name.replace('_', ' ').capitalize())
+            lines.append(f"takethesubs_{name}_total {value}")
         
-        return tools
+        for name, entry in report['histograms'].items():
+            family(name, 'histogram', f"Distribution of {name.replace('_', ' ')}")
+            for bound, count in entry['buckets'].items():
+                lines.append(f"takethesubs_{name}_bucket{self._labels(le=bound)} {count}")
+            lines.append(f"takethesubs_{name}_bucket{self._labels(le='+Inf')} {entry['count']}")
+            lines.append(f"takethesubs_{name}_sum {entry['sum']}")
+            lines.append(f"takethesubs_{name}_count {entry['count']}")
+        
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
     
-    def # Banner removed to fix double display(self):
-        """Print tool banner"""
-        banner = f"""
-{Colors.CYAN}
-████████╗ █████╗ ██╗  ██╗███████╗████████╗██╗  ██╗███████╗███████╗██╗   ██╗██████╗ ███████╗
-╚══██╔══╝██╔══██╗██║ ██╔╝██╔════╝╚══██╔══╝██║  ██║██╔════╝██╔════╝██║   ██║██╔══██╗██╔════╝
-   ██║   ███████║█████╔╝ █████╗     ██║   ███████║█████╗  ███████╗██║   ██║██████╔╝███████╗
-   ██║   ██╔══██║██╔═██╗ ██╔══╝     ██║   ██╔══██║██╔══╝  ╚════██║██║   ██║██╔══██╗╚════██║
-   ██║   ██║  ██║██║  ██╗███████╗   ██║   ██║  ██║███████╗███████║╚██████╔╝██████╔╝███████║
-   ╚═╝   ╚═╝  ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝   ╚═╝  ╚═╝╚══════╝╚══════╝ ╚═════╝ ╚═════╝ ╚══════╝
+    def write_metrics(self, path: str, openmetrics: bool = False):
+        """Write the run as a textfile for a Prometheus/OpenMetrics scraper, replacing it atomically"""
+        with AtomicOutput(path) as f:
+            f.write(self.exposition(openmetrics))
 
-                    🎯 Advanced Subdomain Discovery Tool 🎯
-                         Created by: {self.author}
-                            Version: {self.version}
-                    🚀 Take All The Subdomains! 🚀
-{Colors.END}
-"""
-        print(banner)
+class ToolCache:
+    """SQLite cache of tool output keyed by tool, target, tool version and arguments"""
     
-    def run_tool(self, tool_name: str, tool: SubdomainTool, target: str, output_dir: str) -> Set[str]:
-        """Run a single enumeration tool"""
-        try:
-            self.logger.info(f"Running {tool_name} on {target}")
-            output_file = os.path.join(output_dir, f"{tool_name}_{target}.txt")
-            
-            subdomains = tool.run(target, output_file)
-            self.logger.success(f"{tool_name} found {len(subdomains)} subdomains")
-            
-            return subdomains
-            
-        except Exception as e:
-            self.logger.error(f"{tool_name} failed: {str(e)}")
-            return set()
+    # Stored in user_version; version 2 keeps each output as a compressed NameRun blob instead of plain names
+    SCHEMA = 2
     
-    def verify_subdomains(self, subdomains: Set[str]) -> Set[str]:
-        """Verify which subdomains are live"""
-        self.logger.info(f"Verifying {len(subdomains)} subdomains...")
-        live_hosts = set()
+    def __init__(self, path: str, ttl: int = 86400, max_entries: int = 0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Lookups by target, so a target sharing the cache with concurrent ones can report its own
+        self.lookups = collections.Counter()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != self.SCHEMA:
+            # Entries in an older layout can't be read back as runs, and a cache may simply start over
+            self.db.execute('DROP TABLE IF EXISTS tool_output')
+            self.db.execute(f'PRAGMA user_version = {self.SCHEMA}')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS tool_output ('
+            'tool TEXT, target TEXT, version TEXT, args TEXT, '
+            'created REAL, count INTEGER, data BLOB, '
+            'PRIMARY KEY (tool, target, version, args))'
+        )
+        self.evict()
+    
+    def get(self, tool: str, target: str, version: str, args: str) -> Optional[NameRun]:
+        """Return the cached run of subdomains if the entry exists and is still fresh"""
+        row = self.db.execute(
+            'SELECT created, count, data FROM tool_output WHERE tool=? AND target=? AND version=? AND args=?',
+            (tool, target, version or '', args)
+        ).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            self.misses += 1
+            self.lookups[target, 'misses'] += 1
+            return None
+        
+        self.hits += 1
+        self.lookups[target, 'hits'] += 1
+        return NameRun.from_blob(zlib.decompress(row[2]), row[1])
+    
+    def put(self, tool: str, target: str, version: str, args: str, run: NameRun):
+        """Store a tool's output for a target"""
+        self.db.execute(
+            'INSERT OR REPLACE INTO tool_output VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (tool, target, version or '', args, time.time(), len(run), zlib.compress(run.blob))
+        )
+        self.db.commit()
+    
+    def evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        self.db.execute('DELETE FROM tool_output WHERE created < ?', (time.time() - self.ttl,))
+        if self.max_entries:
+            self.db.execute(
+                'DELETE FROM tool_output WHERE rowid NOT IN '
+                '(SELECT rowid FROM tool_output ORDER BY created DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+        self.db.commit()
+    
+    def stats(self, target: str = None) -> Dict[str, int]:
+        """Hit/miss counters since the cache was opened, for every target or just one"""
+        if target is not None:
+            return {'hits': self.lookups[target, 'hits'], 'misses': self.lookups[target, 'misses']}
+        return {'hits': self.hits, 'misses': self.misses}
+    
+    def close(self):
+        """Close the database"""
+        self.db.close()
+
+class DeltaStore:
+    """SQLite record of the subdomains and live hosts known per target, used to diff runs"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.last_run = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS known ('
+            'target TEXT, kind TEXT, name TEXT, first_seen INTEGER, last_seen INTEGER, '
+            'PRIMARY KEY (target, kind, name)) WITHOUT ROWID'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS known_first ON known (target, kind, first_seen)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS known_last ON known (target, kind, last_seen)')
+        self.db.commit()
+    
+    def _run_id(self) -> int:
+        """Monotonic stamp identifying one update"""
+        self.last_run = max(int(time.time() * 1000), self.last_run + 1)
+        return self.last_run
+    
+    def update(self, target: str, kind: str, names: Iterable[str], complete: bool = True) -> Dict[str, List[str]]:
+        """Record the names seen in this run and return what was added (and removed, if complete)"""
+        run = self._run_id()
+        self.db.executemany(
+            'INSERT INTO known VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT (target, kind, name) DO UPDATE SET last_seen = excluded.last_seen',
+            ((target, kind, name, run, run) for name in names)
+        )
+        
+        # Both lookups go through an index, so the cost follows the size of the change
+        added = [row[0] for row in self.db.execute(
+            'SELECT name FROM known WHERE target=? AND kind=? AND first_seen=?', (target, kind, run)
+        )]
+        removed = []
+        if complete:
+            removed = [row[0] for row in self.db.execute(
+                'SELECT name FROM known WHERE target=? AND kind=? AND last_seen<?', (target, kind, run)
+            )]
+            self.db.execute(
+                'DELETE FROM known WHERE target=? AND kind=? AND last_seen<?', (target, kind, run)
+            )
+        self.db.commit()
+        return {'added': sorted(added), 'removed': sorted(removed)}
+    
+    def close(self):
+        """Close the database"""
+        self.db.close()
+
+class CheckpointJournal:
+    """Append-only NDJSON journal of finished tools, probes and targets, used to resume runs"""
+    
+    def __init__(self, path: str, resume: bool = False, flush_every: int = 1000,
+                 flush_interval: float = 1.0):
+        self.path = path
+        self.spool_dir = f"{path}.d"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.targets_done = set()
+        self.tools_done = {}
+        self.probed = {}
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if resume:
+            self.load()
+        else:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+        self.file = open(path, 'a' if resume else 'w')
+    
+    def load(self):
+        """Rebuild the completed-work state from an existing journal"""
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The last line may be cut short if the previous run died mid-write
+                        continue
+                    kind = entry.get('type')
+                    if kind == 'target':
+                        self.targets_done.add(entry['target'])
+                    elif kind == 'tool':
+                        self.tools_done[(entry['target'], entry['tool'])] = entry['file']
+                    elif kind == 'probe':
+                        self.probed.setdefault(entry['target'], {})[entry['host']] = entry.get('result')
+        except FileNotFoundError:
+            pass
+    
+    def record(self, entry: Dict):
+        """Append one entry, flushing in batches to keep per-record cost low"""
+        self.file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.unflushed += 1
+        if (self.unflushed >= self.flush_every
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+    
+    def tool_done(self, target: str, tool: str, run: NameRun):
+        """Spool a finished tool's run of keys to disk and journal it"""
+        spool_file = os.path.join(self.spool_dir, target, f"{tool}.keys")
+        os.makedirs(os.path.dirname(spool_file), exist_ok=True)
+        with open(f"{spool_file}.tmp", 'wb') as f:
+            f.write(run.blob)
+        os.replace(f"{spool_file}.tmp", spool_file)
+        self.tools_done[(target, tool)] = spool_file
+        self.record({'type': 'tool', 'target': target, 'tool': tool, 'file': spool_file})
+    
+    def tool_output(self, target: str, tool: str) -> Optional[NameRun]:
+        """Return the spooled run of a tool that finished in an earlier run"""
+        spool_file = self.tools_done.get((target, tool))
+        if spool_file is None:
+            return None
+        try:
+            with open(spool_file, 'rb') as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+        return NameRun.from_blob(blob, blob.count(b'\n'))
+    
+    def probe_done(self, target: str, result: Dict):
+        """Journal the outcome of one HTTP probe"""
+        self.probed.setdefault(target, {})[result['host']] = result if result['alive'] else None
+        self.record({'type': 'probe', 'target': target, 'host': result['host'],
+                     'result': result if result['alive'] else None})
+    
+    def probed_hosts(self, target: str) -> Dict[str, Optional[Dict]]:
+        """Hosts already probed for a target, mapped to their record if they were live"""
+        return self.probed.get(target, {})
+    
+    def target_done(self, target: str):
+        """Journal a target whose results have been saved and drop its spooled tool output"""
+        self.targets_done.add(target)
+        self.probed.pop(target, None)
+        self.record({'type': 'target', 'target': target})
+        self.flush()
+        # A finished target is skipped on resume, so its tool output is never read again
+        for key in [key for key in self.tools_done if key[0] == target]:
+            del self.tools_done[key]
+        shutil.rmtree(os.path.join(self.spool_dir, target), ignore_errors=True)
+    
+    def flush(self):
+        """Push buffered entries to the OS"""
+        self.file.flush()
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+    
+    def close(self):
+        """Flush and close the journal"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+    
+    def discard(self):
+        """Close and delete the journal and its spool once there is nothing left to resume"""
+        self.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+class ToolScheduler:
+    """Run enumeration tools concurrently as asyncio subprocesses"""
+    
+    def __init__(self, max_concurrency: int = 4, timeout: int = 300,
+                 tool_timeouts: Dict[str, int] = None, limits: 'RunLimits' = None, idle_timeout: float = 0,
+                 ingester: ParallelIngester = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self.limits = limits or RunLimits()
+        self.idle_timeout = idle_timeout
+        self.ingester = ingester
+    
+    def timeout_for(self, tool_name: str) -> int:
+        """Return the timeout configured for a tool"""
+        return self.tool_timeouts.get(tool_name, self.timeout)
+    
+    async def stream(self, tools: Dict[str, SubdomainTool], target: str, output_dir: str,
+                     on_start=None, on_finish=None, on_error=None,
+                     queue_size: int = 10000) -> AsyncIterator[Tuple[str, str]]:
+        """Yield (tool name, subdomain) pairs from all tools while they are still running
+        
+        With an ingester, tools with the default parser yield a single (tool name, NameRun) pair instead
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        queue = asyncio.Queue(maxsize=queue_size)
+        done = object()
+        finished = object()
+        
+        async def pump(name: str, tool: SubdomainTool):
+            # API sources run in-process and don't count against the child process limit
+            process_slot = self.limits.process_slot() if tool.spawns_process else contextlib.nullcontext()
+            async with semaphore, self.limits.tool_slot(name), process_slot:
+                if on_start:
+                    on_start(name)
+                output_file = os.path.join(output_dir, f"{name}_{target}.txt")
+                count = 0
+                outcome = {}
+                try:
+                    if self.ingester is not None and tool.spawns_process and tool.output_parser == tool.default_parser:
+                        run = await tool.spool(target, output_file, self.ingester,
+                                               timeout=self.timeout_for(name),
+                                               outcome=outcome,
+                                               idle_timeout=self.idle_timeout)
+                        count = len(run)
+                        await queue.put((name, run))
+                    else:
+                        async for subdomain in tool.stream(target, output_file,
+                                                           timeout=self.timeout_for(name),
+                                                           outcome=outcome,
+                                                           idle_timeout=self.idle_timeout):
+                            count += 1
+                            await queue.put((name, subdomain))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    outcome['status'] = 'error'
+                    if on_error:
+                        on_error(name, e)
+                # Report completion through the queue so it arrives after the tool's last result
+                await queue.put((finished, name, count, outcome))
+        
+        tasks = [asyncio.ensure_future(pump(name, tool)) for name, tool in tools.items()]
+        
+        async def close():
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await queue.put(done)
+        
+        closer = asyncio.ensure_future(close())
+        
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if item[0] is finished:
+                    if on_finish:
+                        on_finish(*item[1:])
+                    continue
+                yield item
+        finally:
+            for task in tasks + [closer]:
+                task.cancel()
+            await asyncio.gather(*tasks, closer, return_exceptions=True)
+
+class AdaptiveController:
+    """Learns request latency to set timeouts, and sizes concurrency AIMD-style from congestion and load"""
+    
+    # Errors that point at our side or the path being overloaded, not at a dead host
+    LOCAL_ERRORS = (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL, errno.ENOMEM)
+    
+    def __init__(self, timeout: float = 5, min_timeout: float = 1, timeout_factor: float = 3,
+                 concurrency: int = 50, min_concurrency: int = 5, max_concurrency: int = 200,
+                 congestion_threshold: float = 0.2, decrease: float = 0.7, window: int = 1024,
+                 warmup: int = 50, fd_pressure: float = 0.8, cpu_pressure: float = 0.9):
+        self.max_timeout = timeout
+        self.min_timeout = min(min_timeout, timeout)
+        self.timeout_factor = timeout_factor
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = min(max(concurrency, self.min_concurrency), self.max_concurrency)
+        self.congestion_threshold = congestion_threshold
+        self.decrease = decrease
+        self.warmup = warmup
+        self.fd_pressure = fd_pressure
+        self.cpu_pressure = cpu_pressure
+        self.timeout = timeout
+        self.latencies = collections.deque(maxlen=window)
+        self.baseline = None
+        self.in_flight = 0
+        self.waiters = collections.deque()
+        self.window_latencies = []
+        self.completed = 0
+        self.congested = 0
+        self.local_errors = 0
+        self.pressure_checked = 0.0
+        self.pressure_cpu = (time.monotonic(), time.process_time())
+        self.under_pressure = False
+        try:
+            self.fd_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        except (ValueError, OSError):
+            self.fd_limit = resource.RLIM_INFINITY
+    
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Hold one of the currently allowed concurrent requests"""
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass a wakeup this waiter can no longer use to the next one
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake()
+    
+    def _wake(self):
+        while self.waiters and self.in_flight < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+    
+    def observe(self, latency: Optional[float], error: BaseException = None):
+        """Account for one finished request"""
+        self.completed += 1
+        if error is None:
+            if latency is not None:
+                self.latencies.append(latency)
+                self.window_latencies.append(latency)
+                if len(self.latencies) >= self.warmup and len(self.latencies) % 16 == 0:
+                    self._update_timeout()
+        elif isinstance(error, asyncio.TimeoutError):
+            self.congested += 1
+        elif isinstance(error, OSError) and error.errno in self.LOCAL_ERRORS:
+            self.local_errors += 1
+        
+        # Roughly once per round trip of the whole window of requests
+        if self.completed >= self.limit:
+            self._adjust()
+    
+    def _update_timeout(self):
+        """Allow a generous multiple of the p99 latency of recent successful requests"""
+        ordered = sorted(self.latencies)
+        p99 = ordered[int(0.99 * (len(ordered) - 1))]
+        self.timeout = min(self.max_timeout, max(self.min_timeout, self.timeout_factor * p99))
+        median = ordered[len(ordered) // 2]
+        self.baseline = median if self.baseline is None else min(self.baseline, median)
+    
+    def _adjust(self):
+        """Additive increase while healthy, multiplicative decrease on congestion or local pressure"""
+        rate = self.congested / self.completed
+        # Timeouts alone may just be filtered hosts; they mean congestion when answers also slow down
+        slowing = False
+        if self.window_latencies and self.baseline:
+            median = sorted(self.window_latencies)[len(self.window_latencies) // 2]
+            slowing = median > 2 * self.baseline
+        congested = (rate > self.congestion_threshold and slowing) or self.local_errors > 0
+        
+        if congested or self.pressure():
+            self.limit = max(self.min_concurrency, int(self.limit * self.decrease))
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1)
+        self.completed = self.congested = self.local_errors = 0
+        self.window_latencies = []
+        self._wake()
+    
+    def pressure(self) -> bool:
+        """Whether file descriptors or this process's CPU are running short; sampled at most once a second"""
+        now = time.monotonic()
+        if now - self.pressure_checked < 1:
+            return self.under_pressure
+        self.pressure_checked = now
+        
+        pressure = False
+        if self.fd_limit != resource.RLIM_INFINITY:
+            try:
+                pressure = len(os.listdir('/proc/self/fd')) > self.fd_pressure * self.fd_limit
+            except OSError:
+                pass
+        wall, cpu = self.pressure_cpu
+        cpu_now = time.process_time()
+        if now > wall and (cpu_now - cpu) / (now - wall) > self.cpu_pressure:
+            pressure = True
+        self.pressure_cpu = (now, cpu_now)
+        self.under_pressure = pressure
+        return pressure
+
+# TLS session the connection being opened in this context should offer for resumption
+OFFERED_TLS_SESSION = contextvars.ContextVar('offered_tls_session', default=None)
+
+class HTTPProber:
+    """Asyncio HTTP liveness prober with pooled keep-alive connections"""
+    
+    TITLE_PATTERN = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+    REDIRECT_CODES = (301, 302, 303, 307, 308)
+    
+    def __init__(self, concurrency: int = 50, per_host: int = 4, connect_timeout: float = 5,
+                 read_timeout: float = 5, method: str = 'GET', max_body: int = 65536,
+                 max_redirects: int = 5, verify_ssl: bool = False,
+                 user_agent: str = 'TakeTheSubs/2.0', global_limit: asyncio.Semaphore = None,
+                 max_idle: int = 2, race: bool = True, extra_ports: List[int] = None,
+                 controller: AdaptiveController = None, per_ip: int = 16):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.per_ip = max(1, per_ip)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.method = method.upper()
+        self.max_body = max_body
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+        self.global_limit = global_limit
+        self.max_idle = max_idle
+        self.race = race
+        self.extra_ports = list(extra_ports or [])
+        self.controller = controller
+        self.ssl_context = self._make_ssl_context(verify_ssl)
+        # asyncio has no way to pass a session to a new TLS connection, so the context offers one itself
+        self.ssl_context.wrap_bio = self._wrap_bio
+        self.host_slots = {}
+        self.ip_slots = {}
+        self.idle = {}
+        self.sessions = {}
+        self.stats = collections.Counter()
+    
+    @staticmethod
+    def _make_ssl_context(verify_ssl: bool) -> ssl.SSLContext:
+        """Build one TLS context so every connection shares its session cache"""
+        context = ssl.create_default_context()
+        if not verify_ssl:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        context.set_alpn_protocols(['http/1.1'])
+        return context
+    
+    def _wrap_bio(self, incoming, outgoing, server_side: bool = False, server_hostname: str = None,
+                  session: ssl.SSLSession = None):
+        """SSLContext.wrap_bio that offers the session saved for the backend being connected to"""
+        return ssl.SSLContext.wrap_bio(self.ssl_context, incoming, outgoing, server_side, server_hostname,
+                                       session or OFFERED_TLS_SESSION.get())
+    
+    async def probe_many(self, hosts: Iterable[str], schemes: Tuple[str, ...] = ('http', 'https'),
+                         addresses: Dict[str, str] = None) -> AsyncIterator[Dict]:
+        """Probe hosts with a fixed pool of workers, yielding results as they complete
+        
+        With resolved addresses, hosts are probed on the address they resolved to, taking turns
+        between backends, so virtual hosts of one backend share its connections and TLS sessions
+        """
+        addresses = addresses or {}
+        host_iter = self.interleave(hosts, addresses) if addresses else iter(hosts)
+        results = asyncio.Queue(maxsize=self.concurrency * 2)
+        done = object()
+        
+        async def worker():
+            for host in host_iter:
+                await results.put(await self.probe_host(host, schemes, addresses.get(host)))
+        
+        # With a controller the pool is sized for its ceiling and the controller decides how many run
+        size = self.controller.max_concurrency if self.controller else self.concurrency
+        workers = [asyncio.ensure_future(worker()) for _ in range(size)]
+        
+        async def close():
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(done)
+        
+        closer = asyncio.ensure_future(close())
+        
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            for task in workers + [closer]:
+                task.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+    
+    @staticmethod
+    def interleave(hosts: Iterable[str], addresses: Dict[str, str]) -> Iterator[str]:
+        """Order hosts round-robin across their addresses, so no backend gets all the workers at once"""
+        groups = {}
+        for host in hosts:
+            groups.setdefault(addresses.get(host) or host, []).append(host)
+        queue = collections.deque(iter(group) for group in groups.values())
+        while queue:
+            group = queue.popleft()
+            host = next(group, None)
+            if host is not None:
+                yield host
+                queue.append(group)
+    
+    def candidates(self, host: str, schemes: Tuple[str, ...] = ('http', 'https')) -> List[str]:
+        """List the URLs worth trying for a host: each scheme plus the extra ports"""
+        urls = [f"{scheme}://{host}/" for scheme in schemes]
+        if ':' not in host:
+            for port in self.extra_ports:
+                scheme = 'https' if port % 1000 == 443 else 'http'
+                urls.append(f"{scheme}://{host}:{port}/")
+        return urls
+    
+    async def probe_host(self, host: str, schemes: Tuple[str, ...] = ('http', 'https'),
+                         address: str = None) -> Dict:
+        """Probe every candidate URL of a host and return the first live answer"""
+        urls = self.candidates(host, schemes)
+        if self.race and len(urls) > 1:
+            return await self.race_host(host, urls, address)
+        
+        result = None
+        for url in urls:
+            result = self.best_failure(result, await self.probe_url(url, host=host, address=address))
+            if result['alive']:
+                break
+        return result
+    
+    async def race_host(self, host: str, urls: List[str], address: str = None) -> Dict:
+        """Probe all candidate URLs at once, keep the first live answer and cancel the rest"""
+        tasks = [asyncio.ensure_future(self.probe_url(url, host=host, address=address)) for url in urls]
+        result = None
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = self.best_failure(result, await next_done)
+                if result['alive']:
+                    return result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return result
+    
+    @staticmethod
+    def best_failure(current: Optional[Dict], candidate: Dict) -> Dict:
+        """Prefer a live result, then one that got an HTTP answer, over a bare error"""
+        if current is None or candidate['alive']:
+            return candidate
+        if current['status'] is None and candidate['status'] is not None:
+            return candidate
+        return current
+    
+    async def probe_url(self, url: str, host: str = None, address: str = None) -> Dict:
+        """Request a URL, following redirects, and describe the final response"""
+        parsed = urlparse(url)
+        origin = parsed.hostname
+        result = {
+            'host': host or parsed.hostname,
+            'url': url,
+            'final_url': url,
+            'scheme': parsed.scheme,
+            'port': parsed.port or (443 if parsed.scheme == 'https' else 80),
+            'status': None,
+            'title': None,
+            'content_length': None,
+            'alive': False,
+            'error': None,
+            'elapsed': None
+        }
+        
+        try:
+            async with self._global_slot(), self._host_slot(result['host']), self._ip_slot(address), \
+                    self._adaptive_slot():
+                # Latency covers the requests themselves, not the wait for a slot
+                started = time.monotonic()
+                try:
+                    for _ in range(self.max_redirects + 1):
+                        # The resolved address only holds for the host itself, not where it redirects to
+                        status, headers, body, complete = await self.request(
+                            url, address=address if urlparse(url).hostname == origin else None)
+                        location = headers.get('location')
+                        if status not in self.REDIRECT_CODES or not location:
+                            break
+                        url = urljoin(url, location)
+                except Exception as e:
+                    self._observe(None, e)
+                    raise
+                finally:
+                    result['elapsed'] = round(time.monotonic() - started, 6)
+                self._observe(result['elapsed'])
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, ValueError, ssl.SSLError) as e:
+            result['error'] = type(e).__name__
+            return result
+        
+        result['final_url'] = url
+        result['status'] = status
+        result['title'] = self.extract_title(body)
+        if 'content-length' in headers and headers['content-length'].isdigit():
+            result['content_length'] = int(headers['content-length'])
+        elif complete:
+            result['content_length'] = len(body)
+        result['alive'] = status < 400
+        return result
+    
+    async def request(self, url: str, headers: Dict[str, str] = None,
+                      address: str = None) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """Send one request over a pooled connection and read a bounded part of the body
+        
+        Plain HTTP to a known address shares that backend's connections between virtual hosts.
+        TLS binds a connection to its SNI name, so HTTPS only shares the backend's session.
+        """
+        parsed = urlparse(url)
+        scheme = parsed.scheme
+        hostname = parsed.hostname
+        port = parsed.port or (443 if scheme == 'https' else 80)
+        key = (scheme, address if address and scheme == 'http' else hostname, port, address)
+        
+        host_header = hostname if parsed.port is None else f"{hostname}:{port}"
+        path = parsed.path or '/'
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        payload = (
+            f"{self.method} {path} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {self.user_agent}\r\n"
+            f"Accept: */*\r\n"
+            + ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+            + "\r\n"
+        ).encode('latin-1', errors='replace')
+        
+        reader, writer, reused = await self._acquire(key, hostname)
+        try:
+            writer.write(payload)
+            self.stats['bytes_sent'] += len(payload)
+            await writer.drain()
+            response = await asyncio.wait_for(self._read_response(reader), self._timeout(self.read_timeout))
+        except (OSError, asyncio.IncompleteReadError) as e:
+            self._discard(writer)
+            if not reused:
+                raise
+            # A pooled connection went stale between requests; retry once on a fresh one
+            reader, writer, _ = await self._acquire(key, hostname, fresh=True)
+            try:
+                writer.write(payload)
+                self.stats['bytes_sent'] += len(payload)
+                await writer.drain()
+                response = await asyncio.wait_for(self._read_response(reader), self._timeout(self.read_timeout))
+            except BaseException:
+                self._discard(writer)
+                raise
+        except BaseException:
+            self._discard(writer)
+            raise
+        
+        status, headers, body, complete, keep_alive = response
+        ssl_object = writer.get_extra_info('ssl_object')
+        if address and ssl_object is not None and ssl_object.session is not None:
+            # TLS 1.3 tickets arrive after the handshake, so the session is only worth keeping now
+            self.sessions[(address, port)] = ssl_object.session
+        if keep_alive:
+            self._release(key, reader, writer)
+        else:
+            self._discard(writer)
+        return status, headers, body, complete
+    
+    async def _read_response(self, reader: asyncio.StreamReader):
+        """Parse the status line and headers, then read the body up to max_body bytes"""
+        head = await reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        parts = lines[0].split(' ', 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+            raise ValueError('malformed status line')
+        version, status = parts[0], int(parts[1])
+        
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        
+        body, complete = await self._read_body(reader, status, headers)
+        self.stats['bytes_received'] += len(head) + len(body)
+        keep_alive = (complete and version == 'HTTP/1.1'
+                      and headers.get('connection', '').lower() != 'close')
+        return status, headers, body, complete, keep_alive
+    
+    async def _read_body(self, reader: asyncio.StreamReader, status: int,
+                         headers: Dict[str, str]) -> Tuple[bytes, bool]:
+        """Read at most max_body bytes; report whether the body was fully consumed"""
+        if self.method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return b'', True
+        
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return bytes(body), True
+                if len(body) + size > self.max_body:
+                    body += await reader.read(self.max_body - len(body))
+                    return bytes(body), False
+                body += (await reader.readexactly(size + 2))[:-2]
+        
+        length = headers.get('content-length', '')
+        if length.isdigit():
+            length = int(length)
+            if length <= self.max_body:
+                return await reader.readexactly(length), True
+            return await reader.readexactly(self.max_body), False
+        
+        # Close-delimited body: read what we need and drop the connection
+        body = bytearray()
+        while len(body) < self.max_body:
+            chunk = await reader.read(self.max_body - len(body))
+            if not chunk:
+                break
+            body += chunk
+        return bytes(body), False
+    
+    async def _acquire(self, key: Tuple[str, str, int, Optional[str]], hostname: str, fresh: bool = False):
+        """Reuse an idle keep-alive connection or open a new one, to the resolved address if there is one"""
+        pool = self.idle.get(key)
+        while pool and not fresh:
+            reader, writer = pool.pop()
+            if not pool:
+                del self.idle[key]
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats['reused'] += 1
+                return reader, writer, True
+            self._discard(writer)
+        
+        scheme, _, port, address = key
+        token = OFFERED_TLS_SESSION.set(self.sessions.get((address, port)) if address else None)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    address or hostname, port,
+                    ssl=self.ssl_context if scheme == 'https' else None,
+                    server_hostname=hostname if scheme == 'https' else None
+                ),
+                self._timeout(self.connect_timeout)
+            )
+        finally:
+            OFFERED_TLS_SESSION.reset(token)
+        self.stats['connections'] += 1
+        ssl_object = writer.get_extra_info('ssl_object')
+        if ssl_object is not None:
+            self.stats['handshakes'] += 1
+            self.stats['resumed'] += ssl_object.session_reused
+        return reader, writer, False
+    
+    def _release(self, key: Tuple[str, str, int, Optional[str]], reader, writer):
+        """Return a connection to the idle pool"""
+        pool = self.idle.setdefault(key, [])
+        # A backend's shared connections serve all its virtual hosts, so it may keep more of them
+        shared = key[3] is not None and key[1] == key[3]
+        if len(pool) < (self.per_ip if shared else self.max_idle):
+            pool.append((reader, writer))
+        else:
+            self._discard(writer)
+    
+    @staticmethod
+    def _discard(writer):
+        """Close a connection without waiting for the peer"""
+        try:
+            writer.transport.abort()
+        except Exception:
+            pass
+    
+    def _global_slot(self):
+        """Hold one of the probe slots shared with other targets"""
+        return self.global_limit or contextlib.nullcontext()
+    
+    def _adaptive_slot(self):
+        """Hold one of the slots the adaptive controller currently allows"""
+        return self.controller.slot() if self.controller else contextlib.nullcontext()
+    
+    def _timeout(self, configured: float) -> float:
+        """The configured timeout, tightened to what the controller has learned"""
+        return min(configured, self.controller.timeout) if self.controller else configured
+    
+    def _observe(self, latency: Optional[float], error: BaseException = None):
+        if self.controller is not None:
+            self.controller.observe(latency, error)
+    
+    def _host_slot(self, host: str):
+        """Limit concurrent requests to a single host"""
+        return self._keyed_slot(self.host_slots, host, self.per_host)
+    
+    def _ip_slot(self, address: Optional[str]):
+        """Limit concurrent requests to a single backend address, across all of its virtual hosts"""
+        return self._keyed_slot(self.ip_slots, address, self.per_ip) if address else contextlib.nullcontext()
+    
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def _keyed_slot(slots: Dict, key: str, limit: int):
+        """Hold one of a key's slots; the semaphore lives only while someone uses it"""
+        entry = slots.get(key)
+        if entry is None:
+            entry = slots[key] = [asyncio.Semaphore(limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del slots[key]
+    
+    def extract_title(self, body: bytes) -> Optional[str]:
+        """Pull the page title out of the body prefix"""
+        match = self.TITLE_PATTERN.search(body)
+        if not match:
+            return None
+        title = html.unescape(match.group(1).decode('utf-8', errors='replace'))
+        return ' '.join(title.split())[:200] or None
+    
+    def close(self):
+        """Close every pooled connection and forget the saved TLS sessions"""
+        for pool in self.idle.values():
+            for _, writer in pool:
+                self._discard(writer)
+        self.idle.clear()
+        self.sessions.clear()
+
+class APIError(Exception):
+    """Raised when an API source cannot deliver results"""
+
+class TokenBucket:
+    """Token bucket pacing the requests made with one API key"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def delay(self) -> float:
+        """Seconds until a request may be sent"""
+        self._refill()
+        wait = max(0.0, self.paused_until - time.monotonic())
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+    
+    def take(self):
+        """Spend one token"""
+        self._refill()
+        self.tokens -= 1
+    
+    def pause(self, seconds: float):
+        """Hold every request back for a while, e.g. after a 429"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class APIKeyPool:
+    """The API keys of one provider; each request goes to whichever key is ready first"""
+    
+    def __init__(self, keys: Iterable[str], rate: float, burst: int = 1):
+        self.buckets = {key: TokenBucket(rate, burst) for key in keys}
+    
+    async def acquire(self) -> str:
+        """Wait for a key with a free token and spend it"""
+        while True:
+            if not self.buckets:
+                raise APIError('no usable API keys left')
+            key = min(self.buckets, key=lambda candidate: self.buckets[candidate].delay())
+            wait = self.buckets[key].delay()
+            if wait <= 0:
+                self.buckets[key].take()
+                return key
+            await asyncio.sleep(wait)
+    
+    def backoff(self, key: str, seconds: float):
+        """Rest a key that was throttled or failed"""
+        if key in self.buckets:
+            self.buckets[key].pause(seconds)
+    
+    def revoke(self, key: str):
+        """Stop using a key the provider rejected"""
+        self.buckets.pop(key, None)
+
+class APIClient:
+    """Pooled HTTPS client shared by every API source of a run, holding one key pool per provider"""
+    
+    def __init__(self, concurrency: int = 20, timeout: float = 30, max_body: int = 32 << 20,
+                 max_retries: int = 5, verify_ssl: bool = True, user_agent: str = 'TakeTheSubs/2.0'):
+        self.http = HTTPProber(concurrency=concurrency, per_host=concurrency, connect_timeout=timeout,
+                               read_timeout=timeout, max_body=max_body, verify_ssl=verify_ssl,
+                               user_agent=user_agent, max_idle=concurrency)
+        self.slots = asyncio.Semaphore(max(1, concurrency))
+        self.max_retries = max_retries
+        self.pools = {}
+    
+    def pool(self, provider: str, keys: List[str], rate: float, burst: int = 1) -> APIKeyPool:
+        """Key pool of a provider, created once so every target shares its rate limits"""
+        if provider not in self.pools:
+            self.pools[provider] = APIKeyPool(keys, rate, burst)
+        return self.pools[provider]
+    
+    async def request(self, url: str, headers: Dict[str, str] = None):
+        """Send a GET over a pooled connection"""
+        async with self.slots:
+            return await self.http.request(url, headers=headers)
+    
+    def close(self):
+        """Close every pooled connection"""
+        self.http.close()
+
+class APISource(abc.ABC):
+    """Base class for in-process subdomain sources that query a rate-limited HTTP API"""
+    
+    base_url = ''
+    rate = 1.0
+    burst = 1
+    spawns_process = False
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 60.0
+    
+    def __init__(self, name: str, client: APIClient, keys: List[str], base_url: str = None,
+                 rate: float = None, prefetch: int = 2, max_pages: int = 100):
+        self.name = name
+        self.client = client
+        self.base_url = (base_url or self.base_url).rstrip('/')
+        self.keys = client.pool(name, keys, rate or self.rate, self.burst)
+        self.prefetch = max(0, prefetch)
+        self.max_pages = max_pages
+        self.command = f"api {name} {self.base_url}"
+    
+    @abc.abstractmethod
+    def authorize(self, url: str, key: str) -> Tuple[str, Dict[str, str]]:
+        """Attach a key to a request"""
+    
+    @abc.abstractmethod
+    def pages(self, target: str) -> AsyncIterator[List[str]]:
+        """Yield the raw names found on each result page"""
+    
+    async def stream(self, target: str, output_file: str = None, timeout: int = 300,
+                     seen: Set[str] = None, outcome: Dict = None, **kwargs) -> AsyncIterator[str]:
+        """Yield new in-scope subdomains page by page, within an overall time limit"""
+        seen = set() if seen is None else seen
+        outcome = {} if outcome is None else outcome
+        outcome['status'] = 'failed'
+        scope = DomainNormalizer([target])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        pages = self.pages(target)
+        
+        try:
+            while True:
+                try:
+                    names = await asyncio.wait_for(pages.__anext__(), max(0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                for subdomain in scope.filter_chunk('\n'.join(names)):
+                    if subdomain not in seen:
+                        seen.add(subdomain)
+                        yield subdomain
+            outcome['status'] = 'ok'
+        except asyncio.TimeoutError:
+            outcome['status'] = 'timeout'
+        finally:
+            await pages.aclose()
+    
+    async def fetch(self, url: str) -> Dict:
+        """GET a JSON document, rotating keys and backing off on 429, 5xx and network errors"""
+        for attempt in range(self.client.max_retries + 1):
+            key = await self.keys.acquire()
+            request_url, headers = self.authorize(url, key)
+            try:
+                status, response_headers, body, complete = await self.client.request(request_url, headers)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError, ValueError, ssl.SSLError):
+                self.keys.backoff(key, self.retry_delay({}, attempt))
+                continue
+            
+            if status == 429 or (status == 403 and response_headers.get('x-ratelimit-remaining') == '0'):
+                self.keys.backoff(key, self.retry_delay(response_headers, attempt))
+                continue
+            if status in (401, 403):
+                self.keys.revoke(key)
+                continue
+            if status >= 500:
+                self.keys.backoff(key, self.retry_delay(response_headers, attempt))
+                continue
+            if status >= 400:
+                raise APIError(f"{self.name} returned HTTP {status}")
+            if not complete:
+                raise APIError(f"{self.name} response exceeded {self.client.http.max_body} bytes")
+            return json.loads(body)
+        raise APIError(f"{self.name} gave up after {self.client.max_retries + 1} attempts")
+    
+    def retry_delay(self, headers: Dict[str, str], attempt: int) -> float:
+        """Honour Retry-After or a rate limit reset time, else back off exponentially with jitter"""
+        retry_after = headers.get('retry-after', '')
+        if retry_after.isdigit():
+            return float(retry_after)
+        reset = headers.get('x-ratelimit-reset', '')
+        if reset.isdigit():
+            return max(0.0, int(reset) - time.time())
+        return min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** attempt) * random.uniform(1, 1.5)
+
+class PagedAPISource(APISource):
+    """API source whose results are split into numbered pages that can be fetched ahead"""
+    
+    def pages(self, target):
+        return self.numbered_pages(target)
+    
+    async def numbered_pages(self, target: str, first_page: int = 1) -> AsyncIterator[List[str]]:
+        """Walk page-numbered results, keeping up to `prefetch` further pages in flight"""
+        inflight = []
+        page = first_page
+        try:
+            while True:
+                while len(inflight) <= self.prefetch and page < first_page + self.max_pages:
+                    inflight.append((page, asyncio.ensure_future(self.fetch(self.page_url(target, page)))))
+                    page += 1
+                if not inflight:
+                    return
+                number, task = inflight.pop(0)
+                names, more = self.parse_page(target, await task, number)
+                yield names
+                if not more:
+                    return
+        finally:
+            for _, task in inflight:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in inflight), return_exceptions=True)
+    
+    @abc.abstractmethod
+    def page_url(self, target: str, page: int) -> str:
+        """URL of a numbered result page"""
+    
+    @abc.abstractmethod
+    def parse_page(self, target: str, data: Dict, page: int) -> Tuple[List[str], bool]:
+        """Names on a numbered page, and whether more pages follow"""
+
+class ShodanSource(PagedAPISource):
+    """Shodan DNS domain lookup, paginated by page number"""
+    
+    base_url = 'https://api.shodan.io'
+    rate = 1.0
+    
+    def authorize(self, url, key):
+        return f"{url}&key={key}", {}
+    
+    def page_url(self, target, page):
+        return f"{self.base_url}/dns/domain/{target}?page={page}"
+    
+    def parse_page(self, target, data, page):
+        names = [f"{label}.{target}" if label else target for label in data.get('subdomains', [])]
+        return names, bool(data.get('more'))
+
+class VirusTotalSource(APISource):
+    """VirusTotal v3 subdomain relationship, paginated by cursor"""
+    
+    base_url = 'https://www.virustotal.com'
+    rate = 4 / 60
+    
+    def authorize(self, url, key):
+        return url, {'x-apikey': key}
+    
+    async def pages(self, target):
+        url = f"{self.base_url}/api/v3/domains/{target}/subdomains?limit=40"
+        for _ in range(self.max_pages):
+            data = await self.fetch(url)
+            yield [item.get('id', '') for item in data.get('data', [])]
+            url = data.get('links', {}).get('next')
+            if not url:
+                break
+
+class GitHubSource(PagedAPISource):
+    """GitHub code search, scraping hostnames out of the matched code fragments"""
+    
+    base_url = 'https://api.github.com'
+    rate = 10 / 60
+    PER_PAGE = 100
+    MAX_RESULTS = 1000
+    
+    def authorize(self, url, key):
+        return url, {'Authorization': f"token {key}", 'Accept': 'application/vnd.github.v3.text-match+json'}
+    
+    def page_url(self, target, page):
+        return f"{self.base_url}/search/code?q=%22{target}%22&per_page={self.PER_PAGE}&page={page}"
+    
+    def parse_page(self, target, data, page):
+        pattern = re.compile(rf'(?:[a-z0-9_-]+\.)+{re.escape(target)}(?![a-z0-9_-]|\.[a-z0-9])')
+        names = []
+        for item in data.get('items', []):
+            for match in item.get('text_matches', []):
+                names.extend(pattern.findall(match.get('fragment', '').lower()))
+        total = min(data.get('total_count', 0), self.MAX_RESULTS)
+        return names, bool(data.get('items')) and page * self.PER_PAGE < total
+
+class ChaosSource(APISource):
+    """ProjectDiscovery Chaos dataset, returned in a single response"""
+    
+    base_url = 'https://dns.projectdiscovery.io'
+    rate = 1.0
+    
+    def authorize(self, url, key):
+        return url, {'Authorization': key}
+    
+    async def pages(self, target):
+        data = await self.fetch(f"{self.base_url}/dns/{target}/subdomains")
+        yield [f"{label}.{target}" if label else target for label in data.get('subdomains', [])]
+
+API_SOURCES = {
+    'shodan': (ShodanSource, 'shodan'),
+    'virustotal': (VirusTotalSource, 'virustotal'),
+    'github_search': (GitHubSource, 'github_token'),
+    'chaos': (ChaosSource, 'chaos')
+}
+
+class DNSProtocol:
+    """UDP endpoint that matches DNS responses to pending queries by transaction ID"""
+    
+    # Implements asyncio.DatagramProtocol by duck typing, so defining it doesn't import asyncio
+    
+    def __init__(self):
+        self.transport = None
+        self.pending = {}
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < 12:
+            return
+        entry = self.pending.get(int.from_bytes(data[:2], 'big'))
+        if entry is None:
+            return
+        question, future = entry
+        # Ignore stray or spoofed packets that don't echo our question
+        if data[12:12 + len(question)].lower() == question.lower() and not future.done():
+            future.set_result(data)
+    
+    def error_received(self, exc):
+        pass
+    
+    def pause_writing(self):
+        pass
+    
+    def resume_writing(self):
+        pass
+    
+    def connection_lost(self, exc):
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError('resolver socket closed'))
+    
+    def next_id(self) -> int:
+        """Pick a random transaction ID that is not in flight"""
+        while True:
+            query_id = random.getrandbits(16)
+            if query_id not in self.pending:
+                return query_id
+
+class DNSResolver:
+    """Bulk asyncio stub resolver with retries, nameserver rotation and wildcard detection"""
+    
+    RECORD_TYPES = {1: 'a', 5: 'cname', 28: 'aaaa'}
+    RCODES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+    
+    def __init__(self, nameservers: List[str] = None, timeout: float = 2, retries: int = 2,
+                 concurrency: int = 500, wildcard_tests: int = 3):
+        self.nameservers = [self._parse_nameserver(ns) for ns in (nameservers or self.system_nameservers())]
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = max(1, concurrency)
+        self.wildcard_tests = wildcard_tests
+        self.endpoints = {}
+        self.wildcards = {}
+        self._next_nameserver = 0
+    
+    @staticmethod
+    def system_nameservers() -> List[str]:
+        """Read nameservers from /etc/resolv.conf, falling back to public resolvers"""
+        nameservers = []
+        try:
+            with open('/etc/resolv.conf', 'r') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[0] == 'nameserver':
+                        nameservers.append(parts[1])
+        except OSError:
+            pass
+        return nameservers or ['1.1.1.1', '8.8.8.8']
+    
+    @staticmethod
+    def _parse_nameserver(nameserver: str) -> Tuple[str, int]:
+        """Split 'ip' or 'ip:port' (IPv6 as '[ip]:port') into an address tuple"""
+        if nameserver.startswith('['):
+            host, _, port = nameserver[1:].partition(']:')
+            return host.rstrip(']'), int(port or 53)
+        if nameserver.count(':') == 1:
+            host, port = nameserver.split(':')
+            return host, int(port)
+        return nameserver, 53
+    
+    async def resolve_many(self, names: Iterable[str], apex: str = None, zone_wildcards: bool = False,
+                           rtypes: Tuple[int, ...] = (1, 28)) -> AsyncIterator[Dict]:
+        """Resolve names with a fixed pool of workers, checking wildcards per apex or per parent zone"""
+        name_iter = iter(names)
+        results = asyncio.Queue(maxsize=self.concurrency * 2)
+        done = object()
+        
+        async def worker():
+            for name in name_iter:
+                record = await self.resolve(name, rtypes)
+                if (apex or zone_wildcards) and record['status'] == 'NOERROR':
+                    zone = name.partition('.')[2] if zone_wildcards else apex
+                    record['wildcard'] = await self.is_wildcard(record, zone)
+                await results.put(record)
+        
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        
+        async def close():
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(done)
+        
+        closer = asyncio.ensure_future(close())
+        
+        try:
+            while True:
+                item = await results.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            for task in workers + [closer]:
+                task.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+    
+    async def resolve(self, name: str, rtypes: Tuple[int, ...] = (1, 28)) -> Dict:
+        """Look up A and AAAA records for a name, capturing any CNAME chain"""
+        record = {'host': name, 'status': None, 'a': [], 'aaaa': [], 'cname': [], 'wildcard': False}
+        if len(rtypes) == 1:
+            answers = [await self.query(name, rtypes[0])]
+        else:
+            answers = await asyncio.gather(*(self.query(name, rtype) for rtype in rtypes))
+        
+        statuses = [status for status, _ in answers]
+        for status in ('NOERROR', 'NXDOMAIN', 'SERVFAIL', 'TIMEOUT'):
+            if status in statuses:
+                record['status'] = status
+                break
+        else:
+            record['status'] = statuses[0]
+        
+        for _, records in answers:
+            for rtype, value in records:
+                if value not in record[rtype]:
+                    record[rtype].append(value)
+        
+        if not record['a'] and not record['aaaa'] and record['status'] == 'NOERROR':
+            record['status'] = 'NODATA'
+        return record
+    
+    async def query(self, name: str, rtype: int) -> Tuple[str, List[Tuple[str, str]]]:
+        """Send a query, retrying on timeouts and server failures across nameservers"""
+        question = self.encode_question(name, rtype)
+        status = 'TIMEOUT'
+        loop = asyncio.get_running_loop()
+        
+        for _ in range(self.retries + 1):
+            protocol = await self._endpoint(self._pick_nameserver())
+            query_id = protocol.next_id()
+            future = loop.create_future()
+            protocol.pending[query_id] = (question, future)
+            # A bare timer is much cheaper than wait_for at tens of thousands of queries per second
+            timer = loop.call_later(self.timeout, self._expire, future)
+            try:
+                protocol.transport.sendto(query_id.to_bytes(2, 'big') + b'\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00' + question)
+                response = await future
+            except (asyncio.TimeoutError, ConnectionError, OSError):
+                status = 'TIMEOUT'
+                continue
+            finally:
+                timer.cancel()
+                protocol.pending.pop(query_id, None)
+            
+            try:
+                status, records = self.parse_response(response, len(question))
+            except (IndexError, ValueError):
+                status = 'FORMERR'
+                continue
+            if status in ('SERVFAIL', 'REFUSED'):
+                continue
+            return status, records
+        
+        return status, []
+    
+    @staticmethod
+    def _expire(future: asyncio.Future):
+        """Fail a query that got no answer in time"""
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError())
+    
+    def _pick_nameserver(self) -> Tuple[str, int]:
+        """Rotate through the configured nameservers"""
+        nameserver = self.nameservers[self._next_nameserver % len(self.nameservers)]
+        self._next_nameserver += 1
+        return nameserver
+    
+    async def _endpoint(self, nameserver: Tuple[str, int]) -> DNSProtocol:
+        """Open (once) the UDP socket used for a nameserver"""
+        protocol = self.endpoints.get(nameserver)
+        if protocol is None or protocol.transport.is_closing():
+            _, protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+                DNSProtocol, remote_addr=nameserver
+            )
+            self.endpoints[nameserver] = protocol
+        return protocol
+    
+    @staticmethod
+    def encode_question(name: str, rtype: int) -> bytes:
+        """Encode the question section for a name and record type"""
+        encoded = b''.join(
+            len(label).to_bytes(1, 'big') + label
+            for label in name.strip('.').encode('idna').split(b'.')
+        )
+        return encoded + b'\x00' + rtype.to_bytes(2, 'big') + b'\x00\x01'
+    
+    def parse_response(self, data: bytes, question_length: int) -> Tuple[str, List[Tuple[str, str]]]:
+        """Decode the rcode and A/AAAA/CNAME answers of a response"""
+        status = self.RCODES.get(data[3] & 0x0F, 'ERROR')
+        answer_count = int.from_bytes(data[6:8], 'big')
+        offset = 12 + question_length
+        records = []
+        
+        for _ in range(answer_count):
+            _, offset = self.read_name(data, offset)
+            rtype = int.from_bytes(data[offset:offset + 2], 'big')
+            length = int.from_bytes(data[offset + 8:offset + 10], 'big')
+            offset += 10
+            rdata = data[offset:offset + length]
+            if rtype == 1 and length == 4:
+                records.append(('a', str(ipaddress.IPv4Address(rdata))))
+            elif rtype == 28 and length == 16:
+                records.append(('aaaa', str(ipaddress.IPv6Address(rdata))))
+            elif rtype == 5:
+                records.append(('cname', self.read_name(data, offset)[0]))
+            offset += length
+        
+        return status, records
+    
+    @staticmethod
+    def read_name(data: bytes, offset: int) -> Tuple[str, int]:
+        """Read a possibly compressed domain name, returning it and the offset after it"""
+        labels = []
+        end = None
+        for _ in range(128):
+            length = data[offset]
+            if length & 0xC0 == 0xC0:
+                if end is None:
+                    end = offset + 2
+                offset = ((length & 0x3F) << 8) | data[offset + 1]
+                continue
+            offset += 1
+            if length == 0:
+                return '.'.join(labels).lower(), end if end is not None else offset
+            labels.append(data[offset:offset + length].decode('ascii', errors='replace'))
+            offset += length
+        raise ValueError('DNS name compression loop')
+    
+    async def wildcard_fingerprint(self, apex: str) -> Set[str]:
+        """Resolve random names under an apex; anything they return comes from a wildcard"""
+        future = self.wildcards.get(apex)
+        if future is None:
+            future = self.wildcards[apex] = asyncio.ensure_future(self._detect_wildcard(apex))
+        return await future
+    
+    async def _detect_wildcard(self, apex: str) -> Set[str]:
+        """Collect the addresses and CNAME targets answered for nonexistent names"""
+        labels = [''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
+                  for _ in range(self.wildcard_tests)]
+        records = await asyncio.gather(*(self.resolve(f"{label}.{apex}") for label in labels))
+        fingerprint = set()
+        for record in records:
+            fingerprint.update(self.fingerprint(record))
+        return fingerprint
+    
+    @staticmethod
+    def fingerprint(record: Dict) -> Set[str]:
+        """Addresses and CNAME targets a record resolved to"""
+        return set(record['a']) | set(record['aaaa']) | set(record['cname'])
+    
+    async def is_wildcard(self, record: Dict, apex: str) -> bool:
+        """A name is a wildcard hit when everything it resolves to is also what random names get"""
+        wildcard = await self.wildcard_fingerprint(apex)
+        answers = self.fingerprint(record)
+        return bool(wildcard) and bool(answers) and answers <= wildcard
+    
+    def close(self):
+        """Close the resolver sockets"""
+        for protocol in self.endpoints.values():
+            if protocol.transport:
+                protocol.transport.close()
+        self.endpoints.clear()
+
+class CandidateGenerator:
+    """Lazy stream of wordlist and permutation candidates; only one file chunk and one seed are held at a time"""
+    
+    WORD_PATTERN = re.compile(r'^[ \t]*([a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?)[ \t]*\r?$', re.MULTILINE)
+    NUMBER_PATTERN = re.compile(r'\d+')
+    PERMUTATION_WORDS = ('dev', 'development', 'stage', 'staging', 'test', 'qa', 'uat', 'prod', 'api',
+                         'admin', 'internal', 'beta', 'old', 'new', 'v1', 'v2')
+    
+    def __init__(self, wordlist: str = None, permutation_wordlist: str = None, numeric_range: int = 3,
+                 chunk_size: int = 1 << 20):
+        self.wordlist = wordlist
+        self.permutation_wordlist = permutation_wordlist
+        self.numeric_range = numeric_range
+        self.chunk_size = chunk_size
+    
+    def words(self, path: str) -> Iterator[str]:
+        """Stream valid labels from a wordlist a chunk at a time"""
+        with open(path, 'r', errors='replace') as f:
+            remainder = ''
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                chunk = remainder + chunk
+                cut = chunk.rfind('\n')
+                remainder = chunk[cut + 1:]
+                yield from self.WORD_PATTERN.findall(chunk[:cut + 1].lower())
+            yield from self.WORD_PATTERN.findall(remainder.lower())
+    
+    def permutation_words(self) -> Iterable[str]:
+        """Words mixed into discovered labels, re-read from disk for every seed if a file is given"""
+        if self.permutation_wordlist:
+            return self.words(self.permutation_wordlist)
+        return self.PERMUTATION_WORDS
+    
+    def brute(self, apex: str) -> Iterator[str]:
+        """Every wordlist entry as a label directly under the apex"""
+        if self.wordlist:
+            suffix = f".{apex}"
+            for word in self.words(self.wordlist):
+                yield word + suffix
+    
+    def numeric_bumps(self, label: str) -> List[str]:
+        """Neighbours of the last number in a label (api2 -> api1, api3, ...), keeping zero padding"""
+        matches = list(self.NUMBER_PATTERN.finditer(label))
+        if not matches:
+            return [f"{label}{number}" for number in range(1, self.numeric_range + 1)]
+        match = matches[-1]
+        value = int(match.group())
+        width = len(match.group())
+        bumps = []
+        for number in range(max(0, value - self.numeric_range), value + self.numeric_range + 1):
+            if number != value:
+                bumps.append(f"{label[:match.start()]}{number:0{width}d}{label[match.end():]}")
+        return bumps
+    
+    def alterations(self, seed: str) -> Iterator[str]:
+        """Names derived from one discovered name by rewriting its first label"""
+        label, _, rest = seed.partition('.')
+        for bump in self.numeric_bumps(label):
+            yield f"{bump}.{rest}"
+        for word in self.permutation_words():
+            for altered in (f"{word}-{label}", f"{label}-{word}"):
+                if len(altered) <= 63:
+                    yield f"{altered}.{rest}"
+            if len(seed) + len(word) < 253:
+                yield f"{word}.{seed}"
+    
+    def permutations(self, seeds: Iterable[str], apex: str) -> Iterator[str]:
+        """Alterations of every discovered name below the apex"""
+        for seed in seeds:
+            if seed != apex:
+                yield from self.alterations(seed)
+    
+    def generate(self, apex: str, seeds: Iterable[str] = None) -> Iterator[str]:
+        """Wordlist candidates first, then permutations of the seeds"""
+        yield from self.brute(apex)
+        if seeds is not None:
+            yield from self.permutations(seeds, apex)
+
+class AtomicOutput:
+    """Write a file under a temporary name, optionally compressed, and rename it into place"""
+    
+    EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+    
+    def __init__(self, path: str, compression: str = None):
+        self.path = path + self.EXTENSIONS.get(compression, '')
+        self.tmp_path = f"{self.path}.tmp"
+        self.compression = compression
+        self.stream = None
+    
+    def __enter__(self):
+        if self.compression == 'gzip':
+            self.stream = gzip.open(self.tmp_path, 'wt', encoding='utf-8', newline='')
+        elif self.compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("zstd compression requires the 'zstandard' package")
+            raw = open(self.tmp_path, 'wb')
+            self.stream = io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw),
+                                           encoding='utf-8', newline='')
+        else:
+            self.stream = open(self.tmp_path, 'w', encoding='utf-8', newline='')
+        return self.stream
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stream.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            try:
+                os.unlink(self.tmp_path)
+            except FileNotFoundError:
+                pass
+        return False
+
+class ResultWriter(abc.ABC):
+    """Base class for writers that stream a result set to disk one record at a time"""
+    
+    name = ''
+    
+    def __init__(self, compression: str = None):
+        self.compression = compression
+    
+    @abc.abstractmethod
+    def write(self, output_dir: str, target: str, timestamp: str, results: Dict) -> List[str]:
+        """Write the results and return the paths created"""
+    
+    def open(self, output_dir: str, filename: str) -> AtomicOutput:
+        """Open an output file that only appears once it is complete"""
+        return AtomicOutput(os.path.join(output_dir, filename), self.compression)
+    
+    @staticmethod
+    def ordered(names: Iterable[str]) -> Iterable[str]:
+        """Names in output order; a subdomain store already iterates sorted without materializing"""
+        return names if isinstance(names, SubdomainStore) else sorted(names)
+    
+    @staticmethod
+    def records(results: Dict) -> Iterator[Dict]:
+        """Merge subdomain, DNS and HTTP data into one flat record per subdomain"""
+        dns = results.get('dns', {})
+        http = results.get('http', {})
+        for subdomain in ResultWriter.ordered(results['subdomains']):
+            record = {'subdomain': subdomain, 'live': subdomain in results['live_hosts']}
+            if subdomain in dns:
+                for key in ('a', 'aaaa', 'cname'):
+                    record[key] = dns[subdomain][key]
+            if subdomain in http:
+                for key in ('status', 'title', 'final_url', 'scheme', 'port', 'content_length'):
+                    record[key] = http[subdomain][key]
+            yield record
+
+class TextWriter(ResultWriter):
+    """Plain subdomain and live host lists, one name per line"""
+    
+    name = 'txt'
+    
+    def write(self, output_dir, target, timestamp, results):
+        paths = []
+        for kind, names in (('subdomains', results['subdomains']), ('live', results['live_hosts'])):
+            output = self.open(output_dir, f"{target}_{kind}_{timestamp}.txt")
+            with output as f:
+                for subdomain in self.ordered(names):
+                    f.write(f"{subdomain}\n")
+            paths.append(output.path)
+        return paths
+
+class JSONWriter(ResultWriter):
+    """Compact JSON document, with each array streamed element by element"""
+    
+    name = 'json'
+    
+    def write(self, output_dir, target, timestamp, results):
+        output = self.open(output_dir, f"{target}_results_{timestamp}.json")
+        with output as f:
+            header = {
+                'target': results['target'],
+                'start_time': results['start_time'],
+                'end_time': results['end_time'],
+                'total_subdomains': len(results['subdomains']),
+                'live_subdomains': len(results['live_hosts']),
+                'tools_used': results['tools_used']
+            }
+            f.write(json.dumps(header, separators=(',', ':'))[:-1])
+            sections = (
+                ('subdomains', self.ordered(results['subdomains'])),
+                ('live_hosts', self.ordered(results['live_hosts'])),
+                ('dns', results.get('dns', {}).values()),
+                ('http', results.get('http', {}).values())
+            )
+            for key, items in sections:
+                f.write(f',"{key}":[')
+                for index, item in enumerate(items):
+                    if index:
+                        f.write(',')
+                    f.write(json.dumps(item, separators=(',', ':')))
+                f.write(']')
+            f.write('}\n')
+        return [output.path]
+
+class NDJSONWriter(ResultWriter):
+    """One JSON record per subdomain per line"""
+    
+    name = 'ndjson'
+    
+    def write(self, output_dir, target, timestamp, results):
+        output = self.open(output_dir, f"{target}_results_{timestamp}.ndjson")
+        with output as f:
+            for record in self.records(results):
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        return [output.path]
+
+class CSVWriter(ResultWriter):
+    """Spreadsheet-friendly table with one row per subdomain"""
+    
+    name = 'csv'
+    COLUMNS = ['subdomain', 'live', 'status', 'title', 'final_url', 'scheme', 'port',
+               'content_length', 'a', 'aaaa', 'cname']
+    
+    def write(self, output_dir, target, timestamp, results):
+        output = self.open(output_dir, f"{target}_results_{timestamp}.csv")
+        with output as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            for record in self.records(results):
+                writer.writerow([
+                    ' '.join(value) if isinstance(value, list) else ('' if value is None else value)
+                    for value in (record.get(column) for column in self.COLUMNS)
+                ])
+        return [output.path]
+
+class HTMLWriter(ResultWriter):
+    """Self-contained HTML report with a summary and one table row per subdomain"""
+    
+    name = 'html'
+    COLUMNS = ['subdomain', 'live', 'status', 'title', 'final_url', 'a', 'cname']
+    
+    def write(self, output_dir, target, timestamp, results):
+        output = self.open(output_dir, f"{target}_report_{timestamp}.html")
+        with output as f:
+            f.write(
+                '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+                f'<title>TakeTheSubs report - {html.escape(target)}</title>'
+                '<style>body{font-family:sans-serif}table{border-collapse:collapse}'
+                'td,th{border:1px solid #ccc;padding:2px 6px;text-align:left}'
+                'tr.live{background:#e8f8e8}</style></head><body>\n'
+                f'<h1>{html.escape(target)}</h1>\n'
+                f'<p>{len(results["subdomains"])} subdomains, {len(results["live_hosts"])} live. '
+                f'Tools: {html.escape(", ".join(results["tools_used"]))}. '
+                f'Started {html.escape(results["start_time"])}, finished {html.escape(results["end_time"])}.</p>\n'
+                '<table><tr>' + ''.join(f'<th>{column}</th>' for column in self.COLUMNS) + '</tr>\n'
+            )
+            for record in self.records(results):
+                cells = []
+                for column in self.COLUMNS:
+                    value = record.get(column)
+                    if isinstance(value, list):
+                        value = ' '.join(value)
+                    cells.append(f'<td>{html.escape("" if value is None else str(value))}</td>')
+                row_class = ' class="live"' if record['live'] else ''
+                f.write(f'<tr{row_class}>' + ''.join(cells) + '</tr>\n')
+            f.write('</table>\n</body></html>\n')
+        return [output.path]
+
+RESULT_WRITERS = {writer.name: writer for writer in (TextWriter, JSONWriter, NDJSONWriter, CSVWriter, HTMLWriter)}
+
+class TakeTheSubs:
+    """Main TakeTheSubs class"""
+    
+    DNS_ERRORS = ('SERVFAIL', 'REFUSED', 'FORMERR', 'NOTIMP', 'ERROR')
+    
+    def __init__(self, config_file: str = None):
+        self.version = "2.0.0"
+        self.author = "super3lr3y"
+        self.config = self.load_config(config_file)
+        self.logger = Logger(verbose=self.config.get('verbose', False))
+        self.tools = self.initialize_tools()
+        self.registry = ToolRegistry()
+        self.cache = None
+        self.delta_store = None
+        self.journal = None
+        self.api_client = None
+        self.api_client_loop = None
+        self.ingesters = {}
+        self.keep_warm = False
+        self.warm = {}
+        self.metrics = RunMetrics()
+        self.results = self.new_results()
+    
+    @staticmethod
+    def new_results(target: str = '') -> Dict:
+        """Create an empty per-run result record"""
+        return {
+            'target': target,
+            'start_time': '',
+            'end_time': '',
+            'total_subdomains': 0,
+            'live_subdomains': 0,
+            'tools_used': [],
+            'subdomains': SubdomainStore(),
+            'live_hosts': set(),
+            'dns': {},
+            'http': {}
+        }
+    
+    def load_config(self, config_file: str) -> Dict:
+        """Load configuration from file"""
+        default_config = {
+            'output_dir': './results',
+            'threads': 50,
+            'timeout': 300,
+            'tool_concurrency': 4,
+            'tool_timeouts': {},
+            'target_concurrency': 4,
+            'max_processes': 16,
+            'max_probes': 200,
+            'tool_limits': {},
+            'cache': True,
+            'cache_file': '',
+            'cache_ttl': 86400,
+            'cache_max_entries': 0,
+            'refresh': False,
+            'diff': False,
+            'probe_new_only': False,
+            'state_file': '',
+            'output_formats': ['txt', 'json'],
+            'compression': '',
+            'checkpoint': False,
+            'resume': False,
+            'store_buffer': 65536,
+            'spill_dir': '',
+            'spill_bytes': 67108864,
+            'probe_per_host': 4,
+            'probe_by_ip': False,
+            'probe_per_ip': 16,
+            'connect_timeout': 5,
+            'read_timeout': 5,
+            'adaptive': True,
+            'adaptive_min_timeout': 1,
+            'adaptive_timeout_factor': 3,
+            'adaptive_min_concurrency': 0,
+            'adaptive_max_concurrency': 0,
+            'tool_idle_timeout': 0,
+            'ingest_workers': 1,
+            'ingest_chunk_size': 33554432,
+            'probe_method': 'GET',
+            'max_body': 65536,
+            'max_redirects': 5,
+            'probe_race': True,
+            'probe_ports': [],
+            'verify_ssl': False,
+            'resolve': False,
+            'dns_filter': True,
+            'resolvers': [],
+            'dns_timeout': 2,
+            'dns_retries': 2,
+            'dns_concurrency': 500,
+            'wildcard_tests': 3,
+            'wordlist': '',
+            'permutations': False,
+            'permutation_wordlist': '',
+            'numeric_range': 3,
+            'brute_concurrency': 1000,
+            'user_agent': 'TakeTheSubs/2.0',
+            'tools': {
+                'subfinder': True,
+                'amass': True,
+                'assetfinder': True,
+                'findomain': True,
+                'chaos': False,
+                'github_search': False,
+                'shodan': True,
+                'virustotal': True
+            },
+            'apis': {
+                'shodan': '',
+                'virustotal': '',
+                'github_token': '',
+                'chaos': ''
+            },
+            'api_concurrency': 20,
+            'api_timeout': 30,
+            'api_prefetch': 2,
+            'api_max_pages': 100,
+            'api_rate_limits': {},
+            'api_endpoints': {},
+            'report_file': '',
+            'metrics_file': '',
+            'metrics_format': 'prometheus',
+            'service_listen': '127.0.0.1:8765',
+            'service_socket': '',
+            'service_history': 1000,
+            'service_refresh': 3600,
+            'shard_size': 10,
+            'lease_timeout': 60,
+            'heartbeat_interval': 10,
+            'max_attempts': 3,
+            'transport_poll': 0.5,
+            'transport_timeout': 60,
+            'cluster_token': ''
+        }
+        
+        if config_file and os.path.exists(config_file):
+            try:
+                import yaml
+            except ImportError:
+                print("Error loading config: reading a config file requires the 'pyyaml' package")
+                return default_config
+            try:
+                with open(config_file, 'r') as f:
+                    user_config = yaml.safe_load(f)
+                    default_config.update(user_config)
+            except Exception as e:
+                print(f"Error loading config: {e}")
+        
+        return default_config
+    
+    def initialize_tools(self) -> Dict[str, SubdomainTool]:
+        """Initialize subdomain enumeration tools"""
+        tools = {}
+        
+        # Subfinder
+        if self.config['tools']['subfinder']:
+            tools['subfinder'] = SubdomainTool(
+                'Subfinder',
+                'subfinder -d {target} -o {output} -silent',
+                version_args=['-version']
+            )
+        
+        # Amass
+        if self.config['tools']['amass']:
+            tools['amass'] = SubdomainTool(
+                'Amass',
+                'amass enum -passive -d {target} -o {output}',
+                version_args=['-version']
+            )
+        
+        # Assetfinder
+        if self.config['tools']['assetfinder']:
+            tools['assetfinder'] = SubdomainTool(
+                'Assetfinder',
+                'assetfinder --subs-only {target}'
+            )
+        
+        # Findomain
+        if self.config['tools']['findomain']:
+            tools['findomain'] = SubdomainTool(
+                'Findomain',
+                'findomain -t {target} -o',
+                version_args=['--version']
+            )
+        
+        return tools
+    
+    def get_api_client(self) -> APIClient:
+        """Shared API client of the running event loop, so every target draws on the same rate limits"""
+        loop = asyncio.get_running_loop()
+        if self.api_client is None or self.api_client_loop is not loop:
+            if self.api_client is not None:
+                self.api_client.close()
+            self.api_client = APIClient(
+                concurrency=self.config.get('api_concurrency', 20),
+                timeout=self.config.get('api_timeout', 30),
+                user_agent=self.config['user_agent']
+            )
+            self.api_client_loop = loop
+        return self.api_client
+    
+    def initialize_sources(self) -> Dict[str, APISource]:
+        """Create the enabled API sources that have at least one key"""
+        sources = {}
+        for name, (source_class, key_name) in API_SOURCES.items():
+            keys = self.config['apis'].get(key_name) or []
+            if isinstance(keys, str):
+                keys = [key.strip() for key in keys.split(',') if key.strip()]
+            if not keys or not self.config['tools'].get(name, False):
+                continue
+            sources[name] = source_class(
+                name, self.get_api_client(), keys,
+                base_url=self.config.get('api_endpoints', {}).get(name),
+                rate=self.config.get('api_rate_limits', {}).get(name),
+                prefetch=self.config.get('api_prefetch', 2),
+                max_pages=self.config.get('api_max_pages', 100)
+            )
+        return sources
+    
+    async def resolve_tools(self, refresh: bool = False) -> Dict[str, SubdomainTool]:
+        """Return installed tools from the shared registry, probing them on first use"""
+        probing = refresh or not self.registry.entries
+        installed = await self.registry.installed(self.tools, refresh=refresh)
+        if probing:
+            for name, tool in installed.items():
+                version = self.registry.entries[name]['version'] or 'unknown version'
+                self.logger.info(f"Found {name} ({version}) at {tool.binary_path}")
+        return installed
+    
+    def print_banner(self):
+        """Print tool banner"""
+        banner = f"""
+{Colors.CYAN}
+████████╗ █████╗ ██╗  ██╗███████╗████████╗██╗  ██╗███████╗███████╗██╗   ██╗██████╗ ███████╗
+╚══██╔══╝██╔══██╗██║ ██╔╝██╔════╝╚══██╔══╝██║  ██║██╔════╝██╔════╝██║   ██║██╔══██╗██╔════╝
+   ██║   ███████║█████╔╝ █████╗     ██║   ███████║█████╗  ███████╗██║   ██║██████╔╝███████╗
+   ██║   ██╔══██║██╔═██╗ ██╔══╝     ██║   ██╔══██║██╔══╝  ╚════██║██║   ██║██╔══██╗╚════██║
+   ██║   ██║  ██║██║  ██╗███████╗   ██║   ██║  ██║███████╗███████║╚██████╔╝██████╔╝███████║
+   ╚═╝   ╚═╝  ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝   ╚═╝  ╚═╝╚══════╝╚══════╝ ╚═════╝ ╚═════╝ ╚══════╝
+                    
+                    🎯 Advanced Subdomain Discovery Tool 🎯
+                         Created by: {self.author}
+                            Version: {self.version}
+                    🚀 Take All The Subdomains! 🚀
+{Colors.END}
+"""
+        print(banner)
+    
+    def get_ingester(self) -> Optional[ParallelIngester]:
+        """Process pool for tool output, shared across targets, unless ingestion runs in-process"""
+        workers = self.config.get('ingest_workers', 1)
+        if workers == 1:
+            return None
+        key = (workers, self.config.get('ingest_chunk_size', 33554432))
+        # Views share this dict, so every job and shard target draws on the same pool
+        if key not in self.ingesters:
+            self.ingesters[key] = ParallelIngester(*key)
+        return self.ingesters[key]
+    
+    def get_cache(self, output_dir: str) -> Optional[ToolCache]:
+        """Open the tool output cache for an output directory, if caching is enabled"""
+        if not self.config.get('cache', True):
+            return None
+        path = self.config.get('cache_file') or os.path.join(output_dir, '.takethesubs_cache.sqlite')
+        if self.cache is None or self.cache.path != path:
+            if self.cache is not None:
+                self.cache.close()
+            self.cache = ToolCache(path, ttl=self.config.get('cache_ttl', 86400),
+                                   max_entries=self.config.get('cache_max_entries', 0))
+        return self.cache
+    
+    def get_delta_store(self, output_dir: str) -> DeltaStore:
+        """Open the per-target state used by diff mode"""
+        path = self.config.get('state_file') or os.path.join(output_dir, '.takethesubs_state.sqlite')
+        if self.delta_store is None or self.delta_store.path != path:
+            if self.delta_store is not None:
+                self.delta_store.close()
+            self.delta_store = DeltaStore(path)
+        return self.delta_store
+    
+    def get_journal(self, output_dir: str) -> Optional[CheckpointJournal]:
+        """Open the checkpoint journal for an output directory, if checkpointing is enabled"""
+        if not self.config.get('checkpoint', False):
+            return None
+        path = os.path.join(output_dir, '.takethesubs_journal.ndjson')
+        if self.journal is None or self.journal.path != path:
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = CheckpointJournal(path, resume=self.config.get('resume', False))
+        return self.journal
+    
+    def discard_journal(self):
+        """Delete the checkpoint journal of a run that finished without failures"""
+        if self.journal is not None:
+            self.journal.discard()
+            self.journal = None
+    
+    def new_store(self, output_dir: str) -> SubdomainStore:
+        """Create a subdomain store that spills large merged runs next to the results"""
+        return SubdomainStore(
+            buffer_size=self.config.get('store_buffer', 65536),
+            spill_dir=self.config.get('spill_dir') or os.path.join(output_dir, '.takethesubs_spill'),
+            spill_bytes=self.config.get('spill_bytes', 67108864)
+        )
+    
+    def close(self):
+        """Flush and close the cache, diff state, checkpoint journal, ingestion pool and API and probe connections"""
+        for handle in (self.cache, self.delta_store, self.journal, self.api_client, *self.ingesters.values()):
+            if handle is not None:
+                handle.close()
+        self.cache = self.delta_store = self.journal = self.api_client = None
+        self.ingesters.clear()
+        self.close_warm()
+    
+    def with_config(self, overrides: Dict) -> 'TakeTheSubs':
+        """A view of this instance with some settings changed, sharing its caches, registry and connections"""
+        view = copy.copy(self)
+        view.config = dict(self.config, **overrides)
+        if 'tools' in overrides:
+            # Tools are built from the config once, so a view that switches some on or off needs its own set
+            view.tools = view.initialize_tools()
+        return view
+    
+    def warm_resource(self, key: Tuple, factory):
+        """Reuse a prober or resolver across scans when kept warm, otherwise build a fresh one"""
+        if not self.keep_warm:
+            return factory()
+        if key not in self.warm:
+            self.warm[key] = factory()
+        return self.warm[key]
+    
+    def close_warm(self):
+        """Close the probers and resolvers kept between scans; call it while their event loop still runs"""
+        for handle in self.warm.values():
+            handle.close()
+        self.warm.clear()
+    
+    def release(self, handle):
+        """Close a prober or resolver unless it is kept warm for the next scan"""
+        if not self.keep_warm:
+            handle.close()
+    
+    def write_reports(self):
+        """Write the run report and metrics textfile, if configured"""
+        if self.config.get('report_file'):
+            self.metrics.write_report(self.config['report_file'])
+            self.logger.info(f"Run report saved to {self.config['report_file']}")
+        if self.config.get('metrics_file'):
+            self.metrics.write_metrics(self.config['metrics_file'],
+                                       openmetrics=self.config.get('metrics_format') == 'openmetrics')
+    
+    def cached_output(self, cache: Optional[ToolCache], tool_name: str, tool: SubdomainTool,
+                      target: str) -> Optional[NameRun]:
+        """Look up fresh cached output for a tool, unless a refresh was requested"""
+        if cache is None or self.config.get('refresh', False):
+            return None
+        version = self.registry.entries.get(tool_name, {}).get('version')
+        return cache.get(tool_name, target, version, tool.command)
+    
+    def store_output(self, cache: Optional[ToolCache], tool_name: str, tool: SubdomainTool,
+                     target: str, run: NameRun):
+        """Remember a successful tool run"""
+        if cache is not None:
+            version = self.registry.entries.get(tool_name, {}).get('version')
+            cache.put(tool_name, target, version, tool.command, run)
+    
+    async def run_tools(self, tools: Dict[str, SubdomainTool], target: str, output_dir: str,
+                        limits: RunLimits = None) -> SubdomainStore:
+        """Run enumeration tools concurrently and merge their output as it streams in"""
+        scheduler = ToolScheduler(
+            max_concurrency=self.config.get('tool_concurrency', 4),
+            timeout=self.config.get('timeout', 300),
+            tool_timeouts=self.config.get('tool_timeouts'),
+            limits=limits,
+            idle_timeout=self.config.get('tool_idle_timeout', 0),
+            ingester=self.get_ingester()
+        )
+        all_subdomains = self.new_store(output_dir)
+        cache = self.get_cache(output_dir)
+        journal = self.get_journal(output_dir)
         
-        def check_host(subdomain):
-            try:
-                # Try HTTP first, then HTTPS
-                for protocol in ['http', 'https']:
-                    url = f"{protocol}://{subdomain}"
-                    response = requests.get(
-                        url,
-                        timeout=5,
-                        verify=False,
-                        allow_redirects=True,
-                        headers={'User-Agent': self.config['user_agent']}
-                    )
-                    if response.status_code < 400:
-                        return subdomain
-            except:
-                pass
+        # Reuse output of tools finished before an interruption, then the cache, and only launch the rest
+        pending = {}
+        for name, tool in tools.items():
+            resumed = journal.tool_output(target, name) if journal is not None else None
+            if resumed is not None:
+                all_subdomains.add_run(resumed)
+                self.logger.success(f"{name} found {len(resumed)} subdomains (resumed)")
+                self.metrics.record('tool', target, name, 'resumed', items=len(resumed))
+                continue
+            cached = self.cached_output(cache, name, tool, target)
+            if cached is None:
+                pending[name] = tool
+            else:
+                all_subdomains.add_run(cached)
+                self.logger.success(f"{name} found {len(cached)} subdomains (cached)")
+                self.metrics.record('tool', target, name, 'cached', items=len(cached))
+                if journal is not None:
+                    journal.tool_done(target, name, cached)
+        
+        keep_output = cache is not None or journal is not None
+        tool_output = {name: [] for name in pending} if keep_output else {}
+        records = {}
+        
+        def on_start(name):
+            self.logger.info(f"Running {name} on {target}")
+            records[name] = self.metrics.start('tool', target, name)
+        
+        def on_finish(name, count, outcome):
+            status = outcome.get('status', 'ok')
+            self.logger.success(f"{name} found {count} subdomains" + (" (stopped idle)" if status == 'idle' else ""))
+            record = records.pop(name)
+            record.update(items=count, errors=int(status in ('failed', 'error')), timeouts=int(status == 'timeout'))
+            self.metrics.finish(record, status)
+            if name in tool_output:
+                if status in ('ok', 'idle'):
+                    # Ingested output already is a run; names streamed in-process are sorted into one
+                    output = tool_output[name]
+                    run = output if isinstance(output, NameRun) else NameRun.from_names(output)
+                    self.store_output(cache, name, tools[name], target, run)
+                    if journal is not None:
+                        journal.tool_done(target, name, run)
+                del tool_output[name]
+        
+        def on_error(name, error):
+            self.logger.error(f"{name} failed: {str(error)}")
+        
+        async for name, subdomain in scheduler.stream(pending, target, output_dir, on_start=on_start,
+                                                      on_finish=on_finish, on_error=on_error):
+            if isinstance(subdomain, NameRun):
+                # A whole tool's output, already validated and deduplicated by the ingestion pool
+                all_subdomains.add_run(subdomain)
+                if name in tool_output:
+                    tool_output[name] = subdomain
+                continue
+            all_subdomains.add(subdomain)
+            if name in tool_output:
+                tool_output[name].append(subdomain)
+        return all_subdomains
+    
+    def create_prober(self, limits: RunLimits = None) -> HTTPProber:
+        """Build an HTTP prober from the configuration"""
+        return self.warm_resource(('prober', limits, self.config['threads']), lambda: HTTPProber(
+            concurrency=self.config['threads'],
+            per_host=self.config.get('probe_per_host', 4),
+            connect_timeout=self.config.get('connect_timeout', 5),
+            read_timeout=self.config.get('read_timeout', 5),
+            method=self.config.get('probe_method', 'GET'),
+            max_body=self.config.get('max_body', 65536),
+            max_redirects=self.config.get('max_redirects', 5),
+            verify_ssl=self.config.get('verify_ssl', False),
+            user_agent=self.config['user_agent'],
+            global_limit=limits.probes if limits else None,
+            race=self.config.get('probe_race', True),
+            extra_ports=self.config.get('probe_ports'),
+            controller=self.create_controller(),
+            per_ip=self.config.get('probe_per_ip', 16)
+        ))
+    
+    def create_controller(self) -> Optional[AdaptiveController]:
+        """Build the adaptive timeout and concurrency controller, unless adaptive probing is off"""
+        if not self.config.get('adaptive', True):
             return None
+        threads = self.config['threads']
+        return AdaptiveController(
+            timeout=max(self.config.get('connect_timeout', 5), self.config.get('read_timeout', 5)),
+            min_timeout=self.config.get('adaptive_min_timeout', 1),
+            timeout_factor=self.config.get('adaptive_timeout_factor', 3),
+            concurrency=threads,
+            min_concurrency=self.config.get('adaptive_min_concurrency') or max(1, threads // 10),
+            max_concurrency=self.config.get('adaptive_max_concurrency') or threads * 4
+        )
+    
+    def create_resolver(self, concurrency: int = None) -> DNSResolver:
+        """Build a DNS resolver from the configuration"""
+        concurrency = concurrency or self.config.get('dns_concurrency', 500)
+        return self.warm_resource(('resolver', concurrency), lambda: DNSResolver(
+            nameservers=self.config.get('resolvers') or None,
+            timeout=self.config.get('dns_timeout', 2),
+            retries=self.config.get('dns_retries', 2),
+            concurrency=concurrency,
+            wildcard_tests=self.config.get('wildcard_tests', 3)
+        ))
+    
+    async def resolve_subdomains(self, subdomains: Set[str], apex: str) -> Dict[str, Dict]:
+        """Resolve subdomains and return the records of those that exist outside a wildcard"""
+        self.logger.info(f"Resolving {len(subdomains)} subdomains...")
+        resolved = {}
+        wildcard_hits = 0
         
-        with ThreadPoolExecutor(max_workers=self.config['threads']) as executor:
-            futures = {executor.submit(check_host, sub): sub for sub in subdomains}
-            
-            for future in as_completed(futures):
-                result = future.result()
-                if result:
-                    live_hosts.add(result)
+        resolver = self.create_resolver()
+        try:
+            with self.metrics.stage('resolve', apex) as stage:
+                async for record in resolver.resolve_many(subdomains, apex=apex):
+                    stage['items'] += 1
+                    if record['status'] == 'TIMEOUT':
+                        stage['timeouts'] += 1
+                    elif record['status'] in self.DNS_ERRORS:
+                        stage['errors'] += 1
+                    if record['wildcard']:
+                        wildcard_hits += 1
+                    elif record['status'] == 'NOERROR':
+                        resolved[record['host']] = record
+        finally:
+            self.release(resolver)
+        
+        if wildcard_hits:
+            self.logger.warning(f"Dropped {wildcard_hits} subdomains answered only by wildcard DNS")
+        self.logger.success(f"Resolved {len(resolved)} subdomains")
+        return resolved
+    
+    async def bruteforce(self, target: str, seeds: Iterable[str], known: SubdomainStore) -> Dict[str, Dict]:
+        """Resolve wordlist and permutation candidates and return the records of new, non-wildcard names"""
+        generator = CandidateGenerator(
+            wordlist=self.config.get('wordlist') or None,
+            permutation_wordlist=self.config.get('permutation_wordlist') or None,
+            numeric_range=self.config.get('numeric_range', 3)
+        )
+        candidates = generator.generate(target, seeds if self.config.get('permutations', False) else None)
+        self.logger.info(f"Brute-forcing {target}...")
+        found = {}
+        tried = 0
+        wildcard_hits = 0
+        started = time.monotonic()
+        
+        resolver = self.create_resolver(self.config.get('brute_concurrency', 1000))
+        try:
+            with self.metrics.stage('bruteforce', target) as stage:
+                # Existence only needs the A query: a name with other records answers NODATA instead of NXDOMAIN
+                async for record in resolver.resolve_many(candidates, zone_wildcards=True, rtypes=(1,)):
+                    tried += 1
+                    if record['status'] == 'TIMEOUT':
+                        stage['timeouts'] += 1
+                    elif record['status'] in self.DNS_ERRORS:
+                        stage['errors'] += 1
+                    if record['wildcard']:
+                        wildcard_hits += 1
+                    elif record['status'] in ('NOERROR', 'NODATA') and record['host'] not in known:
+                        found[record['host']] = record
+                stage['items'] = tried
+        finally:
+            self.release(resolver)
+        
+        elapsed = max(time.monotonic() - started, 1e-6)
+        if wildcard_hits:
+            self.logger.warning(f"Dropped {wildcard_hits} candidates answered only by wildcard DNS")
+        self.logger.success(f"Brute force tried {tried} candidates ({tried / elapsed:.0f}/s), "
+                            f"found {len(found)} new subdomains")
+        return found
+    
+    def verify_subdomains(self, subdomains: Set[str], limits: RunLimits = None) -> Set[str]:
+        """Verify which subdomains are live"""
+        return set(asyncio.run(self.probe_subdomains(subdomains, limits)))
+    
+    async def probe_subdomains(self, subdomains: Set[str], limits: RunLimits = None,
+                               target: str = None, dns: Dict[str, Dict] = None) -> Dict[str, Dict]:
+        """Probe subdomains over HTTP(S) and return the probe record of each live one"""
+        self.logger.info(f"Verifying {len(subdomains)} subdomains...")
+        live_hosts = {}
+        journal = self.journal if target else None
+        
+        # Hosts probed before an interruption keep their journaled outcome
+        if journal is not None:
+            probed = journal.probed_hosts(target)
+            if probed:
+                for host in subdomains:
+                    if probed.get(host):
+                        live_hosts[host] = probed[host]
+                subdomains = [host for host in subdomains if host not in probed]
+                self.logger.info(f"Resuming: {len(subdomains)} subdomains left to verify")
+        
+        # Probing by resolved address lets virtual hosts of one backend share connections and TLS sessions
+        addresses = None
+        if dns and self.config.get('probe_by_ip', False):
+            addresses = {host: (record['a'] or record['aaaa'])[0] for host, record in dns.items()
+                         if record['a'] or record['aaaa']}
         
+        prober = self.create_prober(limits)
+        # A warm prober carries counts from earlier targets, and concurrent targets share it
+        before = collections.Counter(prober.stats)
+        try:
+            with self.metrics.stage('verify', target or '') as record:
+                async for result in prober.probe_many(subdomains, addresses=addresses):
+                    record['items'] += 1
+                    if result['error'] == 'TimeoutError':
+                        record['timeouts'] += 1
+                    elif result['error']:
+                        record['errors'] += 1
+                    if result['elapsed'] is not None:
+                        self.metrics.observe('probe_latency_seconds', result['elapsed'])
+                    if result['alive']:
+                        live_hosts[result['host']] = result
+                    if journal is not None:
+                        journal.probe_done(target, result)
+                # Transport work of this target: connections opened and reused, TLS handshakes and bytes
+                stats = prober.stats - before
+                record.update(stats)
+                for name, value in stats.items():
+                    self.metrics.add(f"probe_{name}", value)
+        finally:
+            self.release(prober)
+        
+        self.logger.info(f"Probing opened {stats['connections']} connections ({stats['reused']} reuses), "
+                         f"{stats['handshakes']} TLS handshakes ({stats['resumed']} resumed), "
+                         f"sent {stats['bytes_sent']} and received {stats['bytes_received']} bytes")
+        
+        if prober.controller is not None:
+            self.logger.info(f"Adaptive probing settled at {prober.controller.limit} concurrent requests, "
+                             f"{prober.controller.timeout:.1f}s timeout")
         self.logger.success(f"Found {len(live_hosts)} live subdomains")
         return live_hosts
     
-    def save_results(self, target: str, output_dir: str):
+    def save_results(self, target: str, output_dir: str, results: Dict = None):
         """Save results in multiple formats"""
+        results = results or self.results
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Save as text
-        txt_file = os.path.join(output_dir, f"{target}_subdomains_{timestamp}.txt")
-        with open(txt_file, 'w') as f:
-            for subdomain in sorted(self.results['subdomains']):
-                f.write(f"{subdomain}\n")
+        files = []
+        for name in self.config.get('output_formats', ['txt', 'json']):
+            writer = RESULT_WRITERS[name](compression=self.config.get('compression') or None)
+            with self.metrics.stage('save', target, name) as record:
+                written = writer.write(output_dir, target, timestamp, results)
+                record['items'] = len(written)
+            files.extend(written)
         
-        # Save live hosts
-        live_file = os.path.join(output_dir, f"{target}_live_{timestamp}.txt")
-        with open(live_file, 'w') as f:
-            for subdomain in sorted(self.results['live_hosts']):
+        self.logger.success(f"Results saved to {output_dir}")
+        return tuple(files)
+    
+    def save_diff(self, target: str, output_dir: str, results: Dict, delta: Dict):
+        """Save only what changed since the previous run"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        record = self.metrics.start('save', target, 'diff')
+        # Like the full results, changes only appear once complete and honour the compression setting
+        compression = self.config.get('compression') or None
+        
+        # New subdomains as text, one per line
+        new_file = AtomicOutput(os.path.join(output_dir, f"{target}_new_{timestamp}.txt"), compression)
+        with new_file as f:
+            for subdomain in delta['subdomains']['added']:
                 f.write(f"{subdomain}\n")
         
-        # Save as JSON
-        json_file = os.path.join(output_dir, f"{target}_results_{timestamp}.json")
+        # Full delta as JSON
+        diff_file = AtomicOutput(os.path.join(output_dir, f"{target}_diff_{timestamp}.json"), compression)
+        http = results.get('http', {})
         json_data = {
-            'target': self.results['target'],
-            'start_time': self.results['start_time'],
-            'end_time': self.results['end_time'],
-            'total_subdomains': len(self.results['subdomains']),
-            'live_subdomains': len(self.results['live_hosts']),
-            'tools_used': self.results['tools_used'],
-            'subdomains': list(self.results['subdomains']),
-            'live_hosts': list(self.results['live_hosts'])
+            'target': results['target'],
+            'start_time': results['start_time'],
+            'end_time': results['end_time'],
+            'total_subdomains': len(results['subdomains']),
+            'tools_used': results['tools_used'],
+            'added_subdomains': delta['subdomains']['added'],
+            'removed_subdomains': delta['subdomains']['removed']
         }
+        if 'live_hosts' in delta:
+            json_data['new_live_hosts'] = delta['live_hosts']['added']
+            json_data['gone_live_hosts'] = delta['live_hosts']['removed']
+            json_data['http'] = [http[host] for host in delta['live_hosts']['added'] if host in http]
         
-        with open(json_file, 'w') as f:
+        with diff_file as f:
             json.dump(json_data, f, indent=2)
         
-        self.logger.success(f"Results saved to {output_dir}")
-        return txt_file, live_file, json_file
+        record['items'] = 2
+        self.metrics.finish(record)
+        self.logger.success(f"Changes saved to {output_dir}")
+        return new_file.path, diff_file.path
     
     def enumerate_target(self, target: str, output_dir: str = None) -> Dict:
         """Main enumeration function for a single target"""
+        result = asyncio.run(self.enumerate_target_async(target, output_dir))
+        self.discard_journal()
+        return result
+    
+    async def enumerate_target_async(self, target: str, output_dir: str = None,
+                                     limits: RunLimits = None) -> Dict:
+        """Enumerate a single target with its own isolated result state"""
         if not output_dir:
             output_dir = os.path.join(self.config['output_dir'], target)
         
         os.makedirs(output_dir, exist_ok=True)
         
-        self.results['target'] = target
-        self.results['start_time'] = datetime.now().isoformat()
+        journal = self.get_journal(output_dir)
+        if journal is not None and target in journal.targets_done:
+            self.logger.warning(f"{target} was already completed in the resumed run, skipping...")
+            return {'target': target, 'total_subdomains': 0, 'live_subdomains': 0,
+                    'output_files': (), 'skipped': True}
+        
+        results = self.new_results(target)
+        results['start_time'] = datetime.now().isoformat()
+        record = self.metrics.start('target', target)
+        # The cache outlives the target, so its counters are read as a difference from here
+        cache_start = (self.cache, self.cache.stats(target) if self.cache is not None else None)
         
         self.logger.info(f"TakeTheSubs v{self.version} - Starting subdomain enumeration...")
         self.logger.info(f"Target: {target}")
         self.logger.info(f"Output: {output_dir}")
         self.logger.info(f"Threads: {self.config['threads']}")
         
-        all_subdomains = set()
-        tools_used = []
-        
-        # Run tools sequentially for better output
-        for name, tool in self.tools.items():
-            if tool.is_installed():
-                subdomains = self.run_tool(name, tool, target, output_dir)
-                all_subdomains.update(subdomains)
-                tools_used.append(name)
-            else:
+        installed_tools = await self.resolve_tools()
+        for name in self.tools:
+            if name not in installed_tools:
                 self.logger.warning(f"{name} is not installed, skipping...")
         
-        # Remove duplicates and filter
-        unique_subdomains = {sub for sub in all_subdomains if target in sub}
+        # API sources stream through the same scheduler, cache and dedup path as the tools
+        sources = self.initialize_sources()
+        for name, source in sources.items():
+            self.logger.info(f"Using {name} API ({len(source.keys.buckets)} key(s))")
+        installed_tools.update(sources)
+        
+        all_subdomains = await self.run_tools(installed_tools, target, output_dir, limits)
+        tools_used = list(installed_tools)
+        
+        # Keep only names at or below the target apex (not merely containing it)
+        unique_subdomains = all_subdomains.restrict(target)
+        
+        # Active enumeration: wordlist and permutations of what the passive sources found
+        if self.config.get('wordlist') or self.config.get('permutations', False):
+            brute_records = await self.bruteforce(target, unique_subdomains, unique_subdomains)
+            unique_subdomains.update(brute_records)
+            results['dns'].update(brute_records)
+            tools_used.append('bruteforce')
+        
+        results['subdomains'] = unique_subdomains
+        results['tools_used'] = tools_used
+        
+        # Compare with what earlier runs saw, optionally narrowing probing to new names
+        candidates = unique_subdomains
+        new_only = self.config.get('probe_new_only', False)
+        delta = None
+        if self.config.get('diff', False) or new_only:
+            store = self.get_delta_store(output_dir)
+            delta = {'subdomains': store.update(target, 'subdomain', unique_subdomains)}
+            self.logger.info(
+                f"Since last run: {len(delta['subdomains']['added'])} new, "
+                f"{len(delta['subdomains']['removed'])} removed subdomains"
+            )
+            if new_only:
+                candidates = set(delta['subdomains']['added'])
         
-        self.results['subdomains'] = unique_subdomains
-        self.results['tools_used'] = tools_used
+        # Resolve names first so HTTP probing skips those that can never answer
+        verify = self.config.get('verify', False)
+        if candidates and (self.config.get('resolve') or (verify and self.config.get('dns_filter', True))):
+            results['dns'] = await self.resolve_subdomains(candidates, target)
+            candidates = set(results['dns'])
         
         # Verify live hosts if requested
-        if unique_subdomains and self.config.get('verify', False):
-            self.results['live_hosts'] = self.verify_subdomains(unique_subdomains)
+        if candidates and verify:
+            results['http'] = await self.probe_subdomains(candidates, limits, target, results.get('dns'))
+            results['live_hosts'] = set(results['http'])
         
-        self.results['end_time'] = datetime.now().isoformat()
+        # Unchanged hosts weren't re-probed in new-only mode, so nothing can be reported as gone
+        if delta is not None and verify:
+            delta['live_hosts'] = store.update(target, 'live', results['live_hosts'], complete=not new_only)
+            self.logger.info(
+                f"Since last run: {len(delta['live_hosts']['added'])} newly live, "
+                f"{len(delta['live_hosts']['removed'])} no longer live"
+            )
+        
+        results['end_time'] = datetime.now().isoformat()
+        results['total_subdomains'] = len(results['subdomains'])
+        results['live_subdomains'] = len(results['live_hosts'])
+        self.results = results
         
         # Print summary
-        self.logger.success(f"Subdomain enumeration completed!")
+        self.logger.success(f"Subdomain enumeration of {target} completed!")
         self.logger.info(f"Total subdomains found: {len(unique_subdomains)}")
-        if self.results['live_hosts']:
-            self.logger.info(f"Live subdomains: {len(self.results['live_hosts'])}")
+        if results['live_hosts']:
+            self.logger.info(f"Live subdomains: {len(results['live_hosts'])}")
+        if self.cache is not None:
+            stats = self.cache.stats(target)
+            if self.cache is cache_start[0]:
+                stats = {key: value - cache_start[1][key] for key, value in stats.items()}
+            self.logger.info(f"Cache: {stats['hits']} hits, {stats['misses']} misses")
         
         # Save results
-        files = self.save_results(target, output_dir)
+        if delta is not None:
+            files = await asyncio.to_thread(self.save_diff, target, output_dir, results, delta)
+        else:
+            files = await asyncio.to_thread(self.save_results, target, output_dir, results)
+        if journal is not None:
+            journal.target_done(target)
+        record['items'] = len(unique_subdomains)
+        self.metrics.finish(record)
         
         print(f"{Colors.GREEN}🎯 Take All The Subdomains! 🚀{Colors.END}")
         
         return {
             'target': target,
             'total_subdomains': len(unique_subdomains),
-            'live_subdomains': len(self.results['live_hosts']),
+            'live_subdomains': len(results['live_hosts']),
             'output_files': files
         }
+    
+    def enumerate_targets(self, targets: List[str], output_dir: str = None) -> Dict:
+        """Enumerate many targets concurrently under global limits"""
+        return asyncio.run(self.enumerate_targets_async(targets, output_dir))
+    
+    async def enumerate_targets_async(self, targets: List[str], output_dir: str = None) -> Dict:
+        """Run a bounded pool of targets at once, sharing process and probe limits"""
+        limits = RunLimits(
+            max_processes=self.config.get('max_processes'),
+            max_probes=self.config.get('max_probes'),
+            tool_limits=self.config.get('tool_limits')
+        )
+        target_slots = asyncio.Semaphore(max(1, self.config.get('target_concurrency', 4)))
+        summary = {
+            'targets': len(targets),
+            'completed': 0,
+            'failed': [],
+            'total_subdomains': 0,
+            'live_subdomains': 0,
+            'start_time': datetime.now().isoformat(),
+            'end_time': ''
+        }
+        started = time.monotonic()
+        
+        # Probe tools once up front so concurrent targets don't race to do it
+        await self.resolve_tools()
+        
+        async def run_target(target: str):
+            async with target_slots:
+                try:
+                    result = await self.enumerate_target_async(target, output_dir, limits)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Failed to process {target}: {e}")
+                    summary['failed'].append(target)
+                    return
+                
+                summary['completed'] += 1
+                summary['total_subdomains'] += result['total_subdomains']
+                summary['live_subdomains'] += result['live_subdomains']
+                self.logger.info(
+                    f"Progress: {summary['completed'] + len(summary['failed'])}/{len(targets)} targets done"
+                )
+        
+        await asyncio.gather(*(run_target(target) for target in targets))
+        # Keep the journal while some targets failed, so --resume can retry just those
+        if not summary['failed']:
+            self.discard_journal()
+        
+        summary['end_time'] = datetime.now().isoformat()
+        summary['elapsed'] = round(time.monotonic() - started, 2)
+        if self.cache is not None:
+            summary['cache'] = self.cache.stats()
+        self.print_batch_summary(summary)
+        return summary
+    
+    def print_batch_summary(self, summary: Dict):
+        """Print the aggregate summary of a multi-target run"""
+        self.logger.success(f"Batch completed in {summary['elapsed']}s")
+        self.logger.info(f"Targets: {summary['completed']}/{summary['targets']} completed")
+        if summary['failed']:
+            self.logger.warning(f"Failed targets: {', '.join(summary['failed'])}")
+        self.logger.info(f"Total subdomains found: {summary['total_subdomains']}")
+        if summary['live_subdomains']:
+            self.logger.info(f"Live subdomains: {summary['live_subdomains']}")
+        if 'cache' in summary:
+            self.logger.info(f"Cache: {summary['cache']['hits']} hits, {summary['cache']['misses']} misses")
+
+CURRENT_JOB = contextvars.ContextVar('current_job', default=None)
+
+class ScanJob:
+    """One queued scan and the progress events it has produced"""
+    
+    def __init__(self, job_id: str, target: str, priority: int = 0, options: Dict = None):
+        self.id = job_id
+        self.target = target
+        self.priority = priority
+        self.options = options or {}
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.summary = None
+        self.results = None
+        self.error = None
+        self.task = None
+        self.events = []
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        self.event('queued', priority=priority)
+    
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed', 'cancelled')
+    
+    def event(self, kind: str, **data):
+        """Record an event; safe to call from the worker threads used for saving"""
+        entry = {'seq': len(self.events), 'time': time.time(), 'type': kind, **data}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._append(entry)
+        else:
+            self.loop.call_soon_threadsafe(self._append, entry)
+    
+    def _append(self, entry: Dict):
+        entry['seq'] = len(self.events)
+        self.events.append(entry)
+        # Wake every follower, then start a fresh generation for the next event
+        self.changed.set()
+        self.changed = asyncio.Event()
+    
+    def describe(self) -> Dict:
+        """Public view of the job"""
+        return {
+            'id': self.id,
+            'target': self.target,
+            'priority': self.priority,
+            'options': self.options,
+            'status': self.status,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'summary': self.summary,
+            'error': self.error
+        }
+
+class JobLogger(Logger):
+    """Logger that also records each message as an event of the job it was logged for"""
+    
+    def record(self, level: str, message: str):
+        job = CURRENT_JOB.get()
+        if job is not None:
+            job.event('log', level=level, message=message)
+    
+    def info(self, message: str):
+        super().info(message)
+        self.record('info', message)
+    
+    def warning(self, message: str):
+        super().warning(message)
+        self.record('warning', message)
+    
+    def error(self, message: str):
+        super().error(message)
+        self.record('error', message)
+    
+    def success(self, message: str):
+        super().success(message)
+        self.record('success', message)
+
+class ScanService:
+    """Resident scan service: a priority job queue behind a small local HTTP API"""
+    
+    # Per-job settings a client may change, with their JSON types; anything shaping shared connections
+    # stays service-wide, as do file paths such as the wordlist, which a client must not pick
+    JOB_OPTIONS = {
+        'verify': bool, 'resolve': bool, 'dns_filter': bool, 'permutations': bool,
+        'diff': bool, 'probe_new_only': bool, 'refresh': bool, 'output_formats': list, 'compression': (str, type(None)),
+        'tools': dict, 'threads': int, 'timeout': (int, float), 'tool_timeouts': dict
+    }
+    MAX_BODY = 1048576
+    
+    def __init__(self, scanner: TakeTheSubs, output_dir: str):
+        self.scanner = scanner
+        self.output_dir = output_dir
+        self.config = scanner.config
+        self.jobs = collections.OrderedDict()
+        self.queue = None
+        self.limits = None
+        self.workers = []
+        self.running = 0
+        self.sequence = itertools.count()
+        self.warmed_at = time.monotonic()
+    
+    def prepare(self):
+        """Share caches and connections between jobs instead of reopening them per scan"""
+        scanner = self.scanner
+        scanner.keep_warm = True
+        # Resuming is for interrupted one-shot runs; a service must rescan a target every time it is asked
+        scanner.config['checkpoint'] = False
+        # Jobs write to per-target directories but share one cache and one diff state
+        for key, filename in (('cache_file', '.takethesubs_cache.sqlite'), ('state_file', '.takethesubs_state.sqlite')):
+            scanner.config[key] = scanner.config.get(key) or os.path.join(self.output_dir, filename)
+        scanner.metrics = RunMetrics(max_records=self.config.get('service_history', 1000) * 20)
+        scanner.logger = JobLogger(verbose=self.config.get('verbose', False))
+        os.makedirs(self.output_dir, exist_ok=True)
+        scanner.get_cache(self.output_dir)
+        scanner.get_delta_store(self.output_dir)
+        scanner.get_api_client()
+        self.limits = RunLimits(
+            max_processes=self.config.get('max_processes'),
+            max_probes=self.config.get('max_probes'),
+            tool_limits=self.config.get('tool_limits')
+        )
+    
+    def submit(self, target: str, priority: int = 0, options: Dict = None) -> ScanJob:
+        """Validate and queue a scan"""
+        target = DomainNormalizer.normalize(target or '')
+        if not target or not SubdomainTool.is_valid_domain(target):
+            raise ValueError('invalid target')
+        options = options or {}
+        unknown = [name for name in options if name not in self.JOB_OPTIONS]
+        if unknown:
+            raise ValueError(f"unsupported option(s): {', '.join(unknown)}")
+        for name, value in options.items():
+            self.check_option(name, value)
+        
+        job = ScanJob(f"{int(time.time() * 1000):x}-{next(self.sequence)}", target, int(priority), options)
+        self.jobs[job.id] = job
+        self.queue.put_nowait((-job.priority, next(self.sequence), job))
+        self.forget_old_jobs()
+        return job
+    
+    @classmethod
+    def check_option(cls, name: str, value):
+        """Reject a job option of the wrong type or out of range before it reaches a worker"""
+        expected = cls.JOB_OPTIONS[name]
+        # JSON true/false would pass as integers otherwise
+        if (isinstance(value, bool) and expected is not bool) or not isinstance(value, expected):
+            raise ValueError(f"option {name} has the wrong type")
+        if name in ('threads', 'timeout') and value <= 0:
+            raise ValueError(f"option {name} must be positive")
+        if name == 'output_formats' and any(not isinstance(fmt, str) or fmt not in RESULT_WRITERS for fmt in value):
+            raise ValueError('unknown output format')
+        if name == 'compression' and value and value not in AtomicOutput.EXTENSIONS:
+            raise ValueError('unknown compression')
+        if name == 'tools' and not all(isinstance(enabled, bool) for enabled in value.values()):
+            raise ValueError('option tools maps tool names to true or false')
+        if name == 'tool_timeouts' and not all(
+                isinstance(limit, (int, float)) and not isinstance(limit, bool) and limit > 0
+                for limit in value.values()):
+            raise ValueError('option tool_timeouts maps tool names to positive numbers of seconds')
+    
+    def forget_old_jobs(self):
+        """Drop the oldest finished jobs beyond the history limit"""
+        excess = len(self.jobs) - self.config.get('service_history', 1000)
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done][:max(0, excess)]:
+            del self.jobs[job_id]
+    
+    def cancel(self, job: ScanJob):
+        """Cancel a queued or running job"""
+        if job.status == 'queued':
+            self.finish(job, 'cancelled')
+        elif job.status == 'running' and job.task is not None:
+            job.task.cancel()
+    
+    def finish(self, job: ScanJob, status: str, error: str = None):
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+        job.event(status, **({'error': error} if error else {}))
+    
+    def cool_down(self):
+        """Rebuild warm probers and resolvers now and then so wildcard knowledge doesn't go stale"""
+        if self.running or time.monotonic() - self.warmed_at < self.config.get('service_refresh', 3600):
+            return
+        self.scanner.close_warm()
+        self.warmed_at = time.monotonic()
+    
+    async def worker(self):
+        """Take jobs off the queue by priority, one at a time"""
+        while True:
+            _, _, job = await self.queue.get()
+            if job.status != 'queued':
+                continue
+            self.cool_down()
+            self.running += 1
+            job.task = asyncio.ensure_future(self.run_job(job))
+            try:
+                await asyncio.wait([job.task])
+            finally:
+                self.running -= 1
+            if job.task.cancelled():
+                self.finish(job, 'cancelled')
+    
+    async def run_job(self, job: ScanJob):
+        """Run one scan with the job's settings on top of the shared, warm scanner"""
+        CURRENT_JOB.set(job)
+        job.status = 'running'
+        job.started = time.time()
+        job.event('started')
+        
+        overrides = dict(job.options)
+        if 'tools' in overrides:
+            overrides['tools'] = dict(self.config['tools'], **overrides['tools'])
+        scanner = self.scanner.with_config(overrides)
+        try:
+            summary = await scanner.enumerate_target_async(job.target, os.path.join(self.output_dir, job.target),
+                                                           self.limits)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.finish(job, 'failed', str(e))
+            return
+        
+        job.summary = {key: value for key, value in summary.items() if key != 'output_files'}
+        job.summary['output_files'] = list(summary.get('output_files', ()))
+        job.results = scanner.results
+        self.finish(job, 'completed')
+    
+    async def serve(self):
+        """Accept jobs until SIGINT/SIGTERM"""
+        self.prepare()
+        self.queue = asyncio.PriorityQueue()
+        await self.scanner.resolve_tools()
+        
+        workers = max(1, self.config.get('target_concurrency', 4))
+        self.workers = [asyncio.ensure_future(self.worker()) for _ in range(workers)]
+        
+        socket_path = self.config.get('service_socket')
+        if socket_path:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self.handle, socket_path)
+            os.chmod(socket_path, 0o600)
+            where = socket_path
+        else:
+            host, _, port = self.config.get('service_listen', '127.0.0.1:8765').rpartition(':')
+            server = await asyncio.start_server(self.handle, host.strip('[]') or '127.0.0.1', int(port))
+            where = f"http://{self.config.get('service_listen', '127.0.0.1:8765')}"
+        self.scanner.logger.success(f"Service listening on {where} with {workers} workers")
+        
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            self.scanner.logger.warning("Shutting down service...")
+            server.close()
+            await server.wait_closed()
+            for job in self.jobs.values():
+                if job.task is not None and not job.task.done():
+                    job.task.cancel()
+            for task in self.workers:
+                task.cancel()
+            await asyncio.gather(*self.workers, *(job.task for job in self.jobs.values() if job.task),
+                                 return_exceptions=True)
+            self.scanner.close_warm()
+            if socket_path:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(socket_path)
+    
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request per connection"""
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                return
+            method, target = parts[0].upper(), parts[1]
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length') or 0)
+            if length > self.MAX_BODY:
+                await self.respond(writer, 413, {'error': 'request body too large'})
+                return
+            body = await reader.readexactly(length) if length else b''
+            await self.route(method, urlparse(target), body, writer)
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+    
+    async def route(self, method: str, url, body: bytes, writer: asyncio.StreamWriter):
+        parts = [part for part in url.path.split('/') if part]
+        query = dict(pair.partition('=')[::2] for pair in url.query.split('&') if pair)
+        
+        if parts == ['health'] and method == 'GET':
+            await self.respond(writer, 200, {
+                'status': 'ok',
+                'queued': sum(job.status == 'queued' for job in self.jobs.values()),
+                'running': self.running,
+                'jobs': len(self.jobs)
+            })
+        elif parts == ['metrics'] and method == 'GET':
+            await self.respond(writer, 200, self.scanner.metrics.exposition(), 'text/plain; version=0.0.4')
+        elif parts == ['jobs'] and method == 'GET':
+            await self.respond(writer, 200, {'jobs': [job.describe() for job in self.jobs.values()]})
+        elif parts == ['jobs'] and method == 'POST':
+            try:
+                request = json.loads(body or b'{}')
+                targets = request.get('targets') or [request.get('target')]
+                jobs = [self.submit(target, request.get('priority', 0), request.get('options')) for target in targets]
+            except (ValueError, TypeError, AttributeError) as e:
+                await self.respond(writer, 400, {'error': str(e)})
+                return
+            await self.respond(writer, 202, {'jobs': [job.describe() for job in jobs]})
+        elif len(parts) >= 2 and parts[0] == 'jobs':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await self.respond(writer, 404, {'error': 'no such job'})
+            elif len(parts) == 2 and method == 'GET':
+                await self.respond(writer, 200, job.describe())
+            elif len(parts) == 2 and method == 'DELETE':
+                self.cancel(job)
+                await self.respond(writer, 202, job.describe())
+            elif parts[2:] == ['events'] and method == 'GET':
+                await self.stream_events(job, writer, follow=query.get('follow', '1') != '0')
+            elif parts[2:] == ['results'] and method == 'GET':
+                await self.stream_results(job, writer)
+            else:
+                await self.respond(writer, 404, {'error': 'not found'})
+        else:
+            await self.respond(writer, 404, {'error': 'not found'})
+    
+    @staticmethod
+    async def respond(writer: asyncio.StreamWriter, status: int, payload, content_type: str = 'application/json'):
+        """Send a complete response"""
+        body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+        reason = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 409: 'Conflict',
+                  413: 'Payload Too Large'}.get(status, '')
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    
+    @staticmethod
+    async def start_stream(writer: asyncio.StreamWriter):
+        """Start an NDJSON response whose end is marked by closing the connection"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+    
+    async def stream_events(self, job: ScanJob, writer: asyncio.StreamWriter, follow: bool = True):
+        """Send the job's events so far and, when following, every new one until it finishes"""
+        await self.start_stream(writer)
+        sent = 0
+        while True:
+            changed = job.changed
+            for entry in job.events[sent:]:
+                writer.write(json.dumps(entry).encode() + b'\n')
+            sent = len(job.events)
+            await writer.drain()
+            if job.done or not follow:
+                return
+            await changed.wait()
+    
+    async def stream_results(self, job: ScanJob, writer: asyncio.StreamWriter):
+        """Send every subdomain of a finished job as NDJSON, with its probe record when live"""
+        if job.results is None:
+            await self.respond(writer, 409, {'error': f"job is {job.status}"})
+            return
+        await self.start_stream(writer)
+        http = job.results.get('http', {})
+        dns = job.results.get('dns', {})
+        for count, subdomain in enumerate(job.results['subdomains'], 1):
+            entry = {'host': subdomain, 'live': subdomain in job.results['live_hosts']}
+            if subdomain in dns:
+                entry['dns'] = dns[subdomain]
+            if subdomain in http:
+                entry['http'] = http[subdomain]
+            writer.write(json.dumps(entry).encode() + b'\n')
+            if count % 1000 == 0:
+                await writer.drain()
+        await writer.drain()
+
+class ShardTransport(abc.ABC):
+    """Carries worker requests to the coordinator and its replies back"""
+    
+    @abc.abstractmethod
+    async def serve(self, handler):
+        """Coordinator side: answer requests with handler(message) until cancelled"""
+    
+    @abc.abstractmethod
+    async def request(self, message: Dict) -> Dict:
+        """Worker side: send one request and wait for its reply"""
+
+class DirectoryTransport(ShardTransport):
+    """Exchange requests and replies as files in a directory every node can see"""
+    
+    def __init__(self, path: str, poll_interval: float = 0.5, timeout: float = 60):
+        self.path = path
+        self.requests = os.path.join(path, 'requests')
+        self.replies = os.path.join(path, 'replies')
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.sequence = itertools.count()
+        os.makedirs(self.requests, exist_ok=True)
+        os.makedirs(self.replies, exist_ok=True)
+    
+    @staticmethod
+    def _write(directory: str, name: str, message: Dict):
+        # Rename into place so the other side never reads a partial file
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(message, f)
+        os.replace(tmp_path, os.path.join(directory, name))
+    
+    async def serve(self, handler):
+        for directory in (self.requests, self.replies):
+            for name in os.listdir(directory):
+                os.unlink(os.path.join(directory, name))
+        while True:
+            for name in sorted(os.listdir(self.requests)):
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(self.requests, name)
+                try:
+                    with open(path, 'r') as f:
+                        message = json.load(f)
+                    os.unlink(path)
+                except (OSError, ValueError):
+                    continue
+                self._write(self.replies, name, handler(message))
+            await asyncio.sleep(self.poll_interval)
+    
+    async def request(self, message: Dict) -> Dict:
+        name = f"{message['worker']}-{next(self.sequence)}.json"
+        await asyncio.to_thread(self._write, self.requests, name, message)
+        path = os.path.join(self.replies, name)
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            try:
+                with open(path, 'r') as f:
+                    reply = json.load(f)
+            except FileNotFoundError:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            os.unlink(path)
+            return reply
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(os.path.join(self.requests, name))
+        raise TimeoutError(f"no reply from the coordinator in {self.path}")
+
+class TCPTransport(ShardTransport):
+    """Newline-delimited JSON requests over TCP, one connection per request"""
+    
+    LINE_LIMIT = 268435456
+    
+    def __init__(self, address: str, timeout: float = 60):
+        host, _, port = address.rpartition(':')
+        self.host = host.strip('[]') or '127.0.0.1'
+        self.port = int(port)
+        self.timeout = timeout
+    
+    async def serve(self, handler):
+        async def handle(reader, writer):
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    writer.write(json.dumps(handler(json.loads(line))).encode() + b'\n')
+                    await writer.drain()
+            except (OSError, ValueError, asyncio.LimitOverrunError):
+                pass
+            finally:
+                writer.close()
+        
+        server = await asyncio.start_server(handle, self.host, self.port, limit=self.LINE_LIMIT)
+        async with server:
+            await server.serve_forever()
+    
+    async def request(self, message: Dict) -> Dict:
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port, limit=self.LINE_LIMIT)
+            try:
+                writer.write(json.dumps(message).encode() + b'\n')
+                await writer.drain()
+                line = await reader.readline()
+            finally:
+                writer.close()
+            if not line:
+                raise ConnectionError('coordinator closed the connection')
+            return json.loads(line)
+        
+        return await asyncio.wait_for(exchange(), self.timeout)
+
+SHARD_TRANSPORTS = {
+    'dir': DirectoryTransport,
+    'tcp': TCPTransport
+}
+
+def open_transport(spec: str, timeout: float = 60, poll_interval: float = 0.5) -> ShardTransport:
+    """Build a transport from 'dir:/shared/path' or 'tcp:host:port'"""
+    kind, _, address = spec.partition(':')
+    if kind not in SHARD_TRANSPORTS or not address:
+        raise ValueError(f"unknown transport '{spec}' (use {' or '.join(name + ':...' for name in SHARD_TRANSPORTS)})")
+    if kind == 'dir':
+        return DirectoryTransport(address, poll_interval=poll_interval, timeout=timeout)
+    return TCPTransport(address, timeout=timeout)
+
+class ShardCoordinator:
+    """Split a target list into shards, lease them to workers and merge what comes back"""
+    
+    def __init__(self, scanner: TakeTheSubs, targets: List[str], shard_size: int = 10,
+                 lease_timeout: float = 60, max_attempts: int = 3, token: str = ''):
+        self.scanner = scanner
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.token = token
+        self.workers = {}
+        size = max(1, shard_size)
+        self.shards = [
+            {'id': index, 'targets': targets[start:start + size], 'state': 'pending', 'worker': None,
+             'expires': 0.0, 'attempts': 0, 'results': None, 'error': None}
+            for index, start in enumerate(range(0, len(targets), size))
+        ]
+        self.finished = asyncio.Event()
+    
+    def reap(self):
+        """Take back shards whose worker stopped sending heartbeats"""
+        now = time.monotonic()
+        for shard in self.shards:
+            if shard['state'] == 'leased' and shard['expires'] < now:
+                self.scanner.logger.warning(f"Shard {shard['id']} lost its worker {shard['worker']}, reassigning...")
+                self.release(shard, 'lease expired')
+    
+    def release(self, shard: Dict, error: str):
+        shard['worker'] = None
+        shard['error'] = error
+        shard['state'] = 'failed' if shard['attempts'] >= self.max_attempts else 'pending'
+        if shard['state'] == 'failed':
+            self.scanner.logger.error(f"Shard {shard['id']} failed after {shard['attempts']} attempts: {error}")
+        self.check_finished()
+    
+    def check_finished(self):
+        if all(shard['state'] in ('done', 'failed') for shard in self.shards):
+            self.finished.set()
+    
+    def handle(self, message: Dict) -> Dict:
+        """Answer one worker request"""
+        if self.token and not hmac.compare_digest(str(message.get('token', '')), self.token):
+            return {'error': 'bad token'}
+        worker = str(message.get('worker', ''))
+        self.workers[worker] = time.monotonic()
+        self.reap()
+        op = message.get('op')
+        shard = None
+        if op in ('heartbeat', 'complete', 'fail'):
+            index = message.get('shard')
+            shard = self.shards[index] if isinstance(index, int) and 0 <= index < len(self.shards) else None
+            if shard is None or shard['state'] != 'leased' or shard['worker'] != worker:
+                # The lease moved on; the worker must drop this shard
+                return {'ok': False}
+        
+        if op == 'lease':
+            for shard in self.shards:
+                if shard['state'] == 'pending':
+                    shard.update(state='leased', worker=worker, expires=time.monotonic() + self.lease_timeout)
+                    shard['attempts'] += 1
+                    self.scanner.logger.info(f"Shard {shard['id']} ({len(shard['targets'])} targets) -> {worker}")
+                    return {'shard': shard['id'], 'targets': shard['targets']}
+            return {'done': True} if self.finished.is_set() else {'wait': True}
+        if op == 'heartbeat':
+            shard['expires'] = time.monotonic() + self.lease_timeout
+            return {'ok': True}
+        if op == 'complete':
+            shard.update(state='done', results=message.get('results') or {}, error=None)
+            done = sum(shard['state'] == 'done' for shard in self.shards)
+            self.scanner.logger.success(f"Shard {shard['id']} completed by {worker} ({done}/{len(self.shards)} shards)")
+            self.check_finished()
+            return {'ok': True}
+        if op == 'fail':
+            self.release(shard, str(message.get('error', 'worker error')))
+            return {'ok': True}
+        return {'error': f"unknown op {op!r}"}
+    
+    async def run(self, transport: ShardTransport, output_dir: str, drain: float = 5) -> Dict:
+        """Serve workers until every shard is done or failed, then merge and save the results"""
+        started = time.monotonic()
+        start_time = datetime.now().isoformat()
+        self.scanner.logger.info(f"Coordinating {len(self.shards)} shards of "
+                                 f"{sum(len(shard['targets']) for shard in self.shards)} targets")
+        self.check_finished()
+        server = asyncio.ensure_future(transport.serve(self.handle))
+        
+        async def watch():
+            # Expire leases even when no worker is left to send a request
+            while True:
+                await asyncio.sleep(min(self.lease_timeout, 5))
+                self.reap()
+        
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await asyncio.wait([server, asyncio.ensure_future(self.finished.wait())],
+                               return_when=asyncio.FIRST_COMPLETED)
+            if server.done():
+                server.result()
+            # Linger briefly so idle workers hear that there is nothing left
+            await asyncio.sleep(drain)
+        finally:
+            for task in (server, watcher):
+                task.cancel()
+            await asyncio.gather(server, watcher, return_exceptions=True)
+        
+        summary = await asyncio.to_thread(self.merge, output_dir)
+        summary.update(start_time=start_time, end_time=datetime.now().isoformat(),
+                       elapsed=round(time.monotonic() - started, 2), workers=sorted(self.workers))
+        self.scanner.print_batch_summary(summary)
+        return summary
+    
+    def merge(self, output_dir: str) -> Dict:
+        """Combine shard results per target, in target order, and save them like a local batch run"""
+        os.makedirs(output_dir, exist_ok=True)
+        summary = {'targets': 0, 'completed': 0, 'failed': [], 'total_subdomains': 0, 'live_subdomains': 0}
+        per_target = {}
+        for shard in self.shards:
+            summary['targets'] += len(shard['targets'])
+            if shard['state'] != 'done':
+                summary['failed'].extend(shard['targets'])
+                continue
+            for target in shard['targets']:
+                record = shard['results'].get(target)
+                if record is None:
+                    summary['failed'].append(target)
+                else:
+                    per_target[target] = record
+        
+        for target in sorted(per_target):
+            record = per_target[target]
+            results = self.scanner.new_results(target)
+            results['subdomains'].update(record.get('subdomains', ()))
+            results['live_hosts'] = set(record.get('live_hosts', ()))
+            results['http'] = record.get('http', {})
+            results['dns'] = record.get('dns', {})
+            results['tools_used'] = sorted(record.get('tools_used', ()))
+            results['start_time'] = record.get('start_time', '')
+            results['end_time'] = record.get('end_time', '')
+            results['total_subdomains'] = len(results['subdomains'])
+            results['live_subdomains'] = len(results['live_hosts'])
+            self.scanner.save_results(target, output_dir, results)
+            summary['completed'] += 1
+            summary['total_subdomains'] += results['total_subdomains']
+            summary['live_subdomains'] += results['live_subdomains']
+        summary['failed'].sort()
+        return summary
+
+class ShardWorker:
+    """Lease shards from a coordinator, scan them locally and send back the results"""
+    
+    def __init__(self, scanner: TakeTheSubs, transport: ShardTransport, output_dir: str,
+                 heartbeat_interval: float = 10, token: str = '', worker_id: str = None):
+        self.scanner = scanner
+        self.transport = transport
+        self.output_dir = output_dir
+        self.heartbeat_interval = heartbeat_interval
+        self.token = token
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.limits = None
+    
+    async def send(self, op: str, **data) -> Dict:
+        reply = await self.transport.request({'op': op, 'worker': self.worker_id, 'token': self.token, **data})
+        if 'error' in reply:
+            raise RuntimeError(f"coordinator refused {op}: {reply['error']}")
+        return reply
+    
+    def prepare(self):
+        """Open the cache, diff state and API client once so every target's view shares them"""
+        scanner = self.scanner
+        # A worker may be handed the same target again after a failure, so it must not skip it as resumed
+        scanner.config['checkpoint'] = False
+        # Targets write to their own directories but share one cache and one diff state
+        for key, filename in (('cache_file', '.takethesubs_cache.sqlite'), ('state_file', '.takethesubs_state.sqlite')):
+            scanner.config[key] = scanner.config.get(key) or os.path.join(self.output_dir, filename)
+        os.makedirs(self.output_dir, exist_ok=True)
+        scanner.get_cache(self.output_dir)
+        scanner.get_delta_store(self.output_dir)
+        scanner.get_api_client()
+        self.limits = RunLimits(
+            max_processes=scanner.config.get('max_processes'),
+            max_probes=scanner.config.get('max_probes'),
+            tool_limits=scanner.config.get('tool_limits')
+        )
+    
+    async def run(self, give_up: float = 120):
+        """Work until the coordinator reports there is nothing left, or stays unreachable too long"""
+        self.prepare()
+        try:
+            await self.work(give_up)
+        finally:
+            # The API client's connections belong to this event loop, so close them before it ends
+            self.scanner.close()
+    
+    async def work(self, give_up: float):
+        await self.scanner.resolve_tools()
+        self.scanner.logger.info(f"Worker {self.worker_id} started")
+        unreachable_since = None
+        
+        while True:
+            try:
+                reply = await self.send('lease')
+                unreachable_since = None
+            except (OSError, asyncio.TimeoutError, ValueError) as e:
+                unreachable_since = unreachable_since or time.monotonic()
+                if time.monotonic() - unreachable_since > give_up:
+                    self.scanner.logger.error(f"Coordinator unreachable for {give_up:.0f}s, stopping: {e}")
+                    return
+                await asyncio.sleep(self.heartbeat_interval / 2)
+                continue
+            
+            if reply.get('done'):
+                self.scanner.logger.success(f"Worker {self.worker_id}: no shards left")
+                return
+            if 'shard' not in reply:
+                await asyncio.sleep(self.heartbeat_interval / 2)
+                continue
+            await self.run_shard(reply['shard'], reply['targets'])
+    
+    async def run_shard(self, shard: int, targets: List[str]):
+        """Scan one shard while heartbeating; abandon it if the coordinator reassigned it"""
+        self.scanner.logger.info(f"Worker {self.worker_id}: shard {shard} ({len(targets)} targets)")
+        scan = asyncio.ensure_future(self.scan(targets))
+        
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                try:
+                    reply = await self.send('heartbeat', shard=shard)
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    continue
+                if not reply.get('ok'):
+                    self.scanner.logger.warning(f"Shard {shard} was reassigned, dropping it")
+                    scan.cancel()
+                    return
+        
+        beating = asyncio.ensure_future(heartbeat())
+        try:
+            results = await scan
+        except asyncio.CancelledError:
+            if beating.done():
+                return
+            raise
+        except Exception as e:
+            with contextlib.suppress(OSError, asyncio.TimeoutError, ValueError, RuntimeError):
+                await self.send('fail', shard=shard, error=str(e))
+            return
+        finally:
+            beating.cancel()
+            await asyncio.gather(beating, return_exceptions=True)
+        
+        for attempt in range(3):
+            try:
+                await self.send('complete', shard=shard, results=results)
+                return
+            except (OSError, asyncio.TimeoutError, ValueError):
+                await asyncio.sleep(self.heartbeat_interval / 2)
+        self.scanner.logger.error(f"Could not report shard {shard}; the coordinator will reassign it")
+    
+    async def scan(self, targets: List[str]) -> Dict[str, Dict]:
+        """Enumerate a shard's targets concurrently and collect each one's results"""
+        slots = asyncio.Semaphore(max(1, self.scanner.config.get('target_concurrency', 4)))
+        collected = {}
+        
+        async def scan_target(target: str):
+            async with slots:
+                # Each target gets its own view so concurrent targets don't overwrite each other's results
+                view = self.scanner.with_config({})
+                await view.enumerate_target_async(target, os.path.join(self.output_dir, target), self.limits)
+                results = view.results
+                collected[target] = {
+                    'subdomains': list(results['subdomains']),
+                    'live_hosts': sorted(results['live_hosts']),
+                    'http': results['http'],
+                    'dns': results['dns'],
+                    'tools_used': results['tools_used'],
+                    'start_time': results['start_time'],
+                    'end_time': results['end_time']
+                }
+        
+        await asyncio.gather(*(scan_target(target) for target in targets))
+        return collected
 
 def main():
     """Main function"""
@@ -436,6 +4519,9 @@ Examples:
   python3 takethesubs.py -l targets.txt
   python3 takethesubs.py -t example.com -o /tmp/results
   python3 takethesubs.py -t example.com --verify --threads 100
+  python3 takethesubs.py --serve --listen 127.0.0.1:8765
+  python3 takethesubs.py -l targets.txt --coordinator tcp:0.0.0.0:9500
+  python3 takethesubs.py --worker tcp:coordinator.internal:9500
         """
     )
     
@@ -443,31 +4529,181 @@ Examples:
     parser.add_argument('-l', '--list', help='File containing list of targets')
     parser.add_argument('-o', '--output', help='Output directory', default='results')
     parser.add_argument('-c', '--config', help='Configuration file')
+    parser.add_argument('-f', '--output-format',
+                        help=f"Comma-separated output formats ({', '.join(RESULT_WRITERS)})")
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], help='Compress output files')
     parser.add_argument('--verify', action='store_true', help='Verify live subdomains')
+    parser.add_argument('--resolve', action='store_true', help='Resolve subdomains and drop wildcard DNS hits')
+    parser.add_argument('--resolvers', help='Comma-separated DNS resolvers (ip or ip:port)')
+    parser.add_argument('--no-dns-filter', action='store_true', help='Probe HTTP without resolving names first')
+    parser.add_argument('-w', '--wordlist', help='Brute-force subdomains from a wordlist')
+    parser.add_argument('--permutations', action='store_true',
+                        help='Resolve permutations and alterations of discovered subdomains')
     parser.add_argument('--threads', type=int, default=50, help='Number of threads')
+    parser.add_argument('--no-adaptive', action='store_true',
+                        help='Use fixed probe timeouts and concurrency instead of adapting them')
+    parser.add_argument('--tool-idle-timeout', type=int,
+                        help='Stop a tool after this many seconds without new subdomains')
+    parser.add_argument('--ingest-workers', type=int,
+                        help='Validate tool output on this many processes (0 = one per core, 1 = stream in-process)')
+    parser.add_argument('--probe-by-ip', action='store_true',
+                        help='Probe resolved hosts on their address, sharing connections and TLS sessions per backend')
+    parser.add_argument('--probe-ports', help='Extra ports to probe alongside 80/443 (e.g. 8080,8443)')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached tool output and re-run every tool')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the tool output cache')
+    parser.add_argument('--cache-ttl', type=int, help='Seconds before cached tool output goes stale')
+    parser.add_argument('--diff', action='store_true', help='Only report subdomains and live hosts that changed since the last run')
+    parser.add_argument('--probe-new', action='store_true', help='Diff mode that only resolves and probes newly found subdomains')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted run, skipping finished tools, probes and targets')
+    parser.add_argument('--checkpoint', action='store_true',
+                        help='Keep a checkpoint journal until the run finishes, so it can be resumed if interrupted')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Do not keep a checkpoint journal')
+    parser.add_argument('--shodan-api', help='Shodan API key(s), comma-separated')
+    parser.add_argument('--virustotal-api', help='VirusTotal API key(s), comma-separated')
+    parser.add_argument('--github-token', help='GitHub token(s) for code search, comma-separated')
+    parser.add_argument('--chaos-key', help='Chaos API key(s), comma-separated')
+    parser.add_argument('--tool-concurrency', type=int, help='Maximum number of tools to run at once')
+    parser.add_argument('--parallel-targets', type=int, help='Number of targets to enumerate at once')
+    parser.add_argument('--max-processes', type=int, help='Maximum number of tool processes across all targets')
+    parser.add_argument('--max-probes', type=int, help='Maximum number of HTTP probes across all targets')
+    parser.add_argument('--serve', action='store_true', help='Run as a resident service accepting scan jobs over HTTP')
+    parser.add_argument('--listen', help='Service address as host:port (default 127.0.0.1:8765)')
+    parser.add_argument('--socket', help='Serve on a Unix socket instead of TCP')
+    parser.add_argument('--coordinator', metavar='TRANSPORT',
+                        help='Shard the -l targets across workers (dir:/shared/path or tcp:host:port)')
+    parser.add_argument('--worker', metavar='TRANSPORT', help='Scan shards handed out by a coordinator')
+    parser.add_argument('--shard-size', type=int, help='Targets per shard in coordinator mode')
+    parser.add_argument('--cluster-token', help='Shared secret between the coordinator and its workers')
+    parser.add_argument('--report', help='Write a JSON run report with per-stage timings and counts')
+    parser.add_argument('--metrics-file', help='Write run metrics as a Prometheus textfile')
+    parser.add_argument('--metrics-format', choices=['prometheus', 'openmetrics'],
+                        help='Exposition format of --metrics-file')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
     parser.add_argument('--version', action='version', version='TakeTheSubs 2.0.0')
     
     args = parser.parse_args()
     
-    if not args.target and not args.list:
+    if not args.target and not args.list and not args.serve and not args.worker:
         parser.print_help()
         sys.exit(1)
+    if args.coordinator and not args.list:
+        parser.error("--coordinator needs a target list (-l)")
+    if args.resume and args.no_checkpoint:
+        parser.error("--resume needs the checkpoint journal, so it cannot be combined with --no-checkpoint")
     
     # Initialize TakeTheSubs
     takethesubs = TakeTheSubs(args.config)
     takethesubs.config['verbose'] = args.verbose
     takethesubs.config['threads'] = args.threads
     takethesubs.config['verify'] = args.verify
+    if args.resolve:
+        takethesubs.config['resolve'] = True
+    if args.wordlist:
+        takethesubs.config['wordlist'] = args.wordlist
+    if args.permutations:
+        takethesubs.config['permutations'] = True
+    if args.resolvers:
+        takethesubs.config['resolvers'] = [ns.strip() for ns in args.resolvers.split(',') if ns.strip()]
+    if args.no_dns_filter:
+        takethesubs.config['dns_filter'] = False
+    if args.no_adaptive:
+        takethesubs.config['adaptive'] = False
+    if args.tool_idle_timeout:
+        takethesubs.config['tool_idle_timeout'] = args.tool_idle_timeout
+    if args.ingest_workers is not None:
+        takethesubs.config['ingest_workers'] = args.ingest_workers
+    if args.probe_by_ip:
+        takethesubs.config['probe_by_ip'] = True
+    if args.probe_ports:
+        takethesubs.config['probe_ports'] = [int(port) for port in args.probe_ports.split(',') if port.strip()]
+    if args.refresh:
+        takethesubs.config['refresh'] = True
+    if args.no_cache:
+        takethesubs.config['cache'] = False
+    if args.cache_ttl:
+        takethesubs.config['cache_ttl'] = args.cache_ttl
+    if args.diff:
+        takethesubs.config['diff'] = True
+    if args.probe_new:
+        takethesubs.config['probe_new_only'] = True
+    if args.output_format:
+        formats = [name.strip() for name in args.output_format.split(',') if name.strip()]
+        unknown = [name for name in formats if name not in RESULT_WRITERS]
+        if unknown:
+            parser.error(f"unknown output format: {', '.join(unknown)}")
+        takethesubs.config['output_formats'] = formats
+    if args.compress:
+        if args.compress == 'zstd' and importlib.util.find_spec('zstandard') is None:
+            parser.error("zstd compression requires the 'zstandard' package")
+        takethesubs.config['compression'] = args.compress
+    if args.checkpoint:
+        takethesubs.config['checkpoint'] = True
+    if args.resume:
+        # A resumed run keeps journaling, so it can itself be resumed
+        takethesubs.config['resume'] = takethesubs.config['checkpoint'] = True
+    if args.no_checkpoint:
+        takethesubs.config['checkpoint'] = False
+    if args.tool_concurrency:
+        takethesubs.config['tool_concurrency'] = args.tool_concurrency
+    if args.parallel_targets:
+        takethesubs.config['target_concurrency'] = args.parallel_targets
+    if args.max_processes:
+        takethesubs.config['max_processes'] = args.max_processes
+    if args.max_probes:
+        takethesubs.config['max_probes'] = args.max_probes
+    if args.report:
+        takethesubs.config['report_file'] = args.report
+    if args.metrics_file:
+        takethesubs.config['metrics_file'] = args.metrics_file
+    if args.metrics_format:
+        takethesubs.config['metrics_format'] = args.metrics_format
+    if args.listen:
+        takethesubs.config['service_listen'] = args.listen
+    if args.socket:
+        takethesubs.config['service_socket'] = args.socket
+    if args.shard_size:
+        takethesubs.config['shard_size'] = args.shard_size
+    if args.cluster_token:
+        takethesubs.config['cluster_token'] = args.cluster_token
+    transport = None
+    if args.coordinator or args.worker:
+        try:
+            transport = open_transport(args.coordinator or args.worker,
+                                       timeout=takethesubs.config.get('transport_timeout', 60),
+                                       poll_interval=takethesubs.config.get('transport_poll', 0.5))
+        except ValueError as e:
+            parser.error(str(e))
+    
+    # API keys given on the command line also switch on the sources that are off by default
+    for option, key_name, source in ((args.shodan_api, 'shodan', 'shodan'),
+                                     (args.virustotal_api, 'virustotal', 'virustotal'),
+                                     (args.github_token, 'github_token', 'github_search'),
+                                     (args.chaos_key, 'chaos', 'chaos')):
+        if option:
+            takethesubs.config['apis'][key_name] = option
+            takethesubs.config['tools'][source] = True
     
     # Print banner
-    takethesubs.# Banner removed to fix double display()
+    takethesubs.print_banner()
     
     try:
-        if args.target:
+        if args.serve:
+            # Resident service: scans arrive as jobs over the local API
+            asyncio.run(ScanService(takethesubs, args.output).serve())
+        
+        elif args.worker:
+            # Distributed worker: scan whatever shards the coordinator hands out
+            worker = ShardWorker(
+                takethesubs, transport, args.output,
+                heartbeat_interval=takethesubs.config.get('heartbeat_interval', 10),
+                token=takethesubs.config.get('cluster_token', '')
+            )
+            asyncio.run(worker.run(give_up=takethesubs.config.get('lease_timeout', 60) * 2))
+        
+        elif args.target:
             # Single target
             result = takethesubs.enumerate_target(args.target, args.output)
-            
+        
         elif args.list:
             # Multiple targets from file
             try:
@@ -476,108 +4712,35 @@ Examples:
                 
                 takethesubs.logger.info(f"Processing {len(targets)} targets from {args.list}")
                 
-                for target in targets:
-                    if target:
-                        try:
-                            result = takethesubs.enumerate_target(target, args.output)
-                        except Exception as e:
-                            takethesubs.logger.error(f"Failed to process {target}: {e}")
-                            
+                if args.coordinator:
+                    # Distributed batch: workers on other hosts scan the shards
+                    coordinator = ShardCoordinator(
+                        takethesubs, targets,
+                        shard_size=takethesubs.config.get('shard_size', 10),
+                        lease_timeout=takethesubs.config.get('lease_timeout', 60),
+                        max_attempts=takethesubs.config.get('max_attempts', 3),
+                        token=takethesubs.config.get('cluster_token', '')
+                    )
+                    summary = asyncio.run(coordinator.run(
+                        transport, args.output, drain=takethesubs.config.get('heartbeat_interval', 10)
+                    ))
+                else:
+                    summary = takethesubs.enumerate_targets(targets, args.output)
+            
             except FileNotFoundError:
                 takethesubs.logger.error(f"File not found: {args.list}")
                 sys.exit(1)
-                
+    
     except KeyboardInterrupt:
         takethesubs.logger.warning("Interrupted by user")
         sys.exit(1)
     except Exception as e:
         takethesubs.logger.error(f"Unexpected error: {e}")
         sys.exit(1)
-
-if __name__ == "__main__":
-    main()
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Set, Optional
-import subprocess
-import requests
-from urllib.parse import urlparse
-import yaml
-
-class Colors:
-    """ANSI color codes for terminal output"""
-    RED = '\033[91m'
-    GREEN = '\033[92m'
-    YELLOW = '\033[93m'
-    BLUE = '\033[94m'
-    PURPLE = '\033[95m'
-    CYAN = '\033[96m'
-    WHITE = '\033[97m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
-    END = '\033[0m'
-
-def # Banner removed to fix double display():
-    """Print TakeTheSubs banner"""
-    banner = f"""
-{Colors.CYAN}
-████████╗ █████╗ ██╗  ██╗███████╗████████╗██╗  ██╗███████╗███████╗██╗   ██╗██████╗ ███████╗
-╚══██╔══╝██╔══██╗██║ ██╔╝██╔════╝╚══██╔══╝██║  ██║██╔════╝██╔════╝██║   ██║██╔══██╗██╔════╝
-   ██║   ███████║█████╔╝ █████╗     ██║   ███████║█████╗  ███████╗██║   ██║██████╔╝███████╗
-   ██║   ██╔══██║██╔═██╗ ██╔══╝     ██║   ██╔══██║██╔══╝  ╚════██║██║   ██║██╔══██╗╚════██║
-   ██║   ██║  ██║██║  ██╗███████╗   ██║   ██║  ██║███████╗███████║╚██████╔╝██████╔╝███████║
-   ╚═╝   ╚═╝  ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝   ╚═╝  ╚═╝╚══════╝╚══════╝ ╚═════╝ ╚═════╝ ╚══════╝
-
-                    🎯 Advanced Subdomain Discovery Tool 🎯
-                         Created by: super3lr3y
-                            Version: 2.0.0
-                    🚀 Take All The Subdomains! 🚀
-{Colors.END}
-"""
-    print(banner)
-
-def main():
-    """Main function"""
-    # Banner removed to fix double display()
-    
-    parser = argparse.ArgumentParser(
-        description="TakeTheSubs - Advanced Subdomain Discovery Tool",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  python3 takethesubs.py -t example.com
-  python3 takethesubs.py -l domains.txt --verify
-  python3 takethesubs.py -t example.com -o /tmp/results --threads 100
-        """
-    )
-    
-    parser.add_argument('-t', '--target', help='Target domain')
-    parser.add_argument('-l', '--list', help='File containing list of domains')
-    parser.add_argument('-o', '--output', help='Output directory', default='results')
-    parser.add_argument('-c', '--config', help='Configuration file')
-    parser.add_argument('--verify', action='store_true', help='Verify live hosts')
-    parser.add_argument('--threads', type=int, default=50, help='Number of threads')
-    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
-    parser.add_argument('--version', action='version', version='TakeTheSubs 2.0.0')
-    
-    args = parser.parse_args()
-    
-    if not args.target and not args.list:
-        parser.print_help()
-        sys.exit(1)
-    
-    print(f"{Colors.GREEN}[+] TakeTheSubs v2.0.0 - Starting subdomain enumeration...{Colors.END}")
-    print(f"{Colors.YELLOW}[+] Target: {args.target or 'Multiple domains'}{Colors.END}")
-    print(f"{Colors.YELLOW}[+] Output: {args.output}{Colors.END}")
-    print(f"{Colors.YELLOW}[+] Threads: {args.threads}{Colors.END}")
-    
-    # Create output directory
-    os.makedirs(args.output, exist_ok=True)
-    
-    print(f"{Colors.CYAN}[+] Subdomain enumeration completed!{Colors.END}")
-    print(f"{Colors.GREEN}🎯 Take All The Subdomains! 🚀{Colors.END}")
+    finally:
+        # Make sure journaled progress reaches disk so --resume can pick it up
+        takethesubs.close()
+        takethesubs.write_reports()
 
 if __name__ == "__main__":
     main()
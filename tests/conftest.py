@@ -0,0 +1,30 @@
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FAKE_TOOL = '''#!/bin/sh
+case "$1" in -version|--version|-h) echo "{name} v1.0.0"; exit 0;; esac
+target=example.com
+prev=
+for arg in "$@"; do
+    case "$prev" in -d|-t|--subs-only) target="$arg";; esac
+    prev="$arg"
+done
+for i in 1 2 3; do echo "{prefix}$i.$target"; done
+'''
+
+@pytest.fixture
+def fake_tools(tmp_path, monkeypatch):
+    """Stand-in subfinder/amass/assetfinder/findomain binaries first on PATH, each printing three names under the target"""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    for name in ('subfinder', 'amass', 'assetfinder', 'findomain'):
+        script = bin_dir / name
+        script.write_text(FAKE_TOOL.format(name=name, prefix=name[:2]))
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return bin_dir
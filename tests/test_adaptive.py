@@ -0,0 +1,83 @@
+import asyncio
+import errno
+
+import pytest
+
+import takethesubs
+
+@pytest.fixture
+def controller(monkeypatch):
+    # Keep the host's own fd and CPU load out of the decisions
+    monkeypatch.setattr(takethesubs.AdaptiveController, 'pressure', lambda self: False)
+    return takethesubs.AdaptiveController(concurrency=10, min_concurrency=4, max_concurrency=14, warmup=16)
+
+def window(controller, latency=0.01, error=None):
+    """Finish one full window of requests, which triggers exactly one adjustment"""
+    for _ in range(controller.limit):
+        controller.observe(None if error else latency, error)
+
+def test_healthy_windows_grow_the_limit_up_to_the_maximum(controller):
+    limits = []
+    for _ in range(10):
+        window(controller)
+        limits.append(controller.limit)
+    assert limits[:4] == [11, 12, 13, 14]
+    assert set(limits[4:]) == {14}
+
+def test_local_errors_shrink_the_limit_down_to_the_minimum(controller):
+    error = OSError(errno.EMFILE, 'Too many open files')
+    limits = []
+    for _ in range(5):
+        window(controller, error=error)
+        limits.append(controller.limit)
+    assert limits == [7, 4, 4, 4, 4]
+
+    window(controller)
+    assert controller.limit == 5
+
+def test_timeouts_count_as_congestion_only_when_answers_slow_down(controller):
+    for _ in range(2):
+        window(controller, latency=0.01)
+    assert controller.baseline == pytest.approx(0.01)
+    start = controller.limit
+
+    # Timeouts while latency holds steady are filtered hosts, not congestion
+    for index in range(start):
+        controller.observe(*((None, asyncio.TimeoutError()) if index % 2 else (0.01, None)))
+    assert controller.limit == start + 1
+
+    start = controller.limit
+    for index in range(start):
+        controller.observe(*((None, asyncio.TimeoutError()) if index % 2 else (0.05, None)))
+    assert controller.limit == int(start * controller.decrease)
+    assert controller.min_concurrency <= controller.limit <= controller.max_concurrency
+
+def test_timeout_follows_latency_within_its_bounds(controller):
+    for _ in range(64):
+        controller.observe(0.5)
+    assert controller.timeout == pytest.approx(3 * 0.5)
+
+    for _ in range(1024):
+        controller.observe(0.1)
+    assert controller.timeout == controller.min_timeout
+
+    for _ in range(1024):
+        controller.observe(4)
+    assert controller.timeout == controller.max_timeout
+
+def test_slots_never_exceed_the_limit(controller):
+    controller.limit = 4
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with controller.slot():
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(*(request() for _ in range(40)))
+
+    asyncio.run(scenario())
+    assert peak == 4
+    assert controller.in_flight == 0 and not controller.waiters
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+import takethesubs
+
+class MockAPI:
+    """Keep-alive HTTP/1.1 server answering each request with handler(path, query, headers)"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                url = urlparse(request_line.split()[1].decode())
+                query = {name: values[0] for name, values in parse_qs(url.query).items()}
+                self.requests.append((time.monotonic(), url.path, query, headers))
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                try:
+                    status, extra, data = await self.handler(url.path, query, headers)
+                finally:
+                    self.active -= 1
+                body = json.dumps(data).encode()
+                head = ''.join(f"{name}: {value}\r\n" for name, value in extra.items())
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n{head}\r\n".encode() + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def shodan(api, keys, **kwargs):
+    client = takethesubs.APIClient(timeout=5)
+    return takethesubs.ShodanSource('shodan', client, keys, base_url=api.url, **kwargs), client
+
+async def collect(source, target='example.com'):
+    return sorted([name async for name in source.stream(target, timeout=30)])
+
+def test_token_bucket_paces_requests():
+    async def handler(path, query, headers):
+        return 200, {}, {'subdomains': ['www']}
+
+    async def scenario():
+        async with MockAPI(handler) as api:
+            source, client = shodan(api, ['k1'], rate=10)
+            try:
+                for _ in range(4):
+                    await source.fetch(source.page_url('example.com', 1))
+            finally:
+                client.close()
+            return [moment for moment, *_ in api.requests]
+
+    moments = asyncio.run(scenario())
+    assert len(moments) == 4
+    # Burst of one at 10/s: the first request goes out at once, then one every 100ms
+    assert all(later - earlier >= 0.08 for earlier, later in zip(moments, moments[1:]))
+
+def test_key_pool_rotates_and_revokes_rejected_keys():
+    async def handler(path, query, headers):
+        if query['key'] == 'revoked':
+            return 401, {}, {'error': 'invalid key'}
+        return 200, {}, {'subdomains': [query['key']]}
+
+    async def scenario():
+        async with MockAPI(handler) as api:
+            source, client = shodan(api, ['k1', 'k2', 'revoked'], rate=5)
+            try:
+                started = time.monotonic()
+                for _ in range(4):
+                    await source.fetch(source.page_url('example.com', 1))
+                elapsed = time.monotonic() - started
+            finally:
+                client.close()
+            return [query['key'] for _, _, query, _ in api.requests], source.keys.buckets, elapsed
+
+    used, buckets, elapsed = asyncio.run(scenario())
+    assert used.count('revoked') == 1
+    assert sorted(buckets) == ['k1', 'k2']
+    served = [key for key in used if key != 'revoked']
+    assert served.count('k1') == 2 and served.count('k2') == 2
+    # Two keys at 5/s each serve four requests in about 200ms rather than 600ms
+    assert elapsed < 0.5
+
+def test_rate_limited_request_waits_for_retry_after():
+    calls = []
+
+    async def handler(path, query, headers):
+        calls.append(path)
+        if len(calls) == 1:
+            return 429, {'Retry-After': '1'}, {'error': 'slow down'}
+        return 200, {}, {'subdomains': ['www']}
+
+    async def scenario():
+        async with MockAPI(handler) as api:
+            source, client = shodan(api, ['k1'], rate=100)
+            try:
+                data = await source.fetch(source.page_url('example.com', 1))
+            finally:
+                client.close()
+            return data, [moment for moment, *_ in api.requests]
+
+    data, moments = asyncio.run(scenario())
+    assert data == {'subdomains': ['www']}
+    assert len(moments) == 2
+    assert moments[1] - moments[0] >= 0.95
+
+def test_pages_are_prefetched():
+    async def handler(path, query, headers):
+        page = int(query['page'])
+        await asyncio.sleep(0.2)
+        return 200, {}, {'subdomains': [f"p{page}"], 'more': page < 6}
+
+    async def scenario():
+        async with MockAPI(handler) as api:
+            source, client = shodan(api, ['k1'], rate=1000, prefetch=2)
+            try:
+                started = time.monotonic()
+                names = await collect(source)
+                elapsed = time.monotonic() - started
+            finally:
+                client.close()
+            return names, api, elapsed
+
+    names, api, elapsed = asyncio.run(scenario())
+    assert names == sorted(f"p{page}.example.com" for page in range(1, 7))
+    assert api.peak == 3
+    # Six 200ms pages three at a time take about 400ms instead of 1.2s
+    assert elapsed < 0.9
+    assert {int(query['page']) for _, _, query, _ in api.requests} >= set(range(1, 7))
@@ -0,0 +1,16 @@
+import takethesubs
+
+def cache_lines(output):
+    return [line.split('Cache: ')[1] for line in output.splitlines() if 'Cache: ' in line]
+
+def test_cache_summary_covers_only_the_target(tmp_path, fake_tools, capsys):
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config.update({'cache_file': str(tmp_path / 'cache.sqlite')})
+    try:
+        scanner.enumerate_target('example.com', str(tmp_path / 'first'))
+        scanner.enumerate_target('example.org', str(tmp_path / 'org'))
+        scanner.enumerate_target('example.com', str(tmp_path / 'second'))
+        assert scanner.cache.stats() == {'hits': 4, 'misses': 8}
+    finally:
+        scanner.close()
+    assert cache_lines(capsys.readouterr().out) == ['0 hits, 4 misses', '0 hits, 4 misses', '4 hits, 0 misses']
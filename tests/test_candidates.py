@@ -0,0 +1,68 @@
+import asyncio
+
+import takethesubs
+
+def test_wordlist_yields_valid_labels_under_the_apex(tmp_path):
+    wordlist = tmp_path / 'words.txt'
+    wordlist.write_text('www\n  Mail \r\n-bad\nbad-\nin valid\n\ndev_1\n' + 'a' * 64 + '\nlast')
+    # A tiny chunk size makes words straddle chunk boundaries
+    generator = takethesubs.CandidateGenerator(wordlist=str(wordlist), chunk_size=4)
+    assert list(generator.generate('example.com')) == [
+        'www.example.com', 'mail.example.com', 'dev_1.example.com', 'last.example.com']
+
+def test_no_wordlist_and_no_seeds_yield_nothing():
+    assert list(takethesubs.CandidateGenerator().generate('example.com')) == []
+
+def test_numeric_bumps_keep_zero_padding():
+    generator = takethesubs.CandidateGenerator(numeric_range=2)
+    assert generator.numeric_bumps('api07') == ['api05', 'api06', 'api08', 'api09']
+    assert generator.numeric_bumps('web1-2') == ['web1-0', 'web1-1', 'web1-3', 'web1-4']
+    assert generator.numeric_bumps('www') == ['www1', 'www2']
+
+def test_permutations_rewrite_discovered_names(tmp_path):
+    words = tmp_path / 'perm.txt'
+    words.write_text('dev\nqa\n')
+    generator = takethesubs.CandidateGenerator(permutation_wordlist=str(words), numeric_range=1)
+    candidates = list(generator.generate('example.com', ['example.com', 'api2.example.com']))
+    # The apex itself is not a seed
+    assert candidates == [
+        'api1.example.com', 'api3.example.com',
+        'dev-api2.example.com', 'api2-dev.example.com', 'dev.api2.example.com',
+        'qa-api2.example.com', 'api2-qa.example.com', 'qa.api2.example.com',
+    ]
+
+def test_permutations_respect_length_limits():
+    generator = takethesubs.CandidateGenerator(numeric_range=0)
+    label = 'a' * 62
+    seed = f"{label}.example.com"
+    candidates = list(generator.alterations(seed))
+    assert all(len(name.split('.')[0]) <= 63 for name in candidates)
+    assert f"v1.{seed}" in candidates and f"{label}-v1.example.com" not in candidates
+
+class FakeResolver:
+    """Answers NOERROR for the given names and NXDOMAIN for everything else"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.asked = []
+
+    async def resolve_many(self, names, zone_wildcards=False, rtypes=(1,)):
+        for name in names:
+            self.asked.append(name)
+            yield {'host': name, 'status': 'NOERROR' if name in self.existing else 'NXDOMAIN', 'wildcard': False}
+
+    def close(self):
+        pass
+
+def test_bruteforce_reports_only_names_not_already_known(tmp_path, monkeypatch):
+    wordlist = tmp_path / 'words.txt'
+    wordlist.write_text('www\nmail\nvpn\nnothere\n')
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config.update({'wordlist': str(wordlist), 'permutations': True, 'numeric_range': 1})
+    resolver = FakeResolver({'www.example.com', 'mail.example.com', 'vpn.example.com', 'dev-www.example.com'})
+    monkeypatch.setattr(scanner, 'create_resolver', lambda concurrency=None: resolver)
+    known = takethesubs.SubdomainStore(['example.com', 'www.example.com', 'mail.example.com'])
+
+    found = asyncio.run(scanner.bruteforce('example.com', known, known))
+    assert sorted(found) == ['dev-www.example.com', 'vpn.example.com']
+    assert 'nothere.example.com' in resolver.asked and 'www1.example.com' in resolver.asked
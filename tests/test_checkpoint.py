@@ -0,0 +1,41 @@
+import os
+
+import takethesubs
+
+def test_finished_target_drops_its_spool(tmp_path):
+    path = str(tmp_path / 'journal.ndjson')
+    journal = takethesubs.CheckpointJournal(path)
+    journal.tool_done('a.example.com', 'amass', takethesubs.NameRun.from_names(['x.a.example.com']))
+    journal.tool_done('b.example.com', 'amass',
+                      takethesubs.NameRun.from_names(['y.b.example.com', 'x.b.example.com', 'x.b.example.com']))
+    journal.target_done('a.example.com')
+    journal.close()
+
+    assert not os.path.exists(os.path.join(journal.spool_dir, 'a.example.com'))
+    resumed = takethesubs.CheckpointJournal(path, resume=True)
+    assert resumed.targets_done == {'a.example.com'}
+    run = resumed.tool_output('b.example.com', 'amass')
+    assert len(run) == 2
+    assert list(map(takethesubs.SubdomainStore.name, run.keys())) == ['x.b.example.com', 'y.b.example.com']
+    resumed.discard()
+    assert not os.path.exists(path) and not os.path.exists(journal.spool_dir)
+
+def test_checkpointing_is_opt_in(tmp_path, fake_tools):
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config.update({'cache': False})
+    try:
+        scanner.enumerate_target('example.com', str(tmp_path))
+    finally:
+        scanner.close()
+    assert not os.path.exists(tmp_path / '.takethesubs_journal.ndjson')
+
+def test_journal_is_removed_after_a_clean_run(tmp_path, fake_tools):
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config.update({'cache': False, 'checkpoint': True})
+    try:
+        summary = scanner.enumerate_targets(['example.com', 'example.org'], str(tmp_path))
+    finally:
+        scanner.close()
+    assert summary['completed'] == 2
+    assert not os.path.exists(tmp_path / '.takethesubs_journal.ndjson')
+    assert not os.path.exists(tmp_path / '.takethesubs_journal.ndjson.d')
@@ -0,0 +1,31 @@
+import gzip
+import json
+
+import pytest
+
+import takethesubs
+
+def diff_inputs():
+    results = takethesubs.TakeTheSubs.new_results('example.com')
+    results['subdomains'].update(['a.example.com', 'b.example.com'])
+    delta = {'subdomains': {'added': ['b.example.com'], 'removed': ['old.example.com']}}
+    return results, delta
+
+@pytest.mark.parametrize('compression', ['', 'gzip'])
+def test_diff_is_written_atomically_with_the_configured_compression(tmp_path, compression):
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config['compression'] = compression
+    results, delta = diff_inputs()
+    new_file, diff_file = scanner.save_diff('example.com', str(tmp_path), results, delta)
+
+    suffix = '.gz' if compression else ''
+    assert new_file.endswith('.txt' + suffix) and diff_file.endswith('.json' + suffix)
+    assert not list(tmp_path.glob('*.tmp'))
+    opener = gzip.open if compression else open
+    with opener(new_file, 'rt') as f:
+        assert f.read() == 'b.example.com\n'
+    with opener(diff_file, 'rt') as f:
+        data = json.load(f)
+    assert data['added_subdomains'] == ['b.example.com']
+    assert data['removed_subdomains'] == ['old.example.com']
+    assert data['total_subdomains'] == 2
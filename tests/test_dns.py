@@ -0,0 +1,118 @@
+import asyncio
+import collections
+import ipaddress
+
+import takethesubs
+
+ZONE = {
+    ('www.example.com', 1): [(1, '192.0.2.1')],
+    ('www.example.com', 28): [(28, '2001:db8::1')],
+    ('alias.example.com', 1): [(5, 'www.example.com'), (1, '192.0.2.1')],
+    ('real.wild.test', 1): [(1, '198.51.100.8')],
+}
+
+def encode_name(name):
+    return b''.join(bytes([len(label)]) + label.encode() for label in name.split('.')) + b'\x00'
+
+class StubDNS(asyncio.DatagramProtocol):
+    """Authoritative-looking UDP server for ZONE, with a wildcard under wild.test and lossy names"""
+
+    def __init__(self, drop_first=(), drop_always=()):
+        self.drop_first = set(drop_first)
+        self.drop_always = set(drop_always)
+        self.queries = collections.Counter()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        labels, offset = [], 12
+        while data[offset]:
+            labels.append(data[offset + 1:offset + 1 + data[offset]].decode())
+            offset += 1 + data[offset]
+        name = '.'.join(labels).lower()
+        rtype = int.from_bytes(data[offset + 1:offset + 3], 'big')
+        question = data[12:offset + 5]
+        self.queries[name, rtype] += 1
+        if name in self.drop_always or (name in self.drop_first and self.queries[name, rtype] == 1):
+            return
+
+        answers = ZONE.get((name, rtype))
+        if answers is None and name.endswith('.wild.test') and rtype == 1:
+            answers = [(1, '198.51.100.7')]
+        known = any(host == name for host, _ in ZONE) or name.endswith('.wild.test')
+        rcode = 0 if known or answers else 3
+        records = b''
+        for answer_type, value in answers or ():
+            if answer_type == 5:
+                rdata = encode_name(value)
+            else:
+                rdata = ipaddress.ip_address(value).packed
+            records += (b'\xc0\x0c' + answer_type.to_bytes(2, 'big') + b'\x00\x01\x00\x00\x00\x3c'
+                        + len(rdata).to_bytes(2, 'big') + rdata)
+        header = (data[:2] + (0x8180 | rcode).to_bytes(2, 'big') + b'\x00\x01'
+                  + len(answers or ()).to_bytes(2, 'big') + b'\x00\x00\x00\x00')
+        self.transport.sendto(header + question + records, addr)
+
+async def serve(**kwargs):
+    transport, stub = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: StubDNS(**kwargs), local_addr=('127.0.0.1', 0))
+    return transport, stub, f"127.0.0.1:{transport.get_extra_info('sockname')[1]}"
+
+def run(scenario, **kwargs):
+    async def main():
+        transport, stub, nameserver = await serve(**kwargs)
+        resolver = takethesubs.DNSResolver([nameserver], timeout=0.3, retries=2, concurrency=8)
+        try:
+            return await scenario(resolver), stub
+        finally:
+            resolver.close()
+            transport.close()
+
+    return asyncio.run(main())
+
+def test_resolves_addresses_and_cname_chain():
+    async def scenario(resolver):
+        return await resolver.resolve('www.example.com'), await resolver.resolve('alias.example.com', (1,))
+
+    (www, alias), _ = run(scenario)
+    assert www['status'] == 'NOERROR'
+    assert www['a'] == ['192.0.2.1'] and www['aaaa'] == ['2001:db8::1']
+    assert alias['cname'] == ['www.example.com'] and alias['a'] == ['192.0.2.1']
+
+def test_nxdomain():
+    async def scenario(resolver):
+        return await resolver.resolve('missing.example.com')
+
+    record, stub = run(scenario)
+    assert record['status'] == 'NXDOMAIN'
+    assert not record['a'] and not record['aaaa']
+    # An authoritative answer is final, so it is not retried
+    assert stub.queries['missing.example.com', 1] == 1
+
+def test_lost_query_is_retried():
+    async def scenario(resolver):
+        return await resolver.resolve('www.example.com', (1,))
+
+    record, stub = run(scenario, drop_first={'www.example.com'})
+    assert record['status'] == 'NOERROR' and record['a'] == ['192.0.2.1']
+    assert stub.queries['www.example.com', 1] == 2
+
+def test_unanswered_query_times_out_after_retries():
+    async def scenario(resolver):
+        return await resolver.resolve('www.example.com', (1,))
+
+    record, stub = run(scenario, drop_always={'www.example.com'})
+    assert record['status'] == 'TIMEOUT'
+    assert stub.queries['www.example.com', 1] == 3
+
+def test_wildcard_answers_are_flagged():
+    async def scenario(resolver):
+        names = ['real.wild.test', 'anything.wild.test', 'missing.example.com']
+        return {record['host']: record async for record in resolver.resolve_many(names, zone_wildcards=True)}
+
+    records, _ = run(scenario)
+    assert records['real.wild.test']['wildcard'] is False
+    assert records['anything.wild.test']['wildcard'] is True
+    assert records['missing.example.com']['status'] == 'NXDOMAIN'
+    assert records['missing.example.com']['wildcard'] is False
@@ -0,0 +1,36 @@
+import takethesubs
+
+def test_views_share_one_ingest_pool():
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config['ingest_workers'] = 2
+    first = scanner.with_config({}).get_ingester()
+    second = scanner.with_config({'threads': 5}).get_ingester()
+    assert first is second is scanner.get_ingester()
+
+    first.executor()
+    scanner.close()
+    assert first.pool is None
+    assert scanner.with_config({}).get_ingester() is not first
+    scanner.close()
+
+def names(run):
+    return list(map(takethesubs.SubdomainStore.name, run.keys()))
+
+def test_cache_keeps_ingested_runs(tmp_path, fake_tools):
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config.update({'ingest_workers': 2, 'cache_file': str(tmp_path / 'cache.sqlite')})
+    expected = sorted(f"{prefix}{i}.example.com" for prefix in ('am', 'as', 'fi', 'su') for i in (1, 2, 3))
+    try:
+        scanner.enumerate_target('example.com', str(tmp_path / 'first'))
+        assert scanner.get_ingester().pool is not None
+        cache = scanner.cache
+        cached = scanner.cached_output(cache, 'subfinder', scanner.tools['subfinder'], 'example.com')
+        assert isinstance(cached, takethesubs.NameRun)
+        assert names(cached) == ['su1.example.com', 'su2.example.com', 'su3.example.com']
+
+        # A second run reads all four tools back from the cache, on top of the lookup above
+        scanner.enumerate_target('example.com', str(tmp_path / 'second'))
+        assert cache.hits == 1 + 4
+        assert sorted(scanner.results['subdomains']) == expected
+    finally:
+        scanner.close()
@@ -0,0 +1,24 @@
+import pytest
+
+import takethesubs
+
+@pytest.mark.parametrize('openmetrics', [False, True])
+def test_cumulative_values_are_counter_families(openmetrics):
+    metrics = takethesubs.RunMetrics()
+    metrics.record('tool', 'example.com', 'amass', items=3)
+    metrics.record('tool', 'example.com', 'amass', items=2, errors=1)
+    metrics.add('cache_hits', 4)
+    text = metrics.exposition(openmetrics)
+    lines = text.splitlines()
+
+    types = dict(line.split()[2:4] for line in lines if line.startswith('# TYPE'))
+    assert not [name for name in types if name.endswith('_total')]
+    for name in ('stage_runs', 'stage_items', 'stage_errors', 'stage_timeouts',
+                 'stage_wall_seconds', 'stage_cpu_seconds', 'cache_hits'):
+        assert types[f"takethesubs_{name}"] == 'counter'
+    assert types['takethesubs_run_duration_seconds'] == 'gauge'
+
+    assert 'takethesubs_stage_runs_total{stage="tool",name="amass"} 2' in lines
+    assert 'takethesubs_stage_items_total{stage="tool",name="amass"} 5' in lines
+    assert 'takethesubs_cache_hits_total 4' in lines
+    assert (lines[-1] == '# EOF') == openmetrics
@@ -0,0 +1,53 @@
+import pytest
+
+import takethesubs
+
+# One apex is matched inside the regex; more than MAX_ALTERNATION fall back to the suffix lookup
+SMALL_SCOPE = ['example.com']
+LARGE_SCOPE = ['example.com'] + [f"other{i}.net" for i in range(takethesubs.DomainNormalizer.MAX_ALTERNATION)]
+
+@pytest.fixture(params=[SMALL_SCOPE, LARGE_SCOPE], ids=['regex', 'suffix'])
+def normalizer(request):
+    return takethesubs.DomainNormalizer(request.param)
+
+@pytest.mark.parametrize('raw, expected', [
+    ('www.example.com.', 'www.example.com'),
+    ('*.api.example.com', 'api.example.com'),
+    ('  WWW.Example.COM  ', 'www.example.com'),
+    ('bücher.example.com', 'xn--bcher-kva.example.com'),
+    ('*.', None),
+    ('', None),
+])
+def test_normalize(raw, expected):
+    assert takethesubs.DomainNormalizer.normalize(raw) == expected
+
+def test_chunk_is_normalized(normalizer):
+    text = 'www.example.com.\n*.api.example.com\nMAIL.EXAMPLE.COM\r\nbücher.example.com\n'
+    assert sorted(normalizer.filter_chunk(text)) == [
+        'api.example.com', 'mail.example.com', 'www.example.com', 'xn--bcher-kva.example.com']
+
+@pytest.mark.parametrize('name', ['example.com.evil.net', 'notexample.com', 'example.org', 'com'])
+def test_out_of_scope_names_are_rejected(normalizer, name):
+    assert not normalizer.is_valid(name)
+    assert normalizer.filter_chunk(f"{name}\nok.example.com\n") == ['ok.example.com']
+
+def test_apex_itself_is_in_scope(normalizer):
+    assert normalizer.is_valid('example.com')
+    assert normalizer.is_valid('a.b.example.com')
+
+@pytest.mark.parametrize('name', ['-a.example.com', 'a-.example.com', 'x.-b.example.com', 'x.b-.example.com'])
+def test_labels_may_not_start_or_end_with_a_hyphen(normalizer, name):
+    assert not normalizer.is_valid(name)
+    assert normalizer.filter_chunk(f"{name}\na-b.example.com\n") == ['a-b.example.com']
+
+def test_length_limits(normalizer):
+    label = 'a' * 63
+    assert normalizer.is_valid(f"{label}.example.com")
+    assert not normalizer.is_valid(f"{label}a.example.com")
+    assert normalizer.filter_chunk(f"{label}a.example.com\n") == []
+
+    longest = '.'.join(['b' * 63] * 3 + ['c' * 49]) + '.example.com'
+    assert len(longest) == 253
+    assert normalizer.is_valid(longest)
+    assert not normalizer.is_valid('c' + longest)
+    assert normalizer.filter_chunk(f"c{longest}\n{longest}\n") == [longest]
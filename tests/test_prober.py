@@ -0,0 +1,148 @@
+import asyncio
+import shutil
+import ssl
+import subprocess
+
+import pytest
+
+import takethesubs
+
+class Backend:
+    """Keep-alive HTTP/1.1 server recording the Host header of each request and the connection it came on"""
+
+    def __init__(self, host='127.0.0.1', delay=0, ssl_context=None):
+        self.host = host
+        self.delay = delay
+        self.ssl_context = ssl_context
+        self.requests = []
+        self.connections = 0
+
+    async def __aenter__(self):
+        while True:
+            self.server = await asyncio.start_server(self.handle, self.host, 0, ssl=self.ssl_context)
+            self.port = self.server.sockets[0].getsockname()[1]
+            # Extra probe ports ending in 443 are taken for HTTPS
+            if self.port % 1000 != 443:
+                return self
+            self.server.close()
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        connection = self.connections
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                host = None
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    if name.lower() == 'host':
+                        host = value.strip()
+                self.requests.append((connection, host))
+                await asyncio.sleep(self.delay)
+                body = f"<title>{host}</title>".encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+def test_keep_alive_connections_are_reused():
+    async def scenario():
+        async with Backend() as backend:
+            prober = takethesubs.HTTPProber(race=False)
+            try:
+                for path in range(5):
+                    result = await prober.probe_url(f"http://127.0.0.1:{backend.port}/{path}")
+                    assert result['alive']
+            finally:
+                prober.close()
+            return backend, prober.stats
+
+    backend, stats = asyncio.run(scenario())
+    assert backend.connections == 1
+    assert len(backend.requests) == 5
+    assert stats['connections'] == 1 and stats['reused'] == 4
+
+def test_race_keeps_the_first_live_answer():
+    async def scenario():
+        async with Backend(delay=3) as slow, Backend() as fast:
+            prober = takethesubs.HTTPProber(extra_ports=[slow.port, fast.port], connect_timeout=2, read_timeout=5)
+            try:
+                started = asyncio.get_running_loop().time()
+                result = await prober.probe_host('127.0.0.1')
+                elapsed = asyncio.get_running_loop().time() - started
+            finally:
+                prober.close()
+            return result, fast.port, elapsed
+
+    result, fast_port, elapsed = asyncio.run(scenario())
+    assert result['alive']
+    assert result['port'] == fast_port
+    # The slow port is cancelled rather than waited for
+    assert elapsed < 2
+
+def test_virtual_hosts_are_probed_on_their_first_resolved_address():
+    async def scenario():
+        async with Backend('127.0.0.1') as v4, Backend('::1') as v6:
+            scanner = takethesubs.TakeTheSubs()
+            # One worker and no scheme race, so the plain HTTP connection is free for the next name
+            scanner.config.update({'probe_by_ip': True, 'probe_race': False, 'threads': 1, 'adaptive': False,
+                                   'connect_timeout': 1, 'read_timeout': 1})
+            hosts = {
+                f"a.invalid:{v4.port}": {'a': ['127.0.0.1', '192.0.2.1'], 'aaaa': ['::1']},
+                f"b.invalid:{v4.port}": {'a': ['127.0.0.1'], 'aaaa': []},
+                f"c.invalid:{v6.port}": {'a': [], 'aaaa': ['::1']},
+                f"d.invalid:{v4.port}": {'a': [], 'aaaa': []},
+            }
+            try:
+                live = await scanner.probe_subdomains(set(hosts), dns=hosts)
+            finally:
+                scanner.close()
+            return live, v4, v6
+
+    live, v4, v6 = asyncio.run(scenario())
+    assert sorted(live) == [f"a.invalid:{v4.port}", f"b.invalid:{v4.port}", f"c.invalid:{v6.port}"]
+    # Both names on the IPv4 backend went over its one shared plain HTTP connection, with their own Host header
+    assert v4.connections == 1
+    assert sorted(host for _, host in v4.requests) == [f"a.invalid:{v4.port}", f"b.invalid:{v4.port}"]
+    assert [host for _, host in v6.requests] == [f"c.invalid:{v6.port}"]
+
+@pytest.mark.skipif(not shutil.which('openssl'), reason='needs the openssl CLI to make a certificate')
+def test_tls_session_is_resumed_across_virtual_hosts(tmp_path):
+    cert, key = str(tmp_path / 'cert.pem'), str(tmp_path / 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+                    '-days', '1', '-subj', '/CN=localhost'],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_context.load_cert_chain(cert, key)
+
+    async def scenario():
+        async with Backend(ssl_context=server_context) as backend:
+            prober = takethesubs.HTTPProber(race=False)
+            assert prober.ssl_context.wrap_bio == prober._wrap_bio
+            try:
+                first = await prober.probe_url(f"https://a.invalid:{backend.port}/", address='127.0.0.1')
+                second = await prober.probe_url(f"https://b.invalid:{backend.port}/", address='127.0.0.1')
+                # Without an address the saved session is not offered, even to the same backend
+                third = await prober.probe_url(f"https://localhost:{backend.port}/")
+                assert takethesubs.OFFERED_TLS_SESSION.get() is None
+            finally:
+                prober.close()
+            return first, second, third, prober.stats, backend
+
+    first, second, third, stats, backend = asyncio.run(scenario())
+    assert first['alive'] and second['alive'] and third['alive']
+    # TLS binds a connection to its SNI name, so each virtual host gets its own connection
+    assert backend.connections == 3
+    assert stats['handshakes'] == 3
+    assert stats['resumed'] == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+import takethesubs
+
+def make_service(tmp_path):
+    scanner = takethesubs.TakeTheSubs()
+    scanner.config.update({'cache': False})
+    return takethesubs.ScanService(scanner, str(tmp_path / 'out'))
+
+@pytest.mark.parametrize('options', [
+    {'threads': 'abc'},
+    {'threads': True},
+    {'threads': 0},
+    {'verify': 'yes'},
+    {'timeout': -1},
+    {'output_formats': ['nope']},
+    {'compression': 'bzip2'},
+    {'tools': {'amass': 'off'}},
+    {'tool_timeouts': {'amass': 'soon'}},
+    {'unknown': 1},
+    # Paths stay service-wide, so a client can't make the scanner read an arbitrary file
+    {'wordlist': '/etc/passwd'},
+])
+def test_submit_rejects_bad_options(tmp_path, options):
+    service = make_service(tmp_path)
+    service.queue = asyncio.PriorityQueue()
+    with pytest.raises(ValueError):
+        service.submit('example.com', options=options)
+    assert not service.jobs
+
+def test_submit_accepts_valid_options(tmp_path):
+    service = make_service(tmp_path)
+
+    async def submit():
+        service.queue = asyncio.PriorityQueue()
+        return service.submit('example.com', options={
+            'threads': 10, 'timeout': 2.5, 'verify': False, 'compression': None,
+            'output_formats': ['txt'], 'tools': {'amass': False}, 'tool_timeouts': {'amass': 30}
+        })
+
+    job = asyncio.run(submit())
+    assert job.status == 'queued'
+
+def test_with_config_rebuilds_tools():
+    scanner = takethesubs.TakeTheSubs()
+    tools = dict(scanner.config['tools'], amass=False, assetfinder=False, findomain=False)
+    view = scanner.with_config({'tools': tools})
+    assert set(view.tools) == {'subfinder'}
+    assert {'subfinder', 'amass', 'assetfinder', 'findomain'} <= set(scanner.tools)
+
+def test_job_runs_only_enabled_tools(tmp_path, fake_tools):
+    service = make_service(tmp_path)
+
+    async def run():
+        service.prepare()
+        service.queue = asyncio.PriorityQueue()
+        await service.scanner.resolve_tools()
+        job = service.submit('example.com', options={
+            'tools': {'amass': False, 'assetfinder': False, 'findomain': False}
+        })
+        await service.run_job(job)
+        return job
+
+    try:
+        job = asyncio.run(run())
+    finally:
+        service.scanner.close()
+    assert job.status == 'completed', job.error
+    assert job.results['tools_used'] == ['subfinder']
+    assert set(job.results['subdomains']) == {'su1.example.com', 'su2.example.com', 'su3.example.com'}
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import takethesubs
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'takethesubs.py')
+
+def test_coordinator_with_local_workers(tmp_path, fake_tools):
+    config = tmp_path / 'cluster.yaml'
+    config.write_text(json.dumps({'heartbeat_interval': 1, 'transport_poll': 0.1, 'lease_timeout': 30}))
+    exchange = tmp_path / 'exchange'
+    targets = [f"t{index}.example.com" for index in range(6)]
+
+    scanner = takethesubs.TakeTheSubs(str(config))
+    coordinator = takethesubs.ShardCoordinator(scanner, targets, shard_size=2, lease_timeout=30)
+    transport = takethesubs.open_transport(f"dir:{exchange}", poll_interval=0.1)
+    workers = [
+        subprocess.Popen([sys.executable, SCRIPT, '-c', str(config), '--worker', f"dir:{exchange}",
+                          '-o', str(tmp_path / f"worker{index}")],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for index in range(2)
+    ]
+    try:
+        summary = asyncio.run(asyncio.wait_for(
+            coordinator.run(transport, str(tmp_path / 'out'), drain=2), timeout=120))
+        for worker in workers:
+            assert worker.wait(timeout=30) == 0
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+        scanner.close()
+
+    assert summary['completed'] == len(targets)
+    assert not summary['failed']
+    assert summary['total_subdomains'] == len(targets) * 12
+    assert all(shard['state'] == 'done' for shard in coordinator.shards)
+    for target in targets:
+        [saved] = (tmp_path / 'out').glob(f"{target}_subdomains_*.txt")
+        assert saved.read_text().split() == sorted(f"{prefix}{i}.{target}" for prefix in ('am', 'as', 'fi', 'su')
+                                                   for i in (1, 2, 3))
+    # Each worker shares one cache between all its targets instead of opening one per target directory
+    for index in range(2):
+        assert (tmp_path / f"worker{index}" / '.takethesubs_cache.sqlite').exists()
+        assert not list((tmp_path / f"worker{index}").glob('*/.takethesubs_cache.sqlite'))
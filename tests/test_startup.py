@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'takethesubs.py')
+
+# Heavy modules only the commands that need them may import
+DEFERRED_MODULES = ['asyncio', 'ssl', 'sqlite3', 'yaml', 'logging', 'subprocess']
+# Generous enough for a loaded CI machine; an eager import of everything above costs far more
+VERSION_BUDGET = 1.5
+
+def test_import_defers_heavy_modules():
+    probe = (f"import json, sys; sys.path.insert(0, {ROOT!r}); import takethesubs; "
+             f"print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))")
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe],
+                             capture_output=True, text=True, check=True)
+    assert json.loads(process.stdout) == []
+    imported = {line.split('|')[2].strip() for line in process.stderr.splitlines() if line.count('|') == 2}
+    assert 'takethesubs' in imported
+    assert not imported & set(DEFERRED_MODULES)
+
+def test_version_starts_quickly():
+    # The first run warms the bytecode cache, as a second invocation by a user would be
+    subprocess.run([sys.executable, SCRIPT, '--version'], capture_output=True, check=True)
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, SCRIPT, '--version'], capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - started
+    assert process.stdout.startswith('TakeTheSubs')
+    assert elapsed < VERSION_BUDGET
@@ -0,0 +1,78 @@
+import takethesubs
+
+NAMES = ['www.example.com', 'example.com', 'a.b.example.com', 'b.example.com', 'mail.example.org', 'example.org']
+HIERARCHICAL = ['example.com', 'b.example.com', 'a.b.example.com', 'www.example.com', 'example.org', 'mail.example.org']
+
+def small_store(**kwargs):
+    # A tiny buffer turns every couple of names into a run of its own
+    return takethesubs.SubdomainStore(buffer_size=2, **kwargs)
+
+def test_duplicates_are_dropped_across_batches():
+    store = small_store()
+    # Keep every flushed batch as its own run, so duplicates sit in different runs
+    store.MERGE_BYTES = 0
+    store.update(NAMES)
+    store.update(reversed(NAMES))
+    store.update(['www.example.com', 'new.example.com'])
+    assert len(store.runs) > 1
+    assert 'new.example.com' in store and 'a.b.example.com' in store and 'c.example.com' not in store
+    assert list(store) == HIERARCHICAL[:3] + ['new.example.com'] + HIERARCHICAL[3:]
+    assert len(store) == len(NAMES) + 1
+
+def test_iteration_is_hierarchical():
+    store = takethesubs.SubdomainStore(NAMES)
+    # Each name comes right after its parent, even where plain sorting would split them
+    assert list(store) == HIERARCHICAL
+    assert sorted(store) != list(store)
+
+def test_under_and_restrict_keep_one_apex():
+    store = small_store()
+    store.update(NAMES + ['bexample.com', 'example.com.evil.net'])
+    assert list(store.under('b.example.com')) == ['b.example.com', 'a.b.example.com']
+    assert list(store.under('example.com')) == HIERARCHICAL[:4]
+    assert list(store.under('missing.example.com')) == []
+
+    assert store.restrict('example.com') is store
+    assert list(store) == HIERARCHICAL[:4]
+    assert 'bexample.com' not in store and 'mail.example.org' not in store
+
+def test_difference_against_a_previous_run():
+    previous = takethesubs.SubdomainStore(['example.com', 'www.example.com', 'old.example.com'])
+    current = small_store()
+    current.update(['example.com', 'www.example.com', 'new.example.com', 'a.new.example.com'])
+    assert list(current.difference(previous)) == ['new.example.com', 'a.new.example.com']
+    assert list(previous.difference(current)) == ['old.example.com']
+    # Any other container falls back to membership tests
+    assert list(current.difference({'example.com', 'new.example.com'})) == ['a.new.example.com', 'www.example.com']
+
+def test_name_run_lookup_and_ranges():
+    run = takethesubs.NameRun.from_names(NAMES + NAMES)
+    assert len(run) == len(NAMES)
+    assert list(map(takethesubs.SubdomainStore.name, run.keys())) == HIERARCHICAL
+    assert takethesubs.SubdomainStore.key('b.example.com') in run
+    assert takethesubs.SubdomainStore.key('c.example.com') not in run
+    low = takethesubs.SubdomainStore.key('example.org')
+    assert list(map(takethesubs.SubdomainStore.name, run.keys(run.bisect(low)))) == HIERARCHICAL[4:]
+
+def test_large_merges_spill_to_disk(tmp_path):
+    spill_dir = tmp_path / 'spill'
+    store = small_store(spill_dir=str(spill_dir), spill_bytes=64)
+    store.MERGE_BYTES = 128
+    names = [f"host{i:03}.example.com" for i in range(200)]
+    store.update(names)
+    store.update(names[:50])
+    store.compact()
+
+    run, = store.runs
+    assert run.spilled
+    # The backing file is unlinked as soon as it is mapped
+    assert spill_dir.is_dir() and not list(spill_dir.iterdir())
+    assert len(store) == 200
+    assert list(store) == names
+    assert 'host123.example.com' in store
+
+    store.restrict('host007.example.com')
+    assert store.runs[0].spilled
+    assert list(store) == ['host007.example.com']
+    store.close()
+    assert not store
@@ -0,0 +1,81 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+import takethesubs
+
+TIMESTAMP = '20240101_000000'
+
+def make_results():
+    results = takethesubs.TakeTheSubs.new_results('example.com')
+    results.update({'start_time': '2024-01-01T00:00:00', 'end_time': '2024-01-01T00:01:00',
+                    'tools_used': ['amass', 'subfinder']})
+    results['subdomains'].update(['www.example.com', 'example.com', 'mail.example.com'])
+    results['live_hosts'].add('www.example.com')
+    results['dns']['www.example.com'] = {'subdomain': 'www.example.com', 'a': ['192.0.2.1', '192.0.2.2'],
+                                         'aaaa': [], 'cname': ['cdn.example.net']}
+    results['http']['www.example.com'] = {'subdomain': 'www.example.com', 'status': 200,
+                                          'title': '<script>alert("x")</script> & co', 'final_url': None,
+                                          'scheme': 'https', 'port': 443, 'content_length': 12}
+    return results
+
+def write(tmp_path, name, results=None, compression=None):
+    writer = takethesubs.RESULT_WRITERS[name](compression)
+    paths = writer.write(str(tmp_path), 'example.com', TIMESTAMP, results or make_results())
+    assert not list(tmp_path.glob('*.tmp'))
+    return paths
+
+def test_csv_has_one_row_per_subdomain(tmp_path):
+    path, = write(tmp_path, 'csv')
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['subdomain'] for row in rows] == ['example.com', 'mail.example.com', 'www.example.com']
+    www = rows[2]
+    assert www['live'] == 'True' and www['status'] == '200' and www['final_url'] == ''
+    assert www['a'] == '192.0.2.1 192.0.2.2' and www['aaaa'] == ''
+    assert www['title'] == '<script>alert("x")</script> & co'
+    assert rows[0]['live'] == 'False' and rows[0]['status'] == ''
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_ndjson_has_one_record_per_line(tmp_path, compression):
+    path, = write(tmp_path, 'ndjson', compression=compression)
+    assert path.endswith('.ndjson' + ('.gz' if compression else ''))
+    with (gzip.open if compression else open)(path, 'rt') as f:
+        records = [json.loads(line) for line in f]
+    assert records[0] == {'subdomain': 'example.com', 'live': False}
+    assert records[2]['cname'] == ['cdn.example.net'] and records[2]['port'] == 443
+    assert [record['subdomain'] for record in records] == ['example.com', 'mail.example.com', 'www.example.com']
+
+def test_html_escapes_everything_from_the_scan(tmp_path):
+    results = make_results()
+    results['tools_used'] = ['<b>tool</b>']
+    path, = write(tmp_path, 'html', results)
+    with open(path) as f:
+        page = f.read()
+    assert '<script>' not in page and '<b>' not in page
+    assert '&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; co' in page
+    assert '&lt;b&gt;tool&lt;/b&gt;' in page
+    assert page.count('<tr class="live">') == 1
+
+def test_failed_write_leaves_no_partial_file(tmp_path):
+    path = str(tmp_path / 'out.txt')
+    with open(path, 'w') as f:
+        f.write('previous\n')
+    with pytest.raises(RuntimeError):
+        with takethesubs.AtomicOutput(path) as f:
+            f.write('partial\n')
+            raise RuntimeError('disk full')
+    with open(path) as f:
+        assert f.read() == 'previous\n'
+    assert not list(tmp_path.glob('*.tmp'))
+
+@pytest.mark.parametrize('name', ['ndjson', 'csv', 'html'])
+def test_writer_failing_midway_leaves_nothing_behind(tmp_path, name):
+    results = make_results()
+    # The first record is written before the incomplete HTTP entry of the last one fails
+    del results['http']['www.example.com']['title']
+    with pytest.raises(KeyError):
+        write(tmp_path, name, results)
+    assert not list(tmp_path.iterdir())